@@ -1 +1,2 @@
-from .pymunk_arm import PymunkArmEnv # noqa
\ No newline at end of file
+from .pymunk_arm import PymunkArmEnv # noqa
+from .muscled_vector_env import MuscledVectorEnv # noqa
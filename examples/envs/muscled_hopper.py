@@ -1,39 +1,83 @@
 import numpy as np
 from gym import utils
 from . import mujoco_env
+from pymuscle import MuscleGroup
 from pymuscle import PotvinFuglevandMuscle as Muscle
 
 
 class MuscledHopperEnv(mujoco_env.MujocoEnv, utils.EzPickle):
-    def __init__(self, apply_fatigue=False):
+    """
+    Hopper whose four actuators are driven by PyMuscles.
+
+    All muscles are stepped together through a single MuscleGroup. By
+    default muscles are stepped once per env step and their output is held
+    for all frame_skip physics frames. With substep_muscles the muscles are
+    instead stepped once per physics frame. The outputs for all frames of an
+    env step are calculated by one MuscleGroup.step_many() call, so the only
+    Python work added per frame is setting the frame's controls ahead of the
+    physics step the env takes anyway. The muscle work itself still grows
+    with the number of frames. See tests/benchmarks/bench_muscled_hopper.py.
+    """
+    def __init__(self, apply_fatigue=False, substep_muscles=False):
         # Instantiate the PyMuscles (not real muscle names)
         hamstring_motor_unit_count = 300
-        self.hamstring_muscle = Muscle(hamstring_motor_unit_count, apply_fatigue)
         thigh_motor_unit_count = 300
-        self.thigh_muscle = Muscle(thigh_motor_unit_count, apply_fatigue)
         calf_motor_unit_count = 200
-        self.calf_muscle = Muscle(calf_motor_unit_count, apply_fatigue)
         shin_motor_unit_count = 100
-        self.shin_muscle = Muscle(shin_motor_unit_count, apply_fatigue)
-        self.muscles = [
-            self.hamstring_muscle,
-            self.thigh_muscle,
-            self.calf_muscle,
-            self.shin_muscle
+        motor_unit_counts = [
+            hamstring_motor_unit_count,
+            thigh_motor_unit_count,
+            calf_motor_unit_count,
+            shin_motor_unit_count
         ]
+        self.muscle_group = MuscleGroup([
+            Muscle(count, apply_fatigue)
+            for count in motor_unit_counts
+        ])
+        self.muscles = self.muscle_group.muscles
+        (self.hamstring_muscle,
+         self.thigh_muscle,
+         self.calf_muscle,
+         self.shin_muscle) = self.muscles
+        self.substep_muscles = substep_muscles
 
         # Initialize parents
         mujoco_env.MujocoEnv.__init__(self, 'hopper.xml', 4)
         utils.EzPickle.__init__(self)
 
+    def do_simulation(self, ctrl, n_frames):
+        """
+        Advances the muscles and the physics simulation. ctrl holds the
+        excitation for each muscle.
+        """
+        frame_step_size = self.model.opt.timestep
+        if not self.substep_muscles:
+            outputs = self.muscle_group.step(ctrl, frame_step_size * n_frames)
+            super().do_simulation(outputs, n_frames)
+            return
+
+        # All frames' outputs in one call as the excitations are held
+        outputs = self.muscle_group.step_many(ctrl, frame_step_size, n_frames)
+        for frame_outputs in outputs:
+            self.sim.data.ctrl[:] = frame_outputs
+            self.sim.step()
+
     def step(self, a):
         posbefore = self.sim.data.qpos[0]
+        self.do_simulation(a, self.frame_skip)
+        return self._step_result(a, posbefore)
 
-        # Get output from muscles
-        outputs = [muscle.step(a[i], 0.002 * self.frame_skip) for
-                   i, muscle in enumerate(self.muscles)]
+    def step_with_muscle_outputs(self, a, outputs, step_size=None):
+        """
+        Advances the physics simulation with muscle outputs which have
+        already been calculated, for example by MuscledVectorEnv. The
+        outputs are held for all frame_skip frames.
+        """
+        posbefore = self.sim.data.qpos[0]
+        mujoco_env.MujocoEnv.do_simulation(self, outputs, self.frame_skip)
+        return self._step_result(a, posbefore)
 
-        self.do_simulation(outputs, self.frame_skip)
+    def _step_result(self, a, posbefore):
         posafter, height, ang = self.sim.data.qpos[0:3]
         alive_bonus = 1.0
         reward = (posafter - posbefore) / self.dt
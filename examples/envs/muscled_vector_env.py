@@ -0,0 +1,88 @@
+import numpy as np
+from pymuscle import MuscleGroup
+
+
+class MuscledVectorEnv(object):
+    """
+    Runs several copies of a muscled env while stepping the muscles of all of
+    them in as few calls as possible.
+
+    The muscles of every sub-environment are collected into MuscleGroups so
+    that one group step advances the matching muscles of all envs together.
+    Muscles which can't share a group, for example because only some of them
+    fatigue, are placed in separate groups. The muscle state of each env
+    becomes a view into the group storage, so envs must be stepped through
+    this wrapper rather than directly.
+
+    Envs must provide a muscles list, ordered like their actions, and a
+    step_with_muscle_outputs(action, outputs, step_size, **kwargs) method
+    which advances everything but the muscles.
+
+    :param env_fns: Functions which each return a new env.
+
+    Usage::
+
+      env = MuscledVectorEnv([MuscledHopperEnv for _ in range(8)])
+      results = env.step(np.random.rand(8, 4))
+    """
+    def __init__(self, env_fns):
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+        for env in self.envs:
+            assert not getattr(env, 'substep_muscles', False), \
+                'Muscle substepping is not supported'
+
+        muscles = [m for env in self.envs for m in env.muscles]
+        counts = [len(env.muscles) for env in self.envs]
+        self._env_offsets = np.cumsum(counts)[:-1]
+
+        # Assign each muscle to the first group it is compatible with
+        buckets = []
+        for index, muscle in enumerate(muscles):
+            for bucket in buckets:
+                if MuscleGroup.can_group([muscles[bucket[0]], muscle]):
+                    bucket.append(index)
+                    break
+            else:
+                buckets.append([index])
+
+        self._group_indices = [np.array(bucket) for bucket in buckets]
+        self.muscle_groups = [
+            MuscleGroup([muscles[i] for i in bucket]) for bucket in buckets
+        ]
+        self._outputs = np.zeros(len(muscles))
+
+    def step_muscles(self, actions, step_size):
+        """
+        Advances the muscles of all envs and returns a list with the
+        outputs for each env.
+        """
+        excitations = np.concatenate([np.ravel(a) for a in actions])
+        for group, indices in zip(self.muscle_groups, self._group_indices):
+            self._outputs[indices] = group.step(excitations[indices], step_size)
+
+        return np.split(self._outputs.copy(), self._env_offsets)
+
+    def step(self, actions, step_size=None, **kwargs):
+        """
+        Advances all envs and returns a list with the result of each env's
+        step. step_size defaults to the env's dt and must be given for envs
+        without one, such as PymunkArmEnv.
+        """
+        if step_size is None:
+            step_size = getattr(self.envs[0], 'dt', None)
+            assert step_size is not None, \
+                'step_size is required for envs without a dt'
+
+        outputs = self.step_muscles(actions, step_size)
+        return [
+            env.step_with_muscle_outputs(action, env_outputs, step_size, **kwargs)
+            for env, action, env_outputs in zip(self.envs, actions, outputs)
+        ]
+
+    def reset(self):
+        return [env.reset() for env in self.envs]
+
+    def close(self):
+        for env in self.envs:
+            env.close()
@@ -30,6 +30,7 @@ class PymunkArmEnv(gym.Env):
         self.tricep_muscle = Muscle(
             apply_peripheral_fatigue=False  # Tricep never gets tired in this env
         )
+        self.muscles = [self.brach_muscle, self.tricep_muscle]
 
         self.frames = 0
 
@@ -148,12 +149,24 @@ class PymunkArmEnv(gym.Env):
                 sys.exit(0)
 
     def step(self, input_array, step_size, debug=True):
-        # Check for user input
-        self._handle_keys()
-
         # Scale input to match the expected range of the muscle sim
         input_array = np.array(input_array)
 
+        # Advance muscle sim
+        outputs = [
+            muscle.step(excitation, step_size)
+            for muscle, excitation in zip(self.muscles, input_array)
+        ]
+        return self.step_with_muscle_outputs(input_array, outputs, step_size, debug)
+
+    def step_with_muscle_outputs(self, input_array, outputs, step_size, debug=True):
+        """
+        Advances the physics simulation with muscle outputs which have
+        already been calculated, for example by MuscledVectorEnv.
+        """
+        # Check for user input
+        self._handle_keys()
+
         if debug:
             print(input_array)
 
@@ -161,9 +174,8 @@ class PymunkArmEnv(gym.Env):
         self.space.step(step_size)
         self.frames += 1
 
-        # Advance muscle sim and sync with physics sim
-        brach_output = self.brach_muscle.step(input_array[0], step_size)
-        tricep_output = self.tricep_muscle.step(input_array[1], step_size)
+        # Sync muscle sim with physics sim
+        brach_output, tricep_output = outputs
 
         gain = 500
         self.brach.stiffness = brach_output * gain
@@ -6,7 +6,11 @@ from .muscle import StandardMuscle  # noqa: F401
 from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers  # noqa: F401
 from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool  # noqa: F401
 from .pymuscle_fibers import PyMuscleFibers  # noqa: F401
-from .hill_type import (
+from .muscle_group import MuscleGroup  # noqa: F401
+from .reduced_muscle import ReducedOrderMuscle, MultiFidelityMuscle  # noqa: F401
+from .hill_muscle import HillMuscle, HillMuscleGroup  # noqa: F401
+from .hill_type import (  # noqa: F401
     contractile_element_force_length_curve,
-    contractile_element_force_velocity_curve
+    contractile_element_force_velocity_curve,
+    contractile_element_trajectory_multipliers
 )
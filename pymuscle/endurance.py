@@ -0,0 +1,674 @@
+"""
+Endurance analysis: how long a muscle can sustain a given force.
+"""
+import hashlib
+import os
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+from .model import Model
+from .muscle import Muscle
+from .muscle_group import MuscleGroup
+from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+from .simulation import _write_atomically
+
+# Bisection iterations used to find the excitation which tracks a target
+_TRACKING_ITERATIONS = 30
+
+# Part of every cache key. Increase when results for the same arguments
+# change.
+_CACHE_VERSION = 2
+
+
+class TaskFailure(object):
+    """
+    The result of :func:`time_to_failure`.
+
+    :param time:
+        Time at which the muscle could no longer produce the target force, in
+        seconds, or infinity if it did not fail within the time allowed.
+    :param muscle: A copy of the muscle in its state at that time.
+    :param excitation: The excitation in use when the muscle failed.
+    :param tolerance:
+        Estimated largest error in time relative to a plain simulation,
+        including both the error from locating the failure within a step and
+        the error from integrating fatigue in coarse steps.
+    :param steps: Number of simulation steps taken to find the failure.
+    """
+    def __init__(
+        self,
+        time: float,
+        muscle: Muscle,
+        excitation: float,
+        tolerance: float,
+        steps: int
+    ):
+        self.time = time
+        self.muscle = muscle
+        self.excitation = excitation
+        self.tolerance = tolerance
+        self.steps = steps
+
+    @property
+    def failed(self) -> bool:
+        return bool(np.isfinite(self.time))
+
+
+def _unit_forces(pool: Model, fibers: Model, inputs: ndarray) -> ndarray:
+    """
+    Returns the force of each motor unit a step with the given inputs would
+    produce, without advancing the models.
+
+    :param pool: A Potvin & Fuglevand motor neuron pool.
+    :param fibers: Potvin & Fuglevand fibers for the same motor units.
+    :param inputs: Input to each motor neuron.
+    """
+    firing_rates = pool._calc_firing_rates(inputs)
+    adapted = firing_rates - pool._calc_adaptations(firing_rates)
+    normalized_forces = fibers._calc_normalized_forces(
+        fibers._normalize_firing_rates(adapted)
+    )
+    return normalized_forces * fibers.current_peak_forces
+
+
+def _instantaneous_output(muscle: Muscle, excitation: float) -> float:
+    """
+    Returns the output muscle.step() would give for an excitation without
+    advancing the muscle.
+
+    :param muscle: The muscle to evaluate.
+    :param excitation: Input to the muscle on its own scale.
+    """
+    inputs = np.full(muscle.motor_unit_count, excitation * muscle._input_range)
+    forces = _unit_forces(muscle._pool, muscle._fibers, inputs)
+    return float(np.sum(forces) / muscle._output_range)
+
+
+def _group_outputs(group: MuscleGroup, excitations: ndarray) -> ndarray:
+    """
+    Returns the output of each muscle in a group for one excitation per
+    muscle without advancing the group. See _instantaneous_output().
+
+    :param group: The muscles to evaluate.
+    :param excitations: Input to each muscle on its own scale.
+    """
+    inputs = np.repeat(excitations * group._input_ranges, group._counts)
+    forces = _unit_forces(group._pool, group._fibers, inputs)
+    return np.add.reduceat(forces, group._offsets) / group._output_ranges
+
+
+def _tracking_excitation(
+    muscle: Muscle,
+    target: float,
+    max_excitation: float
+) -> float:
+    """
+    Returns the smallest excitation at which the muscle produces the target
+    force, or max_excitation if it can not.
+
+    :param muscle: The muscle to evaluate.
+    :param target: Force to produce on the muscle's output scale.
+    :param max_excitation: Largest allowed input on the muscle's scale.
+    """
+    if _instantaneous_output(muscle, max_excitation) < target:
+        return max_excitation
+    low, high = 0.0, max_excitation
+    for _ in range(_TRACKING_ITERATIONS):
+        middle = (low + high) / 2
+        if _instantaneous_output(muscle, middle) >= target:
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+def _group_tracking_excitations(
+    group: MuscleGroup,
+    targets: ndarray,
+    max_excitation: float
+) -> ndarray:
+    """
+    Returns the tracking excitation of every muscle in a group, bisecting
+    for all of them at once. See _tracking_excitation().
+
+    :param group: The muscles to evaluate.
+    :param targets: Force for each muscle to produce.
+    :param max_excitation: Largest allowed input on the muscles' scale.
+    """
+    low = np.zeros(len(targets))
+    high = np.full(len(targets), max_excitation)
+    for _ in range(_TRACKING_ITERATIONS):
+        middle = (low + high) / 2
+        reached = _group_outputs(group, middle) >= targets
+        high = np.where(reached, middle, high)
+        low = np.where(reached, low, middle)
+    capable = _group_outputs(group, np.full(len(targets), max_excitation)) >= targets
+    return np.where(capable, high, max_excitation)
+
+
+def _bisect_failure(
+    previous: Muscle,
+    excitation: float,
+    step_size: float,
+    failed: Muscle,
+    headroom: Callable[[Muscle], float],
+    tolerance: float
+) -> Tuple[float, Muscle, float, int]:
+    """
+    Narrows down when within a step a muscle fails. Returns the time into
+    the step at which it has failed, the muscle at that time, the remaining
+    uncertainty in time and the number of steps taken.
+
+    :param previous: The muscle at the start of the step. Not changed.
+    :param excitation: Input to the muscle during the step.
+    :param step_size: Length of the step.
+    :param failed: The muscle at the end of the step.
+    :param headroom: Returns the force a muscle has in hand beyond the target.
+    :param tolerance: Largest remaining uncertainty in time.
+    """
+    low, high = 0.0, step_size
+    steps = 0
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        trial = previous.clone()
+        trial.step(excitation, middle)
+        steps += 1
+        if headroom(trial) < 0:
+            high = middle
+            failed = trial
+        else:
+            low = middle
+    return high, failed, high - low, steps
+
+
+def _refined_step_size(step_size: float, coarse_step_size: float) -> float:
+    """
+    Returns the coarse step size of the second search used to estimate the
+    error of coarse integration.
+
+    :param step_size: Step size of the plain simulation being approximated.
+    :param coarse_step_size: Coarse step size requested.
+    """
+    return max(coarse_step_size / 2, step_size)
+
+
+def _integration_error(
+    coarse_times: ndarray,
+    times: ndarray,
+    step_size: float,
+    coarse_step_size: float
+) -> ndarray:
+    """
+    Estimates the error, relative to a plain simulation, of failure times
+    found with coarse steps of _refined_step_size().
+
+    Fatigue is integrated to first order, so the error in the failure time
+    grows in proportion to the coarse step size. The change in failure time
+    between coarse_step_size and the refined step size gives the rate, which
+    is doubled to allow for the growth not being exactly linear.
+
+    :param coarse_times: Failure times found with coarse_step_size.
+    :param times: Failure times found with the refined step size.
+    :param step_size: Step size of the plain simulation being approximated.
+    :param coarse_step_size: Coarse step size requested.
+    """
+    refined = _refined_step_size(step_size, coarse_step_size)
+    if refined == step_size:
+        return np.zeros(np.shape(times))
+    with np.errstate(invalid='ignore'):
+        rate = np.abs(coarse_times - times) / (coarse_step_size - refined)
+    # Neither search failed within the time allowed
+    rate = np.where(coarse_times == times, 0.0, rate)
+    return 2 * rate * (refined - step_size)
+
+
+def _search_failure(
+    muscle: Muscle,
+    target: float,
+    excitation: Optional[float],
+    step_size: float,
+    coarse_step_size: float,
+    margin: float,
+    tolerance: float,
+    max_time: float
+) -> TaskFailure:
+    """
+    Finds how long a muscle can hold a target force using a single coarse
+    step size. See time_to_failure(). The tolerance of the result covers
+    only the bisection of the failing step.
+    """
+    max_excitation = muscle.max_excitation / muscle._input_range
+
+    def excitation_for(m: Muscle) -> float:
+        if excitation is None:
+            return _tracking_excitation(m, target, max_excitation)
+        return excitation
+
+    def headroom(m: Muscle) -> float:
+        # Force in hand beyond the target under the policy
+        policy_excitation = max_excitation if excitation is None else excitation
+        return _instantaneous_output(m, policy_excitation) - target
+
+    current = muscle.clone()
+    time = 0.0
+    steps = 0
+    fine = False
+    if headroom(current) < 0:
+        return TaskFailure(0.0, current, excitation_for(current), 0.0, steps)
+
+    while time < max_time:
+        step_excitation = excitation_for(current)
+        if not fine and headroom(current) > margin * target:
+            dt = min(coarse_step_size, max_time - time)
+        else:
+            dt = min(step_size, max_time - time)
+
+        previous = current.clone()
+        current.step(step_excitation, dt)
+        steps += 1
+        if headroom(current) >= 0:
+            time += dt
+            continue
+
+        if dt > step_size:
+            # Overshot with a coarse step. Redo it in fine steps.
+            current = previous
+            fine = True
+            continue
+
+        # The muscle fails within this step. Bisect its length.
+        offset, failed, uncertainty, bisection_steps = _bisect_failure(
+            previous,
+            step_excitation,
+            dt,
+            current,
+            headroom,
+            tolerance
+        )
+        return TaskFailure(
+            time + offset,
+            failed,
+            step_excitation,
+            uncertainty,
+            steps + bisection_steps
+        )
+
+    return TaskFailure(np.inf, current, excitation_for(current), 0.0, steps)
+
+
+def time_to_failure(
+    muscle: Muscle,
+    target: float,
+    excitation: Optional[float] = None,
+    step_size: float = 1 / 50.0,
+    coarse_step_size: float = 1.0,
+    margin: float = 0.02,
+    tolerance: float = 1e-3,
+    max_time: float = 3600.0
+) -> TaskFailure:
+    """
+    Finds how long a muscle can hold a target force. The muscle itself is
+    not changed.
+
+    With a fixed excitation the muscle fails once its output drops below the
+    target. Without one the excitation tracks the target, rising as the
+    muscle fatigues, and the muscle fails once even its largest excitation
+    falls short.
+
+    Steps of coarse_step_size are taken while the muscle has more than
+    margin times the target in hand. Closer to failure, and after any coarse
+    step which overshoots it, steps of step_size are taken. The step in which
+    the muscle fails is then bisected until the failure time is known to
+    within tolerance.
+
+    Coarse steps integrate fatigue less accurately than steps of step_size,
+    and the error builds up over the whole hold. To estimate it the search
+    is run twice, with coarse steps of coarse_step_size and of half that.
+    The result is that of the second search, and its tolerance adds an
+    estimate of the coarse integration error to the bisection tolerance.
+    Once half of coarse_step_size is no more than step_size only steps of
+    step_size are used, and a plain simulation is reproduced to within
+    tolerance.
+
+    :param muscle:
+        A muscle with Potvin & Fuglevand models which is not in real-time
+        mode.
+    :param target: Force to hold on the muscle's output scale.
+    :param excitation:
+        Fixed input on the muscle's scale, or None to track the target.
+    :param step_size: Step size of the plain simulation being approximated.
+    :param coarse_step_size: Step size used far from failure.
+    :param margin: Headroom, relative to target, below which steps are fine.
+    :param tolerance: Accuracy of locating the failure in a step, in seconds.
+    :param max_time: Longest time to simulate, in seconds.
+    """
+    assert isinstance(muscle._pool, PotvinFuglevand2017MotorNeuronPool)
+    assert isinstance(muscle._fibers, PotvinFuglevand2017MuscleFibers)
+    assert muscle.real_time is None
+    assert target > 0
+    assert 0 < step_size <= coarse_step_size
+
+    settings = (margin, tolerance, max_time)
+    refined = _refined_step_size(step_size, coarse_step_size)
+    result = _search_failure(
+        muscle, target, excitation, step_size, refined, *settings
+    )
+    if refined == step_size:
+        # Integrated as a plain simulation would be
+        return result
+
+    coarse = _search_failure(
+        muscle, target, excitation, step_size, coarse_step_size, *settings
+    )
+    error = _integration_error(
+        coarse.time,
+        result.time,
+        step_size,
+        coarse_step_size
+    )
+    result.tolerance += float(error)
+    result.steps += coarse.steps
+    return result
+
+
+class EnduranceCurve(object):
+    """
+    The result of :func:`endurance_curve`.
+
+    :param targets: Forces held, on the muscle's output scale.
+    :param times:
+        Time to task failure at each target, in seconds, or infinity where
+        the muscle did not fail within the time allowed.
+    :param tolerances:
+        Estimated largest error of each time. See TaskFailure.tolerance.
+    :param cached: Whether the times were read from the cache.
+    """
+    def __init__(
+        self,
+        targets: ndarray,
+        times: ndarray,
+        tolerances: ndarray,
+        cached: bool = False
+    ):
+        self.targets = targets
+        self.times = times
+        self.tolerances = tolerances
+        self.cached = cached
+
+
+def _parameter_hash(muscle: Muscle, settings: Sequence) -> str:
+    """
+    Returns a digest of everything the endurance of a muscle depends on:
+    its model classes, their parameters and current state, and the
+    settings of the calculation.
+
+    :param muscle: The muscle being analyzed.
+    :param settings: Arguments of the calculation. Arrays or scalars.
+    """
+    digest = hashlib.sha256()
+
+    def add(value) -> None:
+        if isinstance(value, ndarray):
+            digest.update(value.dtype.str.encode())
+            digest.update(repr(value.shape).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+
+    add(_CACHE_VERSION)
+    add(type(muscle).__name__)
+    add(muscle._input_range)
+    add(muscle._output_range)
+    for model in (muscle._pool, muscle._fibers):
+        add(type(model).__name__)
+        # Step caches are rebuilt for each step size, per unit forces are
+        # rebuilt from the state whenever read and dictionaries hold lookup
+        # tables of parameters already included
+        skipped = set(model._step_cache_attributes) | {
+            '_cached_step_size',
+            '_current_forces',
+            '_current_forces_stale'
+        }
+        for name, value in sorted(vars(model).items()):
+            if name in skipped or isinstance(value, dict):
+                continue
+            add(name)
+            add(value)
+    for value in settings:
+        add(value)
+    return digest.hexdigest()
+
+
+def _restore_unit_state(
+    muscle: Muscle,
+    pool_state: Dict,
+    fiber_state: Dict,
+    start: int
+) -> None:
+    """
+    Restores a muscle's state from a copy of the state of a group it
+    belongs to.
+
+    :param muscle: The muscle to restore.
+    :param pool_state: Group pool state from Model._get_state().
+    :param fiber_state: Group fibers state from Model._get_state().
+    :param start: Position of the muscle's first motor unit in the group.
+    """
+    stop = start + muscle.motor_unit_count
+    for model, state in ((muscle._pool, pool_state), (muscle._fibers, fiber_state)):
+        model._set_state({
+            name: value[start:stop]
+            for name, value in state.items()
+            if isinstance(value, ndarray)
+        })
+
+
+def _failure_times(
+    muscle: Muscle,
+    targets: ndarray,
+    step_size: float,
+    coarse_step_size: float,
+    margin: float,
+    tolerance: float,
+    max_time: float
+) -> ndarray:
+    """
+    Returns the time to task failure of a muscle tracking each target,
+    following time_to_failure() for every target at once.
+
+    Each target has its own copy of the muscle and its own clock. Copies
+    taking steps of the same size are stepped together as one
+    :class:`MuscleGroup <pymuscle.MuscleGroup>`.
+
+    :param muscle: The muscle to analyze. Not changed.
+    :param targets: Forces to hold.
+    :param step_size: See time_to_failure()
+    :param coarse_step_size: See time_to_failure()
+    :param margin: See time_to_failure()
+    :param tolerance: See time_to_failure()
+    :param max_time: See time_to_failure()
+    """
+    count = len(targets)
+    max_excitation = muscle.max_excitation / muscle._input_range
+    levels = muscle.clone_many(count)
+    clocks = np.zeros(count)
+    failure_times = np.full(count, np.inf)
+    fine = np.zeros(count, dtype=bool)
+
+    full = np.full(count, max_excitation)
+    headroom = _group_outputs(MuscleGroup(levels), full) - targets
+    failure_times[headroom < 0] = 0.0
+    active = headroom >= 0
+
+    # Groups are rebuilt whenever their members change. Grouping moves a
+    # muscle's state into the new group, so groups are never reused once
+    # one of their members has joined another.
+    groups: Dict[float, Tuple[ndarray, MuscleGroup]] = {}
+    while np.any(active):
+        coarse = ~fine & (headroom > margin * targets)
+        step_sizes = np.minimum(
+            np.where(coarse, coarse_step_size, step_size),
+            max_time - clocks
+        )
+        current: Dict[float, Tuple[ndarray, MuscleGroup]] = {}
+        for dt in np.unique(step_sizes[active]):
+            members = np.flatnonzero(active & (step_sizes == dt))
+            cached = groups.get(dt)
+            if cached is None or not np.array_equal(cached[0], members):
+                cached = (members, MuscleGroup([levels[i] for i in members]))
+            current[dt] = cached
+            group = cached[1]
+            member_targets = targets[members]
+
+            excitations = _group_tracking_excitations(
+                group,
+                member_targets,
+                max_excitation
+            )
+            pool_state = group._pool._get_state()
+            fiber_state = group._fibers._get_state()
+            group.step(excitations, dt)
+            after = _group_outputs(
+                group,
+                np.full(len(members), max_excitation)
+            ) - member_targets
+
+            for j, i in enumerate(members):
+                if after[j] >= 0:
+                    clocks[i] += dt
+                    headroom[i] = after[j]
+                    active[i] = clocks[i] < max_time
+                    continue
+
+                _restore_unit_state(
+                    levels[i],
+                    pool_state,
+                    fiber_state,
+                    group._offsets[j]
+                )
+                if dt > step_size:
+                    # Overshot with a coarse step. Redo it in fine steps.
+                    fine[i] = True
+                    continue
+
+                target = member_targets[j]
+
+                def level_headroom(m: Muscle) -> float:
+                    return _instantaneous_output(m, max_excitation) - target
+
+                offset, _, _, _ = _bisect_failure(
+                    levels[i],
+                    float(excitations[j]),
+                    dt,
+                    levels[i],
+                    level_headroom,
+                    tolerance
+                )
+                failure_times[i] = clocks[i] + offset
+                active[i] = False
+        groups = current
+
+    return failure_times
+
+
+def endurance_curve(
+    muscle: Muscle,
+    targets: Sequence[float],
+    step_size: float = 1 / 50.0,
+    coarse_step_size: float = 1.0,
+    margin: float = 0.02,
+    tolerance: float = 1e-3,
+    max_time: float = 3600.0,
+    cache_dir: Optional[str] = None
+) -> EnduranceCurve:
+    """
+    Finds the time to task failure of a muscle at each of a set of target
+    forces, with the excitation tracking each target as in
+    :func:`time_to_failure`. The muscle itself is not changed.
+
+    All targets are simulated together. Targets which take steps of the same
+    size are advanced as one group, so the cost of a step is shared rather
+    than paid once per target. As in time_to_failure() the search is
+    repeated with half the coarse step size to estimate the tolerances.
+
+    If cache_dir is given results are stored there in a file named by a hash
+    of the muscle's model classes, parameters and current state and of the
+    other arguments. Later calls with the same hash read the file instead of
+    simulating.
+
+    :param muscle:
+        A muscle with Potvin & Fuglevand models which is not in real-time
+        mode.
+    :param targets: Forces to hold on the muscle's output scale.
+    :param step_size: See time_to_failure()
+    :param coarse_step_size: See time_to_failure()
+    :param margin: See time_to_failure()
+    :param tolerance: See time_to_failure()
+    :param max_time: See time_to_failure()
+    :param cache_dir: Directory to memoize results in. Created if needed.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.endurance import endurance_curve
+
+      curve = endurance_curve(
+          StandardMuscle(),
+          np.linspace(0.1, 0.9, 50),
+          cache_dir='endurance_cache'
+      )
+    """
+    assert isinstance(muscle._pool, PotvinFuglevand2017MotorNeuronPool)
+    assert isinstance(muscle._fibers, PotvinFuglevand2017MuscleFibers)
+    assert muscle.real_time is None
+    targets = np.array(targets, dtype=float)
+    assert targets.ndim == 1 and len(targets) > 0
+    assert np.all(targets > 0)
+    assert 0 < step_size <= coarse_step_size
+
+    path = None
+    if cache_dir is not None:
+        key = _parameter_hash(
+            muscle,
+            (targets, step_size, coarse_step_size, margin, tolerance, max_time)
+        )
+        path = os.path.join(cache_dir, key + '.npz')
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return EnduranceCurve(
+                    data['targets'],
+                    data['times'],
+                    data['tolerances'],
+                    cached=True
+                )
+
+    settings = (margin, tolerance, max_time)
+    refined = _refined_step_size(step_size, coarse_step_size)
+    times = _failure_times(muscle, targets, step_size, refined, *settings)
+    # Failures found within a step are located to within tolerance
+    tolerances = np.where((times > 0) & np.isfinite(times), tolerance, 0.0)
+    if refined != step_size:
+        coarse_times = _failure_times(
+            muscle,
+            targets,
+            step_size,
+            coarse_step_size,
+            *settings
+        )
+        tolerances += _integration_error(
+            coarse_times,
+            times,
+            step_size,
+            coarse_step_size
+        )
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomically(
+            path,
+            {'targets': targets, 'times': times, 'tolerances': tolerances}
+        )
+    return EnduranceCurve(targets, times, tolerances)
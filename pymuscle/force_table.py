@@ -0,0 +1,175 @@
+"""
+Tabulated excitation to force relationship for muscles without fatigue.
+
+When neither central nor peripheral fatigue is applied the output of a
+Potvin & Fuglevand style muscle depends only on the current excitation. This
+module precomputes that relationship so repeated steps can be served by an
+interpolated lookup.
+"""
+import numpy as np
+from numpy import ndarray
+
+from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+
+
+class ExcitationForceTable(object):
+    """
+    Precomputed map from a single excitation value to the total force of a
+    muscle with fatigue disabled.
+
+    The table is sampled on a uniform grid plus every excitation at which a
+    motor unit is recruited, saturates its firing rate or leaves the linear
+    region of the force curve. Recruitment is a discontinuity so each interval
+    stores the force at its start and the limit of the force at its end.
+    Between breakpoints the force is smooth. With the default resolution
+    linear interpolation has a relative error below 1e-6 of the exact total
+    force (below 2e-8 of the maximum force) for muscles of up to a few
+    thousand motor units.
+
+    Building the table evaluates every motor unit at every sample point so
+    cost grows with the square of the motor unit count.
+
+    :param pool: A motor neuron pool with fatigue disabled.
+    :param fibers: A muscle fibers model with fatigue disabled.
+    :param resolution: Number of uniformly spaced sample points.
+
+    Usage::
+
+      from pymuscle import PotvinFuglevandMuscle as Muscle
+      from pymuscle.force_table import ExcitationForceTable
+
+      muscle = Muscle(120, False, False)
+      table = ExcitationForceTable(muscle._pool, muscle._fibers)
+      total_force = table.total_force(40.0)
+    """
+    # Limits the size of the temporary (points x motor units) arrays
+    _chunk_elements = 2 ** 20
+
+    # Relative distance below a breakpoint used to evaluate left limits
+    _limit_offset = 1e-10
+
+    def __init__(
+        self,
+        pool: PotvinFuglevand2017MotorNeuronPool,
+        fibers: PotvinFuglevand2017MuscleFibers,
+        resolution: int = 4096
+    ):
+        assert pool.motor_unit_count == fibers.motor_unit_count
+        self._pool = pool
+        self._fibers = fibers
+
+        points = self._calc_sample_points(resolution)
+        # Force at the start of each interval and the limit approaching
+        # the start of the next interval from below. The offset must be
+        # large enough to survive rounding in the recruitment test.
+        starts = self._calc_total_forces(points)
+        offset = self._limit_offset * np.maximum(points[1:], 1.0)
+        limits = np.maximum(points[1:] - offset, points[:-1])
+        ends = self._calc_total_forces(limits)
+
+        self._points = points
+        self._starts = starts
+        self._ends = ends
+
+    @property
+    def nbytes(self) -> int:
+        return self._points.nbytes + self._starts.nbytes + self._ends.nbytes
+
+    def _calc_sample_points(self, resolution: int) -> ndarray:
+        """
+        Returns a sorted array of excitations including all the points at
+        which the total force is not smooth.
+
+        :param resolution: Number of uniformly spaced sample points.
+        """
+        pool = self._pool
+        thresholds = pool._recruitment_thresholds
+        # Excitation at which each unit reaches its peak firing rate
+        saturations = thresholds - pool._min_firing_rate \
+            + pool._peak_firing_rates / pool._firing_gain
+        saturations = np.maximum(saturations, thresholds)
+
+        # Normalized firing rates are linear in excitation between
+        # recruitment and saturation. Find where each crosses into the
+        # non-linear region of the force curve. Each unit is evaluated at
+        # its own recruitment and saturation excitation.
+        linear_threshold = 0.4
+        at_thresholds = self._calc_normalized_firing_rates(thresholds)
+        at_saturations = self._calc_normalized_firing_rates(saturations)
+        crossing = (at_thresholds < linear_threshold) & (at_saturations > linear_threshold)
+        fractions = (linear_threshold - at_thresholds[crossing]) \
+            / (at_saturations[crossing] - at_thresholds[crossing])
+        transitions = thresholds[crossing] \
+            + fractions * (saturations[crossing] - thresholds[crossing])
+
+        uniform = np.linspace(0.0, np.max(saturations), resolution)
+        return np.unique(np.concatenate(
+            (uniform, thresholds, saturations, transitions)
+        ))
+
+    def _calc_normalized_firing_rates(self, excitations: ndarray) -> ndarray:
+        """
+        Side effect free evaluation of the pool and fiber stages up to the
+        normalized firing rates.
+
+        :param excitations:
+            Array of excitations whose last dimension is either 1 or the
+            number of motor units.
+        """
+        firing_rates = self._pool._calc_firing_rates(excitations)
+        adapted_firing_rates = firing_rates - self._pool._calc_adaptations(firing_rates)
+        return self._fibers._normalize_firing_rates(adapted_firing_rates)
+
+    def _calc_unit_forces(self, excitations: ndarray) -> ndarray:
+        """
+        Side effect free evaluation of the per motor unit forces.
+
+        :param excitations:
+            Array of excitations whose last dimension is either 1 or the
+            number of motor units.
+        """
+        normalized_firing_rates = self._calc_normalized_firing_rates(excitations)
+        normalized_forces = self._fibers._calc_normalized_forces(normalized_firing_rates)
+        return normalized_forces * self._fibers.current_peak_forces
+
+    def _calc_total_forces(self, excitations: ndarray) -> ndarray:
+        """
+        Evaluates the exact total force for each of the given excitations.
+
+        :param excitations: 1D array of excitation levels.
+        """
+        chunk = max(1, self._chunk_elements // self._pool.motor_unit_count)
+        totals = np.empty(len(excitations))
+        for start in range(0, len(excitations), chunk):
+            stop = start + chunk
+            column = excitations[start:stop, np.newaxis]
+            totals[start:stop] = np.sum(self._calc_unit_forces(column), axis=1)
+
+        return totals
+
+    def total_force(self, excitation: float) -> float:
+        """
+        Returns the interpolated total force for the given excitation.
+
+        :param excitation: A single excitation value for every motor unit.
+        """
+        points = self._points
+        i = int(np.searchsorted(points, excitation, side='right')) - 1
+        if i < 0:
+            return 0.0
+        if i >= len(self._ends):
+            return float(self._starts[-1])
+
+        fraction = (excitation - points[i]) / (points[i + 1] - points[i])
+        start = self._starts[i]
+        return float(start + fraction * (self._ends[i] - start))
+
+    def unit_forces(self, excitation: float) -> ndarray:
+        """
+        Returns the exact force of each motor unit for the given excitation.
+
+        :param excitation: A single excitation value for every motor unit.
+        """
+        excitations = np.full(self._pool.motor_unit_count, float(excitation))
+        return self._calc_unit_forces(excitations)
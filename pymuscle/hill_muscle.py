@@ -0,0 +1,212 @@
+"""
+Muscles whose output is modulated by the Hill-type force-length and
+force-velocity relationships.
+"""
+import numpy as np
+from numpy import ndarray
+from typing import Optional, Sequence, Union
+
+from .muscle import Muscle
+from .muscle_group import MuscleGroup
+from .tendon import SeriesElasticTendon
+from .hill_type import (
+    contractile_element_force_length_curve,
+    contractile_element_force_velocity_curve
+)
+
+
+class HillMuscle(object):
+    """
+    Wraps a :class:`Muscle <pymuscle.Muscle>` and scales its output by the
+    force-length and force-velocity multipliers for the current muscle
+    length. The rest length and the length at the previous step are tracked
+    here so callers only pass in the current length.
+
+    :param muscle: The muscle whose output will be modulated.
+    :param rest_length: The resting length of the muscle.
+    :param initial_length:
+        Length of the muscle before the first step. Defaults to rest_length.
+    :param curve_width_factor: See contractile_element_force_length_curve()
+    :param peak_force_length: See contractile_element_force_length_curve()
+    :param max_velocity: See contractile_element_force_velocity_curve()
+    :param max_exccentric_multiple:
+        See contractile_element_force_velocity_curve()
+
+    Usage::
+
+      from pymuscle import StandardMuscle, HillMuscle
+
+      muscle = HillMuscle(StandardMuscle(), rest_length=30.0)
+      force = muscle.step(31.5, 0.5, 1 / 50.0)
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        rest_length: float,
+        initial_length: Optional[float] = None,
+        curve_width_factor: float = 17.33,
+        peak_force_length: float = 1.1,
+        max_velocity: float = 3.0,
+        max_exccentric_multiple: float = 1.8
+    ):
+        self.muscle = muscle
+        self.rest_length = rest_length
+        self.prev_length = rest_length if initial_length is None else initial_length
+
+        # Assign non-public attributes
+        self._curve_width_factor = curve_width_factor
+        self._peak_force_length = peak_force_length
+        self._max_velocity = max_velocity
+        self._max_exccentric_multiple = max_exccentric_multiple
+
+    def step(
+        self,
+        length: float,
+        motor_pool_input: Union[int, float, ndarray],
+        step_size: float
+    ) -> float:
+        """
+        Advances the muscle one step and returns its length and velocity
+        modulated output.
+
+        :param length: The current length of the muscle.
+        :param motor_pool_input: Input to the wrapped muscle's step().
+        :param step_size: How far to advance the simulation in time.
+        """
+        output = self.muscle.step(motor_pool_input, step_size)
+        force_length = contractile_element_force_length_curve(
+            self.rest_length,
+            length,
+            self._curve_width_factor,
+            self._peak_force_length
+        )
+        force_velocity = contractile_element_force_velocity_curve(
+            self.rest_length,
+            length,
+            self.prev_length,
+            step_size,
+            self._max_velocity,
+            self._max_exccentric_multiple
+        )
+        self.prev_length = length
+        return output * force_length * force_velocity
+
+
+class HillMuscleGroup(object):
+    """
+    Batched equivalent of :class:`HillMuscle <HillMuscle>`. Muscles are
+    stepped together through a :class:`MuscleGroup <pymuscle.MuscleGroup>`
+    and the length and velocity multipliers for all of them are evaluated in
+    one vectorized call.
+
+    Curve parameters may be scalars or arrays with one value per muscle.
+
+    If tendon slack lengths are given each muscle is in series with a
+    compliant tendon. Lengths passed to step() are then whole musculotendon
+    lengths and fiber lengths are solved by a
+    :class:`SeriesElasticTendon <pymuscle.tendon.SeriesElasticTendon>`
+    available as the tendon attribute.
+
+    :param muscles:
+        The muscles whose output will be modulated. See MuscleGroup for the
+        restrictions on grouping.
+    :param rest_lengths: The resting length of each muscle.
+    :param initial_lengths:
+        Length of each muscle before the first step. Defaults to
+        rest_lengths.
+    :param curve_width_factor: See contractile_element_force_length_curve()
+    :param peak_force_length: See contractile_element_force_length_curve()
+    :param max_velocity: See contractile_element_force_velocity_curve()
+    :param max_exccentric_multiple:
+        See contractile_element_force_velocity_curve()
+    :param tendon_slack_lengths:
+        Optional length at which each muscle's tendon begins to stretch.
+
+    Usage::
+
+      from pymuscle import StandardMuscle, HillMuscleGroup
+
+      muscles = [StandardMuscle(32.0), StandardMuscle(90.0)]
+      group = HillMuscleGroup(muscles, rest_lengths=[5.0, 30.0])
+      forces = group.step([5.1, 29.0], [0.5, 0.2], 1 / 50.0)
+    """
+    def __init__(
+        self,
+        muscles: Sequence[Muscle],
+        rest_lengths: Union[Sequence[float], ndarray],
+        initial_lengths: Optional[Union[Sequence[float], ndarray]] = None,
+        curve_width_factor: Union[float, ndarray] = 17.33,
+        peak_force_length: Union[float, ndarray] = 1.1,
+        max_velocity: Union[float, ndarray] = 3.0,
+        max_exccentric_multiple: Union[float, ndarray] = 1.8,
+        tendon_slack_lengths: Optional[Union[Sequence[float], ndarray]] = None
+    ):
+        self.muscle_group = MuscleGroup(muscles)
+        shape = (self.muscle_group.muscle_count,)
+        self.rest_lengths = np.array(np.broadcast_to(rest_lengths, shape), dtype=float)
+        if initial_lengths is None:
+            initial_lengths = self.rest_lengths
+        self.prev_lengths = np.array(np.broadcast_to(initial_lengths, shape), dtype=float)
+
+        # Assign non-public attributes
+        self._curve_width_factor = curve_width_factor
+        self._peak_force_length = peak_force_length
+        self._max_velocity = max_velocity
+        self._max_exccentric_multiple = max_exccentric_multiple
+        self._force_length = np.empty(shape)
+        self._force_velocity = np.empty(shape)
+
+        self.tendon: Optional[SeriesElasticTendon] = None
+        if tendon_slack_lengths is not None:
+            self.tendon = SeriesElasticTendon(
+                self.rest_lengths,
+                tendon_slack_lengths,
+                curve_width_factor=curve_width_factor,
+                peak_force_length=peak_force_length,
+                max_velocity=max_velocity,
+                max_exccentric_multiple=max_exccentric_multiple
+            )
+
+    def step(
+        self,
+        lengths: Union[Sequence[float], ndarray],
+        excitations: Union[float, Sequence[float], ndarray],
+        step_size: float
+    ) -> ndarray:
+        """
+        Advances all muscles one step and returns their length and velocity
+        modulated outputs.
+
+        With a tendon, outputs are multiples of the maximum isometric force.
+
+        :param lengths:
+            The current length of each muscle, or of each muscle and tendon
+            if tendons are in use.
+        :param excitations: A single input for all muscles or one per muscle.
+        :param step_size: How far to advance the simulation in time.
+        """
+        lengths = np.asarray(lengths, dtype=float)
+        outputs = self.muscle_group.step(excitations, step_size)
+        if self.tendon is not None:
+            return self.tendon.step(lengths, outputs, step_size)
+
+        contractile_element_force_length_curve(
+            self.rest_lengths,
+            lengths,
+            self._curve_width_factor,
+            self._peak_force_length,
+            out=self._force_length
+        )
+        contractile_element_force_velocity_curve(
+            self.rest_lengths,
+            lengths,
+            self.prev_lengths,
+            step_size,
+            self._max_velocity,
+            self._max_exccentric_multiple,
+            out=self._force_velocity
+        )
+        self.prev_lengths[:] = lengths
+        outputs *= self._force_length
+        outputs *= self._force_velocity
+        return outputs
@@ -11,19 +11,72 @@ make sure their physics simulator is handling forces correctly to provide values
 which vary by angle.
 """
 import numpy as np
+from numpy import ndarray
+from typing import Optional, Tuple, Union
+
+FloatOrArray = Union[float, ndarray]
+
+
+def _force_length_multiplier(
+    norm_length: FloatOrArray,
+    curve_width_factor: FloatOrArray,
+    peak_force_length: FloatOrArray,
+    out: Optional[ndarray] = None
+) -> FloatOrArray:
+    """
+    Force-length relationship in terms of length normalized to rest length.
+
+    :param norm_length: Current length divided by resting length.
+    :param curve_width_factor: See contractile_element_force_length_curve()
+    :param peak_force_length: See contractile_element_force_length_curve()
+    :param out: Optional array to write results into.
+    """
+    distance = np.subtract(norm_length, peak_force_length, out=out)
+    distance = np.abs(distance, out=out)
+    exponent = np.power(distance, 3, out=out)
+    exponent = np.multiply(exponent, np.negative(curve_width_factor), out=out)
+    return np.exp(exponent, out=out)
+
+
+def _force_velocity_multiplier(
+    norm_velocity: FloatOrArray,
+    max_exccentric_multiple: FloatOrArray,
+    out: Optional[ndarray] = None
+) -> FloatOrArray:
+    """
+    Force-velocity relationship in terms of shortening velocity normalized
+    to maximum velocity.
+
+    :param norm_velocity:
+        Shortening velocity in rest lengths per second divided by the
+        maximum velocity.
+    :param max_exccentric_multiple:
+        See contractile_element_force_velocity_curve()
+    :param out: Optional array to write results into.
+    """
+    exponent = np.subtract(0.04, norm_velocity, out=out)  # Values to make (0, 1)
+    exponent = np.divide(exponent, 0.18, out=out)
+    denominator = np.exp(exponent, out=out)
+    denominator = np.add(denominator, 1, out=out)
+    force_multiple = np.divide(max_exccentric_multiple, denominator, out=out)
+    return np.subtract(max_exccentric_multiple, force_multiple, out=out)
 
 
 def contractile_element_force_length_curve(
-    rest_length: float,
-    current_length: float,
-    curve_width_factor: float=17.33,
-    peak_force_length: float=1.1
-) -> float:
+    rest_length: FloatOrArray,
+    current_length: FloatOrArray,
+    curve_width_factor: FloatOrArray = 17.33,
+    peak_force_length: FloatOrArray = 1.1,
+    out: Optional[ndarray] = None
+) -> FloatOrArray:
     """
     This normalizes length to the resting length of the tendon
     Anderson and others normalize by the length that would generate the
     most force. This is a gaussian-like relationship.
 
+    All arguments may be scalars or arrays which broadcast against each
+    other, for example to evaluate every muscle in a body in one call.
+
     :param rest_length: The resting length of the muscle
     :param current_length: The current length of the muscle
     :param curve_width_factor:
@@ -33,35 +86,111 @@ def contractile_element_force_length_curve(
     :param peak_force_length:
         The ratio of the length of the muscle when it can generate maximum
         contractile force (sometimes known as the optimal length) and the
-        resting length of the muscle.
+        resting length of the muscle. Default from Aubert 1951.
+    :param out:
+        Optional array, of the broadcast shape of the inputs, to write
+        results into.
     """
-    norm_length = current_length / rest_length
-    peak_force_length = 1.10  # Aubert 1951
-    exponent = curve_width_factor * (-1 * (abs(norm_length - peak_force_length) ** 3))
-    percentage_of_max_force = np.exp(exponent)
-    return percentage_of_max_force
+    norm_length = np.divide(current_length, rest_length, out=out)
+    return _force_length_multiplier(
+        norm_length,
+        curve_width_factor,
+        peak_force_length,
+        out=out
+    )
 
 
 def contractile_element_force_velocity_curve(
-    rest_length: float,
-    current_length: float,
-    prev_length: float,
+    rest_length: FloatOrArray,
+    current_length: FloatOrArray,
+    prev_length: FloatOrArray,
     time_step: float,
-    max_velocity: float = 3.0,
-    max_exccentric_multiple: float = 1.8
-) -> float:
+    max_velocity: FloatOrArray = 3.0,
+    max_exccentric_multiple: FloatOrArray = 1.8,
+    out: Optional[ndarray] = None
+) -> FloatOrArray:
     """
     Returns a value (0 < value < max_eccentric_multiple). This is a sigmoidal
     relationship.
 
+    All arguments may be scalars or arrays which broadcast against each
+    other, for example to evaluate every muscle in a body in one call.
+
     :param rest_length: The resting length of the muscle
     :param current_length: The current length of the muscle
+    :param prev_length: The length of the muscle at the previous step
+    :param time_step: Time elapsed between the previous and current lengths
+    :param max_velocity: Maximum shortening velocity in rest lengths / second
+    :param max_exccentric_multiple:
+        Multiple of isometric force produced at high lengthening velocities
+    :param out:
+        Optional array, of the broadcast shape of the inputs, to write
+        results into.
 
     See https://www.desmos.com/calculator/gkcdsdcuyh for graph
     """
-    velocity = ((prev_length - current_length) / rest_length) / time_step
-    norm_velocity = velocity / max_velocity
-    exponent = (0.04 - norm_velocity) / 0.18  # Values to make (0, 1)
-    denominator = 1 + np.exp(exponent)
-    force_multiple = max_exccentric_multiple - (max_exccentric_multiple / denominator)
-    return force_multiple
+    velocity = np.subtract(prev_length, current_length, out=out)
+    velocity = np.divide(velocity, rest_length, out=out)
+    velocity = np.divide(velocity, time_step, out=out)
+    norm_velocity = np.divide(velocity, max_velocity, out=out)
+    return _force_velocity_multiplier(
+        norm_velocity,
+        max_exccentric_multiple,
+        out=out
+    )
+
+
+def contractile_element_trajectory_multipliers(
+    rest_length: FloatOrArray,
+    lengths: ndarray,
+    time_step: float,
+    initial_length: Optional[FloatOrArray] = None,
+    curve_width_factor: FloatOrArray = 17.33,
+    peak_force_length: FloatOrArray = 1.1,
+    max_velocity: FloatOrArray = 3.0,
+    max_exccentric_multiple: FloatOrArray = 1.8
+) -> Tuple[ndarray, ndarray]:
+    """
+    Evaluates the force-length and force-velocity multipliers along whole
+    length trajectories.
+
+    Returns a tuple of (force-length, force-velocity) arrays with the same
+    shape as lengths.
+
+    :param rest_length:
+        The resting length of the muscle(s). Must broadcast against a single
+        time step of lengths.
+    :param lengths:
+        Array of muscle lengths with time along the first axis. Further axes
+        may hold multiple muscles.
+    :param time_step: Time elapsed between consecutive lengths.
+    :param initial_length:
+        Length of the muscle(s) before the first entry of lengths. By default
+        the first length is used, giving zero velocity at the first step.
+    :param curve_width_factor: See contractile_element_force_length_curve()
+    :param peak_force_length: See contractile_element_force_length_curve()
+    :param max_velocity: See contractile_element_force_velocity_curve()
+    :param max_exccentric_multiple:
+        See contractile_element_force_velocity_curve()
+    """
+    lengths = np.asarray(lengths, dtype=float)
+    prev_lengths = np.empty_like(lengths)
+    prev_lengths[0] = lengths[0] if initial_length is None else initial_length
+    prev_lengths[1:] = lengths[:-1]
+
+    force_length = contractile_element_force_length_curve(
+        rest_length,
+        lengths,
+        curve_width_factor,
+        peak_force_length
+    )
+    force_velocity = contractile_element_force_velocity_curve(
+        rest_length,
+        lengths,
+        prev_lengths,
+        time_step,
+        max_velocity,
+        max_exccentric_multiple,
+        out=prev_lengths
+    )
+    return force_length, force_velocity
@@ -1,10 +1,34 @@
+import numpy as np
+from copy import copy
 from numpy import ndarray
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 
 class Model(object):
     """
     Base model class from which other models should inherit
     """
+    # Names of per motor unit array attributes which change as the model
+    # steps. All other array attributes are treated as derived parameters.
+    _state_attributes: Tuple[str, ...] = ()
+
+    # Names of state attributes which _sync_state() recalculates from the
+    # rest of the state.
+    _derived_state_attributes: Tuple[str, ...] = ()
+
+    # Names of non-array attributes which change as the model steps.
+    _scalar_state_attributes: Tuple[str, ...] = ()
+
+    # Names of per motor unit array attributes which add up across motor
+    # units, such as forces. All other per unit attributes are averaged when
+    # motor units are merged by _reduce().
+    _extensive_attributes: Tuple[str, ...] = ()
+
+    # Names of attributes derived from parameters and the step size. They
+    # are rebuilt by _prepare_step() only when the step size changes.
+    _step_cache_attributes: Tuple[str, ...] = ()
+    _cached_step_size: Optional[float] = None
+
     def __init__(
         self,
         motor_unit_count: int
@@ -16,3 +40,401 @@ class Model(object):
         Child classes must implement this method.
         """
         raise NotImplementedError
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Returns the number of bytes held in arrays by this model split into
+        derived parameters and mutable state.
+        """
+        report = {'parameters': 0, 'state': 0}
+        for name, value in vars(self).items():
+            if not isinstance(value, ndarray):
+                continue
+            if name in self._state_attributes:
+                report['state'] += value.nbytes
+            else:
+                report['parameters'] += value.nbytes
+
+        return report
+
+    @staticmethod
+    def _motor_unit_indices(
+        motor_unit_count: Union[int, Sequence[int]]
+    ) -> Tuple[ndarray, Union[int, ndarray]]:
+        """
+        Returns the 1 based index of each motor unit within its muscle and
+        the motor unit count of its muscle.
+
+        Given a sequence of counts the motor units of several muscles are
+        laid out one muscle after another. Parameter calculations written in
+        terms of these indices then build every muscle in one pass.
+
+        :param motor_unit_count:
+            The number of motor units in the muscle, or in each muscle.
+        """
+        if np.ndim(motor_unit_count) == 0:
+            return np.arange(1, motor_unit_count + 1), motor_unit_count
+
+        counts = np.asarray(motor_unit_count, dtype=int)
+        offsets = np.cumsum(counts) - counts
+        indices = np.arange(1, np.sum(counts) + 1) - np.repeat(offsets, counts)
+        return indices, np.repeat(counts, counts)
+
+    def _prepare_step(self, step_size: float) -> None:
+        """
+        Rebuilds the step size dependent caches if the step size has
+        changed since they were last built.
+
+        :param step_size: How far time will advance in the coming step.
+        """
+        if step_size != self._cached_step_size:
+            self._build_step_cache(step_size)
+            self._cached_step_size = step_size
+
+    def _build_step_cache(self, step_size: float) -> None:
+        """
+        Builds the attributes named in _step_cache_attributes. Child classes
+        with step size dependent caches must implement this method.
+
+        :param step_size: How far time will advance in each step.
+        """
+        pass
+
+    def _per_unit_attributes(self) -> List[str]:
+        """
+        Returns the names of array attributes holding one value per motor unit.
+        Step size caches are excluded as they are rebuilt rather than copied.
+        """
+        return [
+            name for name, value in vars(self).items()
+            if isinstance(value, ndarray)
+            and value.shape[:1] == (self.motor_unit_count,)
+            and name not in self._step_cache_attributes
+        ]
+
+    @staticmethod
+    def _can_concatenate(models: Sequence['Model']) -> bool:
+        """
+        Returns whether the given models can be combined by _concatenate().
+        Models must be of the same type and share all attributes other than
+        their per unit arrays and their state.
+
+        :param models: The models to combine.
+        """
+        first = models[0]
+        names = first._per_unit_attributes()
+
+        def parameter_arrays(model: Model) -> List[str]:
+            # State arrays created on first use may not exist on every model
+            return sorted(
+                name for name in model._per_unit_attributes()
+                if name not in model._state_attributes
+            )
+
+        for model in models:
+            if type(model) is not type(first):
+                return False
+            if parameter_arrays(model) != parameter_arrays(first):
+                return False
+            for name, value in vars(model).items():
+                if name in names or name == 'motor_unit_count' \
+                        or name == '_cached_step_size' \
+                        or name in model._step_cache_attributes \
+                        or name in model._state_attributes \
+                        or name in model._scalar_state_attributes:
+                    continue
+                if not np.all(value == vars(first)[name]):
+                    return False
+
+        return True
+
+    @staticmethod
+    def _concatenate(models: Sequence['Model']) -> 'Model':
+        """
+        Returns a model whose motor units are the motor units of all the
+        given models in order.
+
+        The per unit arrays of the given models are replaced with views into
+        the arrays of the returned model so that all of them share state.
+        Models must be of the same type and share all other attributes apart
+        from scalar state, which each model first settles with
+        _settle_scalar_state().
+
+        :param models: The models to combine.
+        """
+        assert Model._can_concatenate(models), \
+            'Models must be of the same type and share all parameters'
+        for model in models:
+            model._settle_scalar_state()
+        first = models[0]
+        names = first._per_unit_attributes()
+        combined = copy(first)
+        combined.motor_unit_count = sum(m.motor_unit_count for m in models)
+        combined._cached_step_size = None
+        for name in names:
+            arrays = [getattr(m, name) for m in models]
+            storage = Model._stacked_storage(arrays)
+            if storage is None:
+                storage = np.concatenate(arrays)
+            setattr(combined, name, storage)
+
+        start = 0
+        for model in models:
+            stop = start + model.motor_unit_count
+            for name in names:
+                setattr(model, name, getattr(combined, name)[start:stop])
+            start = stop
+
+        return combined
+
+    def _settle_scalar_state(self) -> None:
+        """
+        Brings scalar state to the value a freshly built model would have,
+        folding anything it stands for into the per unit arrays, so that
+        models stepped differently can share one set of scalar state when
+        concatenated. Child classes with scalar state must implement this.
+        """
+        assert not self._scalar_state_attributes
+
+    @staticmethod
+    def _stacked_storage(arrays: Sequence[ndarray]) -> Optional[ndarray]:
+        """
+        Returns a flat view of the buffer the given arrays are the rows of,
+        in order, or None if they are not. See _clone_many().
+
+        :param arrays: Per unit arrays of several models.
+        """
+        base = arrays[0].base
+        if not isinstance(base, ndarray) or base.ndim != 2 \
+                or base.shape[0] != len(arrays) \
+                or not base.flags.c_contiguous:
+            return None
+        for row, array in zip(base, arrays):
+            if array.base is not base or array.shape != row.shape \
+                    or array.ctypes.data != row.ctypes.data:
+                return None
+        return base.reshape(-1)
+
+    def _clone_many(self, count: int) -> List['Model']:
+        """
+        Returns copies of this model which share its parameter arrays and
+        have their own copy of its state.
+
+        Each state array of the copies is one row of a single (count, n)
+        buffer, so _concatenate() can combine the copies without copying
+        their state.
+
+        :param count: Number of copies to make.
+        """
+        assert count > 0
+        clones = [copy(self) for _ in range(count)]
+        for name in self._state_attributes:
+            value = getattr(self, name, None)
+            if not isinstance(value, ndarray):
+                continue
+            buffer = np.empty((count,) + value.shape, dtype=value.dtype)
+            buffer[...] = value
+            for clone, row in zip(clones, buffer):
+                setattr(clone, name, row)
+
+        return clones
+
+    def _split(self, starts: Sequence[int]) -> List['Model']:
+        """
+        Returns models for runs of neighboring motor units. This is the
+        reverse of _concatenate().
+
+        The per unit arrays of the returned models are views into the arrays
+        of this model so stepping a returned model in place advances the
+        state of the matching motor units here.
+
+        :param starts: Sorted index of the first motor unit of each run.
+        """
+        starts = np.asarray(starts, dtype=int)
+        assert starts[0] == 0
+        assert np.all(np.diff(starts) > 0)
+        assert starts[-1] < self.motor_unit_count
+
+        stops = np.append(starts[1:], self.motor_unit_count)
+        names = self._per_unit_attributes()
+        parts = []
+        for start, stop in zip(starts, stops):
+            part = copy(self)
+            part.motor_unit_count = int(stop - start)
+            part._cached_step_size = None
+            for name in names:
+                setattr(part, name, getattr(self, name)[start:stop])
+            # Rebuilt on the first step but sliced so sizes stay consistent
+            for name in self._step_cache_attributes:
+                value = getattr(self, name)
+                if isinstance(value, ndarray) and value.shape[:1] == (self.motor_unit_count,):
+                    setattr(part, name, value[start:stop])
+            parts.append(part)
+
+        return parts
+
+    def _merge(
+        self,
+        name: str,
+        starts: ndarray,
+        weights: Optional[ndarray] = None
+    ) -> ndarray:
+        """
+        Returns one per unit attribute merged over runs of neighboring
+        motor units.
+
+        Extensive attributes of a merged unit are the sums over its members.
+        Boolean attributes are true if true for any member. Other per unit
+        attributes are the weighted means over its members.
+
+        :param name: Name of the attribute to merge.
+        :param starts: Sorted index of the first motor unit of each run.
+        :param weights:
+            Weight of each motor unit in the means. Defaults to equal weights.
+        """
+        value = getattr(self, name)
+        if value.dtype == bool:
+            return np.logical_or.reduceat(value, starts)
+        if name in self._extensive_attributes:
+            return np.add.reduceat(value, starts)
+        if weights is None:
+            weights = np.ones(self.motor_unit_count)
+        return np.add.reduceat(value * weights, starts) / np.add.reduceat(weights, starts)
+
+    def _reduce(
+        self,
+        starts: Sequence[int],
+        weights: Optional[ndarray] = None
+    ) -> 'Model':
+        """
+        Returns a copy of this model in which each run of neighboring motor
+        units is merged into a single representative unit. See _merge().
+
+        :param starts: Sorted index of the first motor unit of each run.
+        :param weights:
+            Weight of each motor unit in the means. Defaults to equal weights.
+        """
+        starts = np.asarray(starts, dtype=int)
+        assert starts[0] == 0
+        assert np.all(np.diff(starts) > 0)
+        assert starts[-1] < self.motor_unit_count
+
+        reduced = copy(self)
+        reduced.motor_unit_count = len(starts)
+        reduced._cached_step_size = None
+        for name in self._per_unit_attributes():
+            setattr(reduced, name, self._merge(name, starts, weights))
+        reduced._sync_state()
+
+        return reduced
+
+    def _project_state(self, reduced: 'Model', starts: Sequence[int]) -> None:
+        """
+        Overwrites the state of a model made by _reduce() with the merged
+        current state of this model. Arrays are updated in place.
+
+        :param reduced: A model made by _reduce() with the same starts.
+        :param starts: Sorted index of the first motor unit of each run.
+        """
+        starts = np.asarray(starts, dtype=int)
+        for name in self._state_attributes:
+            value = getattr(reduced, name, None)
+            if isinstance(value, ndarray) and isinstance(getattr(self, name, None), ndarray):
+                value[:] = self._merge(name, starts)
+        reduced._sync_state()
+
+    def _lift_state(self, reduced: 'Model', starts: Sequence[int]) -> float:
+        """
+        Updates the state of this model so that it agrees with a model made
+        by _reduce() which has since been stepped on its own. This is the
+        reverse of _project_state().
+
+        The state of this model is kept as the reference for how each run's
+        state is spread over its members. Changes to extensive attributes
+        scale every member of a run by the same factor and changes to other
+        attributes shift every member by the same amount. Derived and boolean
+        attributes are left to _sync_state(). Arrays are updated in place.
+
+        Returns the largest remaining difference between the merged lifted
+        state and the reduced state, relative to the largest value of the
+        attribute. It is non-zero only where _sync_state() had to limit or
+        recalculate lifted values.
+
+        :param reduced: A model made by _reduce() with the same starts.
+        :param starts: Sorted index of the first motor unit of each run.
+        """
+        starts = np.asarray(starts, dtype=int)
+        sizes = np.diff(np.append(starts, self.motor_unit_count))
+        names = [
+            name for name in self._state_attributes
+            if isinstance(getattr(self, name, None), ndarray)
+            and isinstance(getattr(reduced, name, None), ndarray)
+            and getattr(self, name).dtype != bool
+            and name not in self._derived_state_attributes
+        ]
+        for name in names:
+            value = getattr(self, name)
+            old = self._merge(name, starts)
+            new = getattr(reduced, name)
+            if name in self._extensive_attributes:
+                # Runs with nothing to scale are split evenly
+                empty = old == 0
+                factors = np.where(empty, 0.0, new / np.where(empty, 1.0, old))
+                value *= np.repeat(factors, sizes)
+                value += np.repeat(np.where(empty, new / sizes, 0.0), sizes)
+            else:
+                value += np.repeat(new - old, sizes)
+
+        self._sync_state()
+
+        error = 0.0
+        for name in names:
+            new = getattr(reduced, name)
+            scale = max(np.max(np.abs(new)), np.finfo(float).tiny)
+            error = max(error, np.max(np.abs(self._merge(name, starts) - new)) / scale)
+        return float(error)
+
+    def _get_state(self) -> Dict[str, Any]:
+        """
+        Returns a copy of all mutable state, including derived state, keyed
+        by attribute name. Attributes which have not been created yet are
+        left out.
+        """
+        state: Dict[str, Any] = {}
+        for name in self._state_attributes:
+            value = getattr(self, name, None)
+            if isinstance(value, ndarray):
+                state[name] = value.copy()
+        for name in self._scalar_state_attributes:
+            state[name] = getattr(self, name)
+        return state
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores state returned by _get_state(). Arrays are updated in place
+        where possible so views into them stay valid. Derived state is
+        restored as given rather than recalculated so that stepping
+        continues exactly as it would have.
+
+        :param state: Attribute values keyed by name.
+        """
+        for name in self._state_attributes:
+            if name not in state:
+                continue
+            current = getattr(self, name, None)
+            value = np.asarray(state[name])
+            if isinstance(current, ndarray) and current.shape == value.shape:
+                current[...] = value
+            else:
+                setattr(self, name, value.copy())
+        for name in self._scalar_state_attributes:
+            if name in state:
+                setattr(self, name, state[name])
+
+    def _sync_state(self) -> None:
+        """
+        Recalculates any state which is derived from other state after it
+        has been changed from outside of step(). Child classes should
+        override this as needed.
+        """
+        pass
@@ -2,13 +2,24 @@
 Contains base Muscle class and its immediate descendants.
 """
 
+import logging
+import time
+import tracemalloc
 import numpy as np
-from typing import Union
+from copy import copy, deepcopy
+from typing import TYPE_CHECKING, Union, Dict, List, Optional, Sequence
 
 from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
 from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool
 from .pymuscle_fibers import PyMuscleFibers
+from .force_table import ExcitationForceTable
 from .model import Model
+from .real_time import RealTimeMode
+
+if TYPE_CHECKING:
+    from .endurance import TaskFailure  # noqa: F401
+
+logger = logging.getLogger(__name__)
 
 
 class Muscle(object):
@@ -23,6 +34,18 @@ class Muscle(object):
     :param muscle_fibers_model:
         The muscle fibers model implementation to use with this muscle.
     :param motor_unit_count: How many motor units comprise this muscle.
+    :param use_force_table:
+        When both models are Potvin & Fuglevand models with fatigue disabled
+        the output of a step depends only on its input. Single valued inputs
+        can then be served from a precomputed
+        :class:`ExcitationForceTable <pymuscle.force_table.ExcitationForceTable>`
+        with per motor unit forces only calculated when read. Building the
+        table costs time which grows with the square of the motor unit
+        count. By default (None) the table is built once a muscle of up to
+        _force_table_max_units motor units has taken enough single valued
+        steps for the table to pay for itself. If True the table is built on
+        the first step whatever the muscle's size and if False it is never
+        used.
 
     Usage::
 
@@ -38,11 +61,20 @@ class Muscle(object):
         excitation = 32.0
         force = muscle.step(excitation, 1 / 50.0)
     """
+    # Muscles with a normalized API multiply their inputs by the input range
+    # and divide their outputs by the output range.
+    _input_range = 1.0
+    _output_range = 1.0
+
+    # Largest muscle which builds a force table without being asked to.
+    # Building takes about 6s at 3800 motor units.
+    _force_table_max_units = 4096
 
     def __init__(
         self,
         motor_neuron_pool_model: Model,
         muscle_fibers_model: Model,
+        use_force_table: Optional[bool] = None
     ):
         assert motor_neuron_pool_model.motor_unit_count == \
             muscle_fibers_model.motor_unit_count
@@ -50,6 +82,21 @@ class Muscle(object):
         self._pool = motor_neuron_pool_model
         self._fibers = muscle_fibers_model
 
+        # Built on first use as it is costly for large muscles
+        self._use_force_table = use_force_table
+        self._force_table: Optional[ExcitationForceTable] = None
+        # Single valued steps which could have used a table. See
+        # _force_table_due()
+        self._table_candidate_steps = 0
+        # Input to the last table step until per unit forces are read
+        self._table_excitation: Optional[float] = None
+
+        # See enable_real_time()
+        self.real_time: Optional[RealTimeMode] = None
+        self._deferred_fatigue_interval = 1
+        self._cached_excitation_step = 0.0
+        self._firing_rate_cache: Optional[Dict[int, np.ndarray]] = None
+
     @property
     def motor_unit_count(self):
         return self._pool.motor_unit_count
@@ -60,8 +107,420 @@ class Muscle(object):
 
     @property
     def current_forces(self):
+        if self._table_excitation is not None:
+            table = self._force_table
+            self._fibers.current_forces = table.unit_forces(self._table_excitation)
+            self._table_excitation = None
         return self._fibers.current_forces
 
+    def _can_use_force_table(self) -> bool:
+        """
+        Whether this muscle's output is currently a pure function of its
+        input and may be served from a force table.
+        """
+        if self._use_force_table is False:
+            return False
+        if self._use_force_table is None \
+                and self.motor_unit_count > self._force_table_max_units:
+            return False
+        return isinstance(self._pool, PotvinFuglevand2017MotorNeuronPool) \
+            and isinstance(self._fibers, PotvinFuglevand2017MuscleFibers) \
+            and not self._pool._apply_fatigue \
+            and not self._fibers._apply_fatigue
+
+    def _force_table_break_even(self) -> int:
+        """
+        Returns the number of single valued steps after which building a
+        force table has paid for itself.
+
+        Building evaluates every motor unit at about resolution + 3n sample
+        points, and a table step saves a little more than a full step
+        costs. Both were measured on StandardMuscles of 28 to 3796 motor
+        units and the constants here fit those measurements.
+        """
+        n = self.motor_unit_count
+        points = 4096 + 3 * n
+        return int(n * points / (375 + 0.2 * n))
+
+    def _force_table_due(self) -> bool:
+        """
+        Whether this step should be served from a force table, counting it
+        towards building one by default.
+        """
+        if self._force_table is not None or self._use_force_table:
+            return True
+        self._table_candidate_steps += 1
+        return self._table_candidate_steps > self._force_table_break_even()
+
+    def _step_from_table(self, excitation: float) -> float:
+        """
+        Returns the total force for a single valued input from the force
+        table. Per motor unit forces are deferred until they are read.
+
+        :param excitation: Input to every motor neuron in the pool.
+        """
+        if self._force_table is None:
+            self._force_table = ExcitationForceTable(self._pool, self._fibers)
+        self._table_excitation = excitation
+        return self._force_table.total_force(excitation)
+
+    def _real_time_levels(self) -> List[str]:
+        """
+        Returns the fidelity levels available to this muscle, most accurate
+        first. Each level also applies the approximations of the levels
+        before it.
+        """
+        levels = ['full']
+        if isinstance(self._fibers, PotvinFuglevand2017MuscleFibers) \
+                and self._fibers._apply_fatigue:
+            levels.append('deferred fatigue')
+        # Without central fatigue firing rates depend only on excitation
+        if isinstance(self._pool, PotvinFuglevand2017MotorNeuronPool) \
+                and not self._pool._apply_fatigue:
+            levels.append('cached firing rates')
+        return levels
+
+    def enable_real_time(
+        self,
+        budget: float,
+        step_size: float = 1 / 50.0,
+        fatigue_interval: int = 5,
+        excitation_resolution: int = 256,
+        calibration_steps: int = 250,
+        **kwargs
+    ) -> RealTimeMode:
+        """
+        Switches on real-time mode. Step latency is measured and when it
+        exceeds the budget the muscle moves to cheaper, less accurate,
+        fidelity levels until it fits. Fidelity is restored when there is
+        headroom again. Switches are logged and recorded in the events of the
+        returned :class:`RealTimeMode <pymuscle.real_time.RealTimeMode>`.
+
+        Available levels, from most to least accurate, are:
+
+        - 'full': The unmodified simulation.
+        - 'deferred fatigue': Fatigue is applied every fatigue_interval steps.
+        - 'cached firing rates': Single valued inputs are rounded to one of
+          excitation_resolution levels whose firing rates are cached.
+
+        The accuracy cost of each level is calibrated by simulating a copy of
+        this muscle through a slowly varying excitation at every level. The
+        cost is the largest difference from the full simulation as a
+        fraction of the largest full output.
+
+        :param budget: Largest acceptable step latency, in seconds.
+        :param step_size: Step size used for calibration.
+        :param fatigue_interval: Steps between fatigue updates when deferred.
+        :param excitation_resolution:
+            Number of cached excitation levels between 0 and max_excitation.
+        :param calibration_steps:
+            Length of the calibration run. If 0 costs are not calibrated.
+        :param kwargs: Passed to RealTimeMode.
+        """
+        self.disable_real_time()
+        assert fatigue_interval >= 1
+        assert excitation_resolution >= 1
+        self._deferred_fatigue_interval = fatigue_interval
+        self._cached_excitation_step = self.max_excitation / excitation_resolution
+
+        levels = self._real_time_levels()
+        errors: List[Optional[float]] = [0.0] + [None] * (len(levels) - 1)
+        if calibration_steps > 0:
+            errors = self._calibrate_real_time_levels(
+                len(levels),
+                step_size,
+                calibration_steps
+            )
+
+        self.real_time = RealTimeMode(budget, levels, errors, **kwargs)
+        return self.real_time
+
+    def disable_real_time(self) -> None:
+        """
+        Switches off real-time mode and restores full fidelity.
+        """
+        self._set_fidelity_level(0)
+        self.real_time = None
+
+    def _calibrate_real_time_levels(
+        self,
+        level_count: int,
+        step_size: float,
+        steps: int
+    ) -> List[float]:
+        """
+        Returns the error of each fidelity level relative to the full
+        simulation. Simulations run on copies so this muscle is unchanged.
+
+        :param level_count: Number of levels to calibrate.
+        :param step_size: How far to advance the simulation in each step.
+        :param steps: Length of the calibration run.
+        """
+        # Two slow rises from rest to maximum excitation
+        phases = np.linspace(0, 4 * np.pi, steps)
+        excitations = self.max_excitation * 0.5 * (1 - np.cos(phases))
+        excitations = [float(e) for e in excitations]
+
+        errors = []
+        for level in range(level_count):
+            reference = deepcopy(self)
+            reference.real_time = None
+            muscle = deepcopy(reference)
+            muscle._set_fidelity_level(level)
+            expected = [reference._step(e, step_size) for e in excitations]
+            actual = [muscle._step(e, step_size) for e in excitations]
+            scale = max(np.max(np.abs(expected)), np.finfo(float).tiny)
+            errors.append(float(np.max(np.abs(np.subtract(actual, expected))) / scale))
+
+        return errors
+
+    def _set_fidelity_level(self, level: int) -> None:
+        """
+        Applies the approximations of the given real-time fidelity level.
+
+        :param level: Index into the available real-time levels.
+        """
+        fibers = self._fibers
+        if isinstance(fibers, PotvinFuglevand2017MuscleFibers):
+            if level >= 1:
+                fibers._fatigue_interval = self._deferred_fatigue_interval
+            else:
+                fibers._flush_fatigue()
+                fibers._fatigue_interval = 1
+
+        levels = self._real_time_levels()
+        if level < len(levels) and levels[level] == 'cached firing rates':
+            if self._firing_rate_cache is None:
+                self._firing_rate_cache = {}
+        else:
+            self._firing_rate_cache = None
+
+    def _update_fidelity(self, latency: float) -> None:
+        """
+        Records a step latency and switches fidelity levels if needed.
+
+        :param latency: Duration of the last step, in seconds.
+        """
+        previous = self.real_time.level
+        level = self.real_time.record(latency)
+        if level is None:
+            return
+
+        self._set_fidelity_level(level)
+        event = self.real_time.events[-1]
+        error = 'unknown' if event['error'] is None \
+            else '{:.3%} of peak output'.format(event['error'])
+        # Losing accuracy deserves more attention than regaining it
+        log = logger.warning if level > previous else logger.info
+        log(
+            'Real-time mode switched from %s to %s at step %d. '
+            'Mean latency %.1f us, budget %.1f us, accuracy cost %s.',
+            event['from'],
+            event['to'],
+            event['step'],
+            event['latency'] * 1e6,
+            self.real_time.budget * 1e6,
+            error
+        )
+
+    def _step_from_firing_rate_cache(
+        self,
+        excitation: float,
+        step_size: float
+    ) -> float:
+        """
+        Rounds a single valued input to the nearest cached excitation level
+        and steps the fibers with that level's firing rates.
+
+        :param excitation: Input to every motor neuron in the pool.
+        :param step_size: How far to advance the simulation in time.
+        """
+        key = int(round(excitation / self._cached_excitation_step))
+        firing_rates = self._firing_rate_cache.get(key)
+        if firing_rates is None:
+            excitations = np.full(
+                self._pool.motor_unit_count,
+                key * self._cached_excitation_step
+            )
+            firing_rates = self._pool.step(excitations, step_size)
+            self._firing_rate_cache[key] = firing_rates
+        return self._fibers.step(firing_rates, step_size)
+
+    def clone(self) -> 'Muscle':
+        """
+        Returns an independent copy of this muscle in its current state.
+
+        Parameter arrays, which stepping never changes, are shared with this
+        muscle rather than copied. Only the mutable state is copied, which
+        makes this much cheaper than copy.deepcopy() for forking a muscle to
+        try out candidate inputs.
+        """
+        return self.clone_many(1)[0]
+
+    def clone_many(self, count: int) -> List['Muscle']:
+        """
+        Returns count independent copies of this muscle. See clone().
+
+        The state of the copies is held in one contiguous (count, n) buffer
+        per state array, with one row per copy. A
+        :class:`MuscleGroup <pymuscle.MuscleGroup>` of the copies steps all
+        candidates together directly on that buffer.
+
+        :param count: Number of copies to make.
+        """
+        pools = self._pool._clone_many(count)
+        fibers = self._fibers._clone_many(count)
+        clones = []
+        for pool, fiber in zip(pools, fibers):
+            clone = copy(self)
+            clone._pool = pool
+            clone._fibers = fiber
+            clone.real_time = deepcopy(self.real_time)
+            clones.append(clone)
+
+        return clones
+
+    def time_to_failure(
+        self,
+        target: float,
+        excitation: Optional[float] = None,
+        step_size: float = 1 / 50.0,
+        **kwargs
+    ) -> 'TaskFailure':
+        """
+        Returns when this muscle, starting from its current state, can no
+        longer hold a target force. The muscle itself is not changed. See
+        :func:`time_to_failure <pymuscle.endurance.time_to_failure>`.
+
+        :param target: Force to hold on this muscle's output scale.
+        :param excitation:
+            Fixed input on this muscle's scale, or None to raise the
+            excitation as needed to track the target.
+        :param step_size: Step size of the simulation being approximated.
+        :param kwargs: See pymuscle.endurance.time_to_failure
+        """
+        # Imported here as the endurance module builds on this one
+        from .endurance import time_to_failure
+        return time_to_failure(self, target, excitation, step_size, **kwargs)
+
+    def _get_state(self) -> Dict[str, Dict]:
+        """
+        Returns a copy of the mutable state of the muscle and its models.
+        """
+        return {
+            'muscle': {'_table_excitation': self._table_excitation},
+            'pool': self._pool._get_state(),
+            'fibers': self._fibers._get_state()
+        }
+
+    def _set_state(self, state: Dict[str, Dict]) -> None:
+        """
+        Restores state returned by _get_state().
+
+        :param state: Mutable state of the muscle and its models.
+        """
+        self._table_excitation = state['muscle'].get('_table_excitation')
+        self._pool._set_state(state['pool'])
+        self._fibers._set_state(state['fibers'])
+
+    def memory_report(
+        self,
+        excitation: Optional[Union[int, float, np.ndarray]] = None,
+        step_size: float = 1 / 50.0
+    ) -> Dict[str, float]:
+        """
+        Returns an accounting, in bytes, of the memory used by this muscle.
+
+        'parameters' are the derived per motor unit arrays which do not change
+        after construction and 'state' the arrays which are updated as the
+        muscle steps. If an excitation is given 'scratch' is the peak memory
+        allocated for temporaries during a single step() at that excitation.
+
+        :param excitation:
+            Input used to measure scratch allocations. If None scratch is not
+            measured and is reported as 0.
+        :param step_size: Step size used to measure scratch allocations.
+        """
+        pool_report = self._pool.memory_report()
+        fibers_report = self._fibers.memory_report()
+        parameters = pool_report['parameters'] + fibers_report['parameters']
+        state = pool_report['state'] + fibers_report['state']
+        if self._force_table is not None:
+            parameters += self._force_table.nbytes
+
+        scratch = 0
+        if excitation is not None:
+            scratch = self.measure_step_allocation(excitation, step_size)
+
+        total = parameters + state + scratch
+        return {
+            'motor_unit_count': self.motor_unit_count,
+            'parameters': parameters,
+            'state': state,
+            'scratch': scratch,
+            'total': total,
+            'per_motor_unit': total / self.motor_unit_count
+        }
+
+    def measure_step_allocation(
+        self,
+        motor_pool_input: Union[int, float, np.ndarray],
+        step_size: float,
+        steps: int = 1
+    ) -> int:
+        """
+        Returns the peak number of bytes allocated by any single step() as
+        measured by tracemalloc.
+
+        Steps are taken on a copy of this muscle so its state is unchanged.
+        An unmeasured step is taken first so one-off allocations, such as
+        building a force table, are not counted.
+
+        Each step is measured in a tracing session of its own. If the caller
+        is already tracing, its session is kept running and its peak is
+        reset, except before Python 3.9 where tracemalloc.reset_peak() is
+        missing. There the caller's session is stopped for the measurement
+        and restarted afterwards, which discards its earlier traces.
+
+        :param motor_pool_input: Input to the muscle for every measured step.
+        :param step_size: How far to advance the simulation in each step.
+        :param steps: How many steps to measure.
+        """
+        muscle = deepcopy(self)
+        muscle.step(deepcopy(motor_pool_input), step_size)
+
+        # tracemalloc.reset_peak() is only available from Python 3.9
+        reset_peak = getattr(tracemalloc, 'reset_peak', None)
+        caller_frames = None
+        if tracemalloc.is_tracing() and reset_peak is None:
+            caller_frames = tracemalloc.get_traceback_limit()
+            tracemalloc.stop()
+        # If the caller is still tracing we must not stop it
+        was_tracing = tracemalloc.is_tracing()
+
+        peak = 0
+        try:
+            for _ in range(steps):
+                # Copy the input as some step() implementations scale in place
+                step_input = deepcopy(motor_pool_input)
+                if was_tracing:
+                    reset_peak()
+                else:
+                    tracemalloc.start()
+                try:
+                    baseline, _ = tracemalloc.get_traced_memory()
+                    muscle.step(step_input, step_size)
+                    _, step_peak = tracemalloc.get_traced_memory()
+                finally:
+                    if not was_tracing:
+                        tracemalloc.stop()
+                peak = max(peak, step_peak - baseline)
+        finally:
+            if caller_frames is not None:
+                tracemalloc.start(caller_frames)
+
+        return peak
+
     def step(
         self,
         motor_pool_input: Union[int, float, np.ndarray],
@@ -76,10 +535,37 @@ class Muscle(object):
         :param step_size:
             How far to advance the simulation in time for this step.
         """
+        if self.real_time is None:
+            return self._step(motor_pool_input, step_size)
+
+        start = time.perf_counter()
+        output = self._step(motor_pool_input, step_size)
+        self._update_fidelity(time.perf_counter() - start)
+        return output
+
+    def _step(
+        self,
+        motor_pool_input: Union[int, float, np.ndarray],
+        step_size: float
+    ) -> float:
+        """
+        Advances the muscle model one step without latency tracking.
+
+        :param motor_pool_input: See step()
+        :param step_size: See step()
+        """
+        self._table_excitation = None
 
         # Expand a single input to the muscle to a full array
         if isinstance(motor_pool_input, float) or \
            isinstance(motor_pool_input, int):
+            if self._can_use_force_table() and self._force_table_due():
+                return self._step_from_table(float(motor_pool_input))
+            if self._firing_rate_cache is not None:
+                return self._step_from_firing_rate_cache(
+                    float(motor_pool_input),
+                    step_size
+                )
             motor_pool_input = np.full(
                 self._pool.motor_unit_count,
                 motor_pool_input
@@ -96,13 +582,18 @@ class PotvinFuglevandMuscle(Muscle):
     """
     A thin wrapper around :class:`Muscle <Muscle>` which pre-selects the
     Potvin fiber and motor neuron models.
+
+    :param use_force_table:
+        Whether single valued inputs are served from a precomputed force
+        table when fatigue is disabled. See :class:`Muscle <Muscle>`.
     """
 
     def __init__(
         self,
         motor_unit_count: int,
         apply_central_fatigue: bool = True,
-        apply_peripheral_fatigue: bool = True
+        apply_peripheral_fatigue: bool = True,
+        use_force_table: Optional[bool] = None
     ):
         pool = PotvinFuglevand2017MotorNeuronPool(
             motor_unit_count,
@@ -115,7 +606,8 @@ class PotvinFuglevandMuscle(Muscle):
 
         super().__init__(
             motor_neuron_pool_model=pool,
-            muscle_fibers_model=fibers
+            muscle_fibers_model=fibers,
+            use_force_table=use_force_table
         )
 
 
@@ -144,17 +636,23 @@ class StandardMuscle(Muscle):
         convert the desired max_force into a number of motor units which
         make up a muscle. This can result in a large number of motor units
         which may be slow. To improve performance (but diverge from biology)
-        you can change this force conversion factor.
+        you can change this force conversion factor. Alternatively a
+        :class:`ReducedOrderMuscle <pymuscle.ReducedOrderMuscle>` simulates
+        a few representative motor units with a measured loss of accuracy.
 
         Note: It is likely the default value here will change with major
         versions as better biological data is found.
+    :param use_force_table:
+        Whether single valued inputs are served from a precomputed force
+        table when fatigue is disabled. See :class:`Muscle <Muscle>`.
     """
     def __init__(
         self,
         max_force: float = 32.0,
         force_conversion_factor: float = 0.0123,
         apply_central_fatigue: bool = False,
-        apply_peripheral_fatigue: bool = True
+        apply_peripheral_fatigue: bool = True,
+        use_force_table: Optional[bool] = None
     ):
 
         # Maximum voluntary isometric force this muscle will be able to produce
@@ -178,19 +676,104 @@ class StandardMuscle(Muscle):
             apply_fatigue=apply_peripheral_fatigue
         )
 
+        self._assign_models(
+            pool,
+            fibers,
+            use_force_table,
+            sum(fibers._peak_twitch_forces)
+        )
+
+    def _assign_models(
+        self,
+        pool: PotvinFuglevand2017MotorNeuronPool,
+        fibers: PyMuscleFibers,
+        use_force_table: Optional[bool],
+        max_arb_output: float
+    ) -> None:
+        """
+        Completes construction once the models have been built.
+
+        :param pool: The motor neuron pool of this muscle.
+        :param fibers: The muscle fibers of this muscle.
+        :param use_force_table: See StandardMuscle
+        :param max_arb_output: Sum of the peak twitch forces of the fibers.
+        """
         super().__init__(
             motor_neuron_pool_model=pool,
-            muscle_fibers_model=fibers
+            muscle_fibers_model=fibers,
+            use_force_table=use_force_table
         )
 
         # Max output in arbitrary units
-        self.max_arb_output = sum(self._fibers._peak_twitch_forces)
+        self.max_arb_output = max_arb_output
+
+        # Ranges used to normalize inputs and outputs
+        self._input_range = self.max_excitation
+        self._output_range = self.max_arb_output
+
+    @classmethod
+    def from_max_forces(
+        cls,
+        max_forces: Sequence[float],
+        force_conversion_factors: Union[float, Sequence[float]] = 0.0123,
+        apply_central_fatigue: bool = False,
+        apply_peripheral_fatigue: bool = True,
+        use_force_table: Optional[bool] = None
+    ) -> List['StandardMuscle']:
+        """
+        Builds many muscles at once. Returns one muscle per max force.
+
+        Motor unit counts for all muscles are calculated together and every
+        per motor unit parameter is calculated in one pass over the motor
+        units of all muscles. Each muscle's arrays are views into that shared
+        storage. The muscles otherwise behave exactly like muscles built one
+        at a time with the same arguments.
+
+        :param max_forces: Maximum force of each muscle. (Newtons)
+        :param force_conversion_factors:
+            One conversion factor for all muscles or one per muscle.
+        :param apply_central_fatigue: See StandardMuscle
+        :param apply_peripheral_fatigue: See StandardMuscle
+        :param use_force_table: See StandardMuscle
+        """
+        max_forces = np.asarray(max_forces, dtype=float)
+        assert max_forces.ndim == 1 and len(max_forces) > 0
+        factors = np.broadcast_to(force_conversion_factors, max_forces.shape)
+        counts = cls.force_to_motor_unit_count(max_forces, factors)
+
+        pool = PotvinFuglevand2017MotorNeuronPool(
+            counts,
+            apply_fatigue=apply_central_fatigue
+        )
+        fibers = PyMuscleFibers(
+            counts,
+            apply_fatigue=apply_peripheral_fatigue
+        )
+        starts = np.cumsum(counts) - counts
+
+        muscles = []
+        parts = zip(pool._split(starts), fibers._split(starts))
+        for i, (muscle_pool, muscle_fibers) in enumerate(parts):
+            muscle_fibers.force_conversion_factor = float(factors[i])
+            muscle = cls.__new__(cls)
+            muscle.max_force = float(max_forces[i])
+            muscle.force_conversion_factor = float(factors[i])
+            # Summed as in __init__() so outputs are identical
+            muscle._assign_models(
+                muscle_pool,
+                muscle_fibers,
+                use_force_table,
+                sum(muscle_fibers._peak_twitch_forces)
+            )
+            muscles.append(muscle)
+
+        return muscles
 
     @staticmethod
     def force_to_motor_unit_count(
-        max_force: float,
-        conversion_factor: float
-    ) -> int:
+        max_force: Union[float, np.ndarray],
+        conversion_factor: Union[float, np.ndarray]
+    ) -> Union[int, np.ndarray]:
         # This takes the relationship between force production
         # and number of motor units from Fuglevand 93 and solves
         # for motor units given desired force.
@@ -238,7 +821,10 @@ class StandardMuscle(Muscle):
         inner = np.power((n2 / d2), (1 / 4.6))
         d = np.log(inner)  # This is natural log by default (ln)
         muf = 1 / d
-        muc = int(np.ceil(muf))
+        # Arrays of forces give an array of counts
+        muc = np.ceil(muf).astype(int)
+        if np.ndim(muc) == 0:
+            muc = int(muc)
 
         return muc
 
@@ -272,8 +858,8 @@ class StandardMuscle(Muscle):
         """
 
         # Rescale the input to the underlying range for the motor pool
-        motor_pool_input *= self.max_excitation
+        motor_pool_input *= self._input_range
         arb_output = super().step(motor_pool_input, step_size)
         # Rescale the output such that it is in the range 0.0 - 1.0
-        scaled_output = arb_output / self.max_arb_output
+        scaled_output = arb_output / self._output_range
         return scaled_output
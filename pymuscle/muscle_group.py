@@ -0,0 +1,177 @@
+"""
+Steps many muscles at once by concatenating their motor units.
+"""
+import numpy as np
+from numpy import ndarray
+from typing import List, Sequence, Union
+
+from .model import Model
+from .muscle import Muscle
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+
+
+class MuscleGroup(object):
+    """
+    Steps a set of muscles as one by concatenating their motor units into a
+    single motor neuron pool and a single set of muscle fibers. Every stage of
+    the simulation then runs once per step for all muscles rather than once
+    per muscle.
+
+    The grouped muscles keep working on their own. Their state arrays become
+    views into the storage of the group so stepping either the group or an
+    individual muscle advances the same state. Per motor unit forces from a
+    group step are available from the group rather than the muscles.
+
+    Muscles must use the same model classes and share all parameters other
+    than their motor unit counts. Inputs and outputs follow each muscle's own
+    scale, so a group of StandardMuscles takes and returns values from 0.0 to
+    1.0.
+
+    :param muscles: The muscles to group.
+
+    Usage::
+
+      from pymuscle import StandardMuscle, MuscleGroup
+
+      group = MuscleGroup([StandardMuscle(32.0), StandardMuscle(90.0)])
+      forces = group.step([0.5, 0.2], 1 / 50.0)
+    """
+    def __init__(self, muscles: Sequence[Muscle]):
+        assert len(muscles) > 0
+        self.muscles: List[Muscle] = list(muscles)
+
+        counts = np.array([m.motor_unit_count for m in self.muscles])
+        self._counts = counts
+        self._offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        self._pool = Model._concatenate([m._pool for m in self.muscles])
+        self._fibers = Model._concatenate([m._fibers for m in self.muscles])
+
+        self._input_ranges = np.array([m._input_range for m in self.muscles])
+        self._output_ranges = np.array([m._output_range for m in self.muscles])
+
+        # Scratch space for the force of each unit when summing per muscle
+        # totals, so per unit forces stay lazy. See step()
+        self._unit_totals = np.zeros(self._pool.motor_unit_count)
+
+        # Assign public attributes
+        self.muscle_count = len(self.muscles)
+        self.motor_unit_count = self._pool.motor_unit_count
+
+    @staticmethod
+    def can_group(muscles: Sequence[Muscle]) -> bool:
+        """
+        Returns whether the given muscles meet the restrictions on grouping.
+
+        :param muscles: The muscles to group.
+        """
+        return Model._can_concatenate([m._pool for m in muscles]) \
+            and Model._can_concatenate([m._fibers for m in muscles])
+
+    def current_forces(self, index: int) -> ndarray:
+        """
+        Returns the per motor unit forces from the last step for one muscle.
+
+        :param index: Position of the muscle within the group.
+        """
+        start = self._offsets[index]
+        return self._fibers.current_forces[start:start + self._counts[index]]
+
+    def step(
+        self,
+        excitations: Union[float, Sequence[float], ndarray],
+        step_size: float
+    ) -> ndarray:
+        """
+        Advances all muscles one step.
+
+        Returns an array with the output of each muscle.
+
+        :param excitations:
+            A single input for all muscles or one input per muscle. Each
+            input is applied to every motor neuron of its muscle.
+        :param step_size: How far to advance the simulation in time.
+        """
+        firing_rates = self._pool.step(self._unit_inputs(excitations), step_size)
+        total = self._fibers.step(firing_rates, step_size)
+        return self._muscle_totals(total)
+
+    def step_many(
+        self,
+        excitations: Union[float, Sequence[float], ndarray],
+        step_size: float,
+        steps: int
+    ) -> ndarray:
+        """
+        Advances all muscles several steps with the same excitations, for
+        example once per physics frame while a control input is held.
+
+        Returns a (steps, muscle_count) array with the output of each muscle
+        after each step. Results are the same as calling step() once per
+        step, but firing rates are only calculated once, without central
+        fatigue the pool is not stepped again and without any fatigue every
+        step's output is the first's.
+
+        :param excitations: See step()
+        :param step_size: How far to advance the simulation in each step.
+        :param steps: Number of steps to take.
+        """
+        outputs = np.empty((steps, self.muscle_count))
+        if steps == 0:
+            return outputs
+
+        pool = self._pool
+        fibers = self._fibers
+        unit_inputs = self._unit_inputs(excitations)
+        if not pool._apply_fatigue:
+            # Adaptation only changes as recruitment durations grow
+            adapted = pool._calc_adapted_firing_rates(unit_inputs, step_size)
+            if not fibers._apply_fatigue:
+                total = fibers._calc_total_fiber_force(adapted, step_size)
+                outputs[:] = self._muscle_totals(total)
+                return outputs
+            for i in range(steps):
+                total = fibers._calc_total_fiber_force(adapted, step_size)
+                outputs[i] = self._muscle_totals(total)
+            return outputs
+
+        firing_rates = pool._calc_firing_rates(unit_inputs)
+        for i in range(steps):
+            adapted = firing_rates - pool._calc_adaptations(firing_rates)
+            pool._update_recruitment_durations(firing_rates, step_size)
+            total = fibers._calc_total_fiber_force(adapted, step_size)
+            outputs[i] = self._muscle_totals(total)
+        return outputs
+
+    def _unit_inputs(
+        self,
+        excitations: Union[float, Sequence[float], ndarray]
+    ) -> ndarray:
+        """
+        Returns the input to each motor neuron for the given excitations.
+
+        :param excitations: See step()
+        """
+        excitations = np.broadcast_to(excitations, (self.muscle_count,))
+        return np.repeat(excitations * self._input_ranges, self._counts)
+
+    def _muscle_totals(self, total: float) -> ndarray:
+        """
+        Returns the output of each muscle in the last step.
+
+        :param total: Total force of all fibers in the last step.
+        """
+        if self.muscle_count == 1:
+            totals = np.array([total])
+        elif isinstance(self._fibers, PotvinFuglevand2017MuscleFibers):
+            # Sum the step's own forces without building current_forces
+            np.multiply(
+                self._fibers._normalized_forces,
+                self._fibers._step_peak_forces,
+                out=self._unit_totals
+            )
+            totals = np.add.reduceat(self._unit_totals, self._offsets)
+        else:
+            totals = np.add.reduceat(self._fibers.current_forces, self._offsets)
+
+        return totals / self._output_ranges
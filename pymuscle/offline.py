@@ -0,0 +1,213 @@
+"""
+Offline reconstruction of motor unit forces from recorded spike trains.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+
+
+def spike_chunks(
+    spike_times: ndarray,
+    spike_units: ndarray,
+    motor_unit_count: int,
+    sample_rate: float,
+    duration: float,
+    chunk_size: int = 4096
+) -> Iterator[ndarray]:
+    """
+    Bins discharges into per unit spike counts one chunk of samples at a
+    time. Yields arrays of shape (samples, motor_unit_count).
+
+    :param spike_times: Time of each discharge, in seconds.
+    :param spike_units: Motor unit of each discharge.
+    :param motor_unit_count: Number of motor units.
+    :param sample_rate: Samples per second.
+    :param duration: Length of the recording, in seconds.
+    :param chunk_size: Samples per chunk.
+    """
+    sample_count = int(round(duration * sample_rate))
+    samples = np.floor(np.asarray(spike_times) * sample_rate).astype(int)
+    order = np.argsort(samples, kind='stable')
+    samples = samples[order]
+    units = np.asarray(spike_units)[order]
+    for start in range(0, sample_count, chunk_size):
+        stop = min(start + chunk_size, sample_count)
+        lo, hi = np.searchsorted(samples, [start, stop])
+        chunk = np.zeros((stop - start, motor_unit_count))
+        np.add.at(chunk, (samples[lo:hi] - start, units[lo:hi]), 1)
+        yield chunk
+
+
+class TwitchConvolver(object):
+    """
+    Convolves spike trains with each motor unit's twitch,
+    P * t / T * exp(1 - t / T), using FFTs over chunks of samples.
+
+    Direct convolution costs one multiply per sample per kernel sample per
+    unit. Here units whose contraction times T agree to within tolerance
+    share one kernel shape and are transformed together in a single batched
+    FFT. Only the twitch amplitudes P differ within a group, so when only
+    the total force is wanted the weighted spectra of a group are summed
+    before the inverse transform. Chunks are combined by overlap-add, so a
+    recording of any length is processed with memory bounded by the chunk
+    size and the longest twitch.
+
+    Twitches are truncated after twitch_cutoff contraction times. A spike
+    counted at a sample adds the start of its twitch to that sample.
+
+    :param peak_forces: Twitch amplitude of each motor unit.
+    :param contraction_times: Time to peak force of each unit, in milliseconds.
+    :param sample_rate: Samples per second.
+    :param per_unit:
+        Whether to return the force of every unit or only their total.
+    :param tolerance:
+        Largest relative difference between the contraction times of units
+        which share a kernel. Each group uses the geometric mean of its
+        contraction times. Zero groups only identical contraction times.
+    :param twitch_cutoff: Length of each twitch in contraction times.
+
+    Usage::
+
+      from pymuscle.offline import TwitchConvolver, spike_chunks
+
+      convolver = TwitchConvolver.from_fibers(muscle._fibers, 1000.0)
+      chunks = spike_chunks(times, units, muscle.motor_unit_count, 1000.0, 600.0)
+      for forces in convolver.stream(chunks):
+          ...
+    """
+    def __init__(
+        self,
+        peak_forces: ndarray,
+        contraction_times: ndarray,
+        sample_rate: float,
+        per_unit: bool = False,
+        tolerance: float = 0.01,
+        twitch_cutoff: float = 10.0
+    ):
+        peak_forces = np.asarray(peak_forces, dtype=float)
+        contraction_times = np.asarray(contraction_times, dtype=float)
+        assert peak_forces.shape == contraction_times.shape
+        assert tolerance >= 0
+        self.motor_unit_count = len(peak_forces)
+        self.sample_rate = sample_rate
+        self.per_unit = per_unit
+
+        self._peak_forces = peak_forces
+        if tolerance > 0:
+            keys = np.round(np.log(contraction_times) / np.log1p(tolerance))
+        else:
+            keys = contraction_times
+        _, groups = np.unique(keys, return_inverse=True)
+        self._groups: List[ndarray] = [
+            np.flatnonzero(groups == g) for g in range(groups.max() + 1)
+        ]
+        self._kernels: List[ndarray] = []
+        for units in self._groups:
+            # Contraction times are in milliseconds
+            times = contraction_times[units]
+            if tolerance > 0:
+                time = np.exp(np.mean(np.log(times))) / 1000
+            else:
+                time = times[0] / 1000
+            length = int(np.ceil(twitch_cutoff * time * sample_rate)) + 1
+            ratios = np.arange(length) / (time * sample_rate)
+            self._kernels.append(ratios * np.exp(1 - ratios))
+
+        # Kernel spectra by (group, FFT size). Chunks of a stream are
+        # usually the same length so each is transformed only once.
+        self._kernel_spectra: Dict[Tuple[int, int], ndarray] = {}
+
+        # Overlap from earlier chunks, one array per group
+        self._carries: List[Optional[ndarray]] = [None] * len(self._groups)
+
+    @property
+    def group_count(self) -> int:
+        return len(self._groups)
+
+    @classmethod
+    def from_fibers(
+        cls,
+        fibers: PotvinFuglevand2017MuscleFibers,
+        sample_rate: float,
+        **kwargs
+    ) -> 'TwitchConvolver':
+        """
+        Returns a convolver for the rested twitches of a fibers model.
+
+        :param fibers: The fibers whose twitches to use.
+        :param sample_rate: Samples per second.
+        :param kwargs: See TwitchConvolver
+        """
+        return cls(
+            fibers._peak_twitch_forces,
+            fibers._contraction_times,
+            sample_rate,
+            **kwargs
+        )
+
+    def reset(self) -> None:
+        """
+        Forgets the overlap carried over from earlier chunks.
+        """
+        self._carries = [None] * len(self._groups)
+
+    def process(self, spikes: ndarray) -> ndarray:
+        """
+        Returns the force at each sample of a chunk of spike counts, including
+        twitches started in earlier chunks.
+
+        Returns an array of shape (samples, motor_unit_count), or of shape
+        (samples,) unless per_unit is set.
+
+        :param spikes: Spike counts of shape (samples, motor_unit_count).
+        """
+        spikes = np.asarray(spikes, dtype=float)
+        assert spikes.ndim == 2 and spikes.shape[1] == self.motor_unit_count
+        samples = spikes.shape[0]
+        if self.per_unit:
+            out = np.zeros((samples, self.motor_unit_count))
+        else:
+            out = np.zeros(samples)
+
+        for g, (units, kernel) in enumerate(zip(self._groups, self._kernels)):
+            length = samples + len(kernel) - 1
+            size = 1 << max(length - 1, 0).bit_length()
+            kernel_spectrum = self._kernel_spectra.get((g, size))
+            if kernel_spectrum is None:
+                kernel_spectrum = np.fft.rfft(kernel, size)
+                self._kernel_spectra[(g, size)] = kernel_spectrum
+            weighted = spikes[:, units] * self._peak_forces[units]
+            if self.per_unit:
+                spectra = np.fft.rfft(weighted, size, axis=0)
+                full = np.fft.irfft(spectra * kernel_spectrum[:, None], size, axis=0)
+            else:
+                spectrum = np.fft.rfft(weighted.sum(axis=1), size)
+                full = np.fft.irfft(spectrum * kernel_spectrum, size)
+            full = full[:length]
+
+            # Carries are one sample shorter than the kernel, so never
+            # longer than this chunk's result
+            carry = self._carries[g]
+            if carry is not None:
+                full[:len(carry)] += carry
+
+            if self.per_unit:
+                out[:, units] = full[:samples]
+            else:
+                out += full[:samples]
+            self._carries[g] = full[samples:]
+
+        return out
+
+    def stream(self, chunks: Iterable[ndarray]) -> Iterator[ndarray]:
+        """
+        Processes chunks of spike counts in order, yielding the force for
+        each. See process().
+
+        :param chunks: Spike counts of shape (samples, motor_unit_count).
+        """
+        for chunk in chunks:
+            yield self.process(chunk)
@@ -0,0 +1,320 @@
+"""
+Steps many muscles, or one very large muscle, across a pool of threads.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+from numpy import ndarray
+
+from .muscle import Muscle
+
+
+def _balance(costs: Sequence[int], bin_count: int) -> List[List[int]]:
+    """
+    Splits items into bins with roughly equal total cost. Items are placed
+    from most to least costly, each into the bin with the lowest total so far.
+
+    Returns the indices of the items in each non-empty bin.
+
+    :param costs: Cost of each item.
+    :param bin_count: Largest number of bins to use.
+    """
+    bins: List[List[int]] = [[] for _ in range(bin_count)]
+    totals = np.zeros(bin_count)
+    for index in np.argsort(costs, kind='stable')[::-1]:
+        lightest = int(np.argmin(totals))
+        bins[lightest].append(int(index))
+        totals[lightest] += costs[index]
+    return [sorted(b) for b in bins if b]
+
+
+class ThreadedMuscleStepper(object):
+    """
+    Steps a set of muscles by spreading their step() calls over a persistent
+    pool of threads.
+
+    NumPy releases the GIL inside its larger array operations, so muscles
+    with many motor units step in parallel. Muscles are assigned to threads
+    once, balancing the total motor unit count each thread steps. A muscle is
+    only ever stepped by the thread it is assigned to and every step waits
+    for all threads to finish, so no muscle is touched by two threads at
+    once. Outputs are gathered and returned on the calling thread.
+
+    Unlike :class:`MuscleGroup <pymuscle.MuscleGroup>` the muscles may be
+    of any type and need not share parameters. Small muscles gain little as
+    the overhead of handing work to threads outweighs their step.
+
+    :param muscles: The muscles to step. Each may only appear once.
+    :param thread_count:
+        Number of threads to use. Defaults to the number of CPUs, and is
+        never more than the number of muscles.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.parallel import ThreadedMuscleStepper
+
+      muscles = [StandardMuscle(2000.0) for _ in range(40)]
+      with ThreadedMuscleStepper(muscles) as stepper:
+          forces = stepper.step(0.5, 1 / 50.0)
+    """
+    def __init__(
+        self,
+        muscles: Sequence[Muscle],
+        thread_count: Optional[int] = None
+    ):
+        assert len(muscles) > 0
+        assert len(set(id(m) for m in muscles)) == len(muscles), \
+            'Each muscle may only be stepped by one thread'
+        if thread_count is None:
+            thread_count = os.cpu_count() or 1
+        assert thread_count > 0
+
+        self.muscles: List[Muscle] = list(muscles)
+        self.muscle_count = len(self.muscles)
+
+        counts = [m.motor_unit_count for m in self.muscles]
+        self._assignments = _balance(counts, min(thread_count, self.muscle_count))
+        self.thread_count = len(self._assignments)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.thread_count,
+            thread_name_prefix='pymuscle'
+        )
+        # Keeps overlapping calls from stepping the same muscles at once
+        self._lock = threading.Lock()
+
+    def _step_assigned(
+        self,
+        indices: List[int],
+        excitations: Sequence,
+        step_size: float
+    ) -> List[float]:
+        """
+        Steps the muscles assigned to one thread in order.
+
+        :param indices: Positions of the assigned muscles.
+        :param excitations: Input for every muscle.
+        :param step_size: How far to advance the simulation in time.
+        """
+        return [
+            self.muscles[i].step(excitations[i], step_size) for i in indices
+        ]
+
+    def step(
+        self,
+        excitations: Union[float, Sequence, ndarray],
+        step_size: float
+    ) -> ndarray:
+        """
+        Advances all muscles one step.
+
+        Returns an array with the output of each muscle.
+
+        :param excitations:
+            A single input for all muscles or one input per muscle. Each
+            input may be a single value or one value per motor unit.
+        :param step_size: How far to advance the simulation in time.
+        """
+        if np.isscalar(excitations):
+            excitations = [float(excitations)] * self.muscle_count
+        assert len(excitations) == self.muscle_count
+
+        outputs = np.zeros(self.muscle_count)
+        with self._lock:
+            futures = [
+                self._executor.submit(self._step_assigned, indices, excitations, step_size)
+                for indices in self._assignments
+            ]
+            # Let every thread finish before any error is raised
+            wait(futures)
+            for indices, future in zip(self._assignments, futures):
+                outputs[indices] = future.result()
+
+        return outputs
+
+    def close(self) -> None:
+        """
+        Stops the threads. The stepper can not be used afterwards.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'ThreadedMuscleStepper':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TiledMuscleStepper(object):
+    """
+    Steps a single very large muscle in tiles of neighboring motor units
+    spread over a persistent pool of threads.
+
+    A full step walks every per motor unit array once per stage. Once the
+    arrays no longer fit in the CPU caches each stage reloads them from
+    memory. Here the motor units are split into tiles small enough to stay
+    in cache and each tile runs the whole pool, fiber and fatigue chain
+    before the next tile starts. Each thread steps a contiguous run of tiles
+    and the tile totals are summed into the muscle output on the calling
+    thread.
+
+    The tiles hold views into the muscle's state, so the muscle itself
+    advances with every step. Per motor unit forces and deferred fatigue
+    counters are copied back to the muscle after each step, so it can be
+    read or stepped directly in between. Force tables and real-time mode
+    are not used. Outputs match stepping the muscle directly
+    up to the order in which the per unit forces are summed.
+
+    :param muscle: The muscle to step.
+    :param tile_size: Motor units per tile.
+    :param thread_count:
+        Number of threads to use. Defaults to the number of CPUs, and is
+        never more than the number of tiles.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.parallel import TiledMuscleStepper
+
+      muscle = StandardMuscle(100000.0)
+      with TiledMuscleStepper(muscle) as stepper:
+          force = stepper.step(0.5, 1 / 50.0)
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        tile_size: int = 16384,
+        thread_count: Optional[int] = None
+    ):
+        assert tile_size > 0
+        assert muscle.real_time is None
+        if thread_count is None:
+            thread_count = os.cpu_count() or 1
+        assert thread_count > 0
+
+        self.muscle = muscle
+        self.motor_unit_count = muscle.motor_unit_count
+        self.tile_size = tile_size
+
+        # Deferred fatigue must accumulate into the muscle's own storage
+        fibers = muscle._fibers
+        if getattr(fibers, '_fatigue_interval', 1) > 1 \
+                and fibers._pending_fatigue is None:
+            fibers._pending_fatigue = np.zeros(self.motor_unit_count)
+
+        self._starts = np.arange(0, self.motor_unit_count, tile_size)
+        self._pools = muscle._pool._split(self._starts)
+        self._fibers = fibers._split(self._starts)
+        self.tile_count = len(self._starts)
+
+        tiles = np.arange(self.tile_count)
+        runs = np.array_split(tiles, min(thread_count, self.tile_count))
+        self._runs = [run for run in runs if len(run)]
+        self.thread_count = len(self._runs)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.thread_count,
+            thread_name_prefix='pymuscle'
+        )
+        # Keeps overlapping calls from stepping the same tiles at once
+        self._lock = threading.Lock()
+
+    @property
+    def current_forces(self) -> ndarray:
+        """
+        The force produced by each motor unit in the last step.
+        """
+        return self.muscle.current_forces
+
+    def _step_tiles(
+        self,
+        tiles: ndarray,
+        inputs: ndarray,
+        normalized_forces: ndarray,
+        step_size: float
+    ) -> float:
+        """
+        Steps a run of tiles through the whole pool and fiber chain one tile
+        at a time. Returns the sum of their outputs.
+
+        :param tiles: Indices of the tiles to step.
+        :param inputs: Input to every motor neuron of the muscle.
+        :param normalized_forces:
+            Receives the normalized force of every motor unit in the tiles.
+        :param step_size: How far to advance the simulation in time.
+        """
+        total = 0.0
+        for tile in tiles:
+            start = self._starts[tile]
+            stop = start + self._pools[tile].motor_unit_count
+            firing_rates = self._pools[tile].step(inputs[start:stop], step_size)
+            fibers = self._fibers[tile]
+            total += fibers.step(firing_rates, step_size)
+            normalized_forces[start:stop] = fibers._normalized_forces
+        return total
+
+    def step(
+        self,
+        motor_pool_input: Union[int, float, ndarray],
+        step_size: float
+    ) -> float:
+        """
+        Advances the muscle one step. Takes and returns values on the same
+        scale as muscle.step().
+
+        :param motor_pool_input:
+            Either a single value or an array of values representing the
+            excitatory input to the motor neuron pool for this muscle.
+        :param step_size: How far to advance the simulation in time.
+        """
+        inputs = np.broadcast_to(
+            np.multiply(motor_pool_input, self.muscle._input_range),
+            (self.motor_unit_count,)
+        )
+        fibers = self.muscle._fibers
+        # A new array each step as kept by the fibers themselves
+        normalized_forces = np.empty(self.motor_unit_count)
+        with self._lock:
+            self.muscle._table_excitation = None
+            # The muscle may have been stepped directly since the last call
+            for tile in self._fibers:
+                for name in fibers._scalar_state_attributes:
+                    setattr(tile, name, getattr(fibers, name))
+            futures = [
+                self._executor.submit(
+                    self._step_tiles,
+                    run,
+                    inputs,
+                    normalized_forces,
+                    step_size
+                )
+                for run in self._runs
+            ]
+            # Let every thread finish before any error is raised
+            wait(futures)
+            total = sum(future.result() for future in futures)
+
+            # Every tile has taken the same steps so any one holds the
+            # muscle's scalar state
+            for name in fibers._scalar_state_attributes:
+                setattr(fibers, name, getattr(self._fibers[0], name))
+            fibers._normalized_forces = normalized_forces
+            fibers._current_forces_stale = True
+
+        return total / self.muscle._output_range
+
+    def close(self) -> None:
+        """
+        Stops the threads. The stepper can not be used afterwards.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'TiledMuscleStepper':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,6 +1,6 @@
 import numpy as np
 from numpy import ndarray
-from typing import Dict, Any
+from typing import Dict, Any, Sequence, Union
 
 from .model import Model
 
@@ -14,7 +14,10 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
     accompanying Matlab code, the variable name from the Matlab code is used in
     the parentheses.
 
-    :param motor_unit_count: Number of motor units in the muscle (n)
+    :param motor_unit_count:
+        Number of motor units in the muscle (n). A sequence of counts builds
+        the motor units of several muscles one after another in a single
+        pool. See Model._split().
     :param max_recruitment_threshold:
         Max excitation required by a motor unit within the pool before
         firing (RR)
@@ -50,9 +53,13 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
       step_size = 1 / 50.0
       firing_rates = pool.step(excitation, step_size)
     """
+    _state_attributes = ('_recruitment_durations', '_adaptation_decays')
+    _derived_state_attributes = ('_adaptation_decays',)
+    _step_cache_attributes = ('_step_decay',)
+
     def __init__(
         self,
-        motor_unit_count: int,
+        motor_unit_count: Union[int, Sequence[int]],
         max_recruitment_threshold: int = 50,
         firing_gain: float = 1.0,
         min_firing_rate: int = 8,
@@ -76,7 +83,12 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
             self._recruitment_thresholds
         )
 
-        self._recruitment_durations = np.zeros(motor_unit_count)
+        total_count = len(self._recruitment_thresholds)
+        self._recruitment_durations = np.zeros(total_count)
+
+        # exp(-duration / tau) for each unit. Updated incrementally as
+        # durations grow rather than recalculated every step.
+        self._adaptation_decays = np.ones(total_count)
 
         # Assign additional non-public attributes
         self._max_recruitment_threshold = max_recruitment_threshold
@@ -88,8 +100,16 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
         self._max_duration = max_duration
         self._apply_fatigue = apply_fatigue
 
+        # Parameter only terms of the adaptation calculations
+        self._adaptation_ratios = (self._recruitment_thresholds - 1) \
+            / (self._max_recruitment_threshold - 1)
+        self._min_adaptation_decay = np.exp(-max_duration / adaptation_time_constant)
+
+        # Decay multiplier for one step. See _build_step_cache()
+        self._step_decay = 1.0
+
         # Assign public attributes
-        self.motor_unit_count = motor_unit_count
+        self.motor_unit_count = total_count
 
         # Calculate the excitation required to bring the pool to
         # maximum firing.
@@ -172,9 +192,9 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
         firing_rates[below_thresh_indices] = 0
         firing_rates *= gain
 
-        # Check for max values
-        above_peak_indices = firing_rates > peak_firing_rates
-        firing_rates[above_peak_indices] = peak_firing_rates[above_peak_indices]
+        # Check for max values. Excitations may carry leading dimensions
+        # so clip against the peak rates by broadcasting.
+        np.minimum(firing_rates, peak_firing_rates, out=firing_rates)
 
         return firing_rates
 
@@ -193,17 +213,52 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
         if not self._apply_fatigue:
             return
 
+        self._prepare_step(step_size)
         on = firing_rates > 0
         self._recruitment_durations[on] += step_size
+        # Each multiplication rounds, so the relative error against
+        # exp(-duration / tau) grows with the number of steps. The decay
+        # itself shrinks geometrically, so the absolute error, which is what
+        # reaches the adaptations, peaks near one time constant at about
+        # tau / step_size * 1e-16 and then falls away.
+        self._adaptation_decays[on] *= self._step_decay
         # TODO: Enable as a recovery mechanism
         # off = firing_rates = 0
         # self._recruitment_durations[off] -= 0
         # Prevent overflows
         over = self._recruitment_durations > self._max_duration
         self._recruitment_durations[over] = self._max_duration
+        self._adaptation_decays[over] = self._min_adaptation_decay
         # Can't be less than zero
         under = self._recruitment_durations < 0
         self._recruitment_durations[under] = 0
+        self._adaptation_decays[under] = 1.0
+
+    def _build_step_cache(self, step_size: float) -> None:
+        """
+        Caches the factor by which the adaptation decay of an active unit
+        shrinks in one step.
+
+        :param step_size: How far time will advance in each step.
+        """
+        self._step_decay = np.exp(-step_size / self._adaptation_time_constant)
+
+    def _sync_state(self) -> None:
+        """
+        Limits recruitment durations set from outside of step() to their
+        valid range and recalculates the adaptation decays which follow from
+        them.
+        """
+        np.clip(
+            self._recruitment_durations,
+            0,
+            self._max_duration,
+            out=self._recruitment_durations
+        )
+        np.exp(
+            -self._recruitment_durations / self._adaptation_time_constant,
+            out=self._adaptation_decays
+        )
 
     def _calc_adaptations(self, firing_rates: ndarray) -> ndarray:
         """
@@ -213,9 +268,9 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
         :param firing_rates: Array of activities for each motor neuron.
         """
         adapt_curve = self._calc_adaptations_curve(firing_rates)
-        # From Eq. (12)
-        exponent = -1 * (self._recruitment_durations / self._adaptation_time_constant)
-        adapt_scale = 1 - np.exp(exponent)
+        # From Eq. (12). The exponential is kept up to date by
+        # _update_recruitment_durations()
+        adapt_scale = 1 - self._adaptation_decays
         adaptations = adapt_curve * adapt_scale
         # Zero out negative values
         adaptations[adaptations < 0] = 0.0
@@ -228,8 +283,7 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
 
         :param firing_rates: Array of activities for each motor neuron.
         """
-        ratios = (self._recruitment_thresholds - 1) / (self._max_recruitment_threshold - 1)
-        adaptations = self._adaptation_magnitude * (firing_rates - self._min_firing_rate + self._derecruitment_delta) * ratios
+        adaptations = self._adaptation_magnitude * (firing_rates - self._min_firing_rate + self._derecruitment_delta) * self._adaptation_ratios
         return adaptations
 
     @staticmethod
@@ -262,19 +316,21 @@ class PotvinFuglevand2017MotorNeuronPool(Model):
 
     @staticmethod
     def _calc_recruitment_thresholds(
-        motor_unit_count: int,
+        motor_unit_count: Union[int, Sequence[int]],
         max_recruitment_threshold: int
     ) -> ndarray:
         """
         Pure function to calculate recruitment thresholds for each motor
         neuron.
 
-        :param motor_unit_count: The number of motor units in the pool.
+        :param motor_unit_count:
+            The number of motor units in the pool, or in each muscle.
         :param max_recruitment_threshold:
             Excitation level above which the 'last' neuron in the pool will
             become active.
         """
-        motor_unit_indices = np.arange(1, motor_unit_count + 1)
+        motor_unit_indices, motor_unit_count = \
+            Model._motor_unit_indices(motor_unit_count)
 
         r_log = np.log(max_recruitment_threshold)
         r_exponent = (r_log * (motor_unit_indices - 1)) / (motor_unit_count - 1)
@@ -2,6 +2,7 @@ import numpy as np
 import math # noqa
 from numpy import ndarray
 from copy import copy
+from typing import Optional, Sequence, Union
 
 from .model import Model
 
@@ -14,7 +15,10 @@ class PotvinFuglevand2017MuscleFibers(Model):
     If a parameter does not appear in the paper but does appear in the Matlab
     code, the variable name from the Matlab code is in parentheses.
 
-    :param motor_unit_count: Number of motor units in the muscle (n)
+    :param motor_unit_count:
+        Number of motor units in the muscle (n). A sequence of counts builds
+        the motor units of several muscles one after another. See
+        Model._split().
     :param max_twitch_amplitude: Max twitch force within the pool (RP)
     :param max_contraction_time:
         [milliseconds] Maximum contraction time for a motor unit (tL)
@@ -43,9 +47,34 @@ class PotvinFuglevand2017MuscleFibers(Model):
       step_size = 0.01
       force = fibers.step(motor_neuron_firing_rates, step_size)
     """
+    _state_attributes = (
+        '_current_peak_forces',
+        '_current_contraction_times',
+        '_fatigued',
+        '_pending_fatigue',
+        '_normalized_forces',
+        '_step_peak_forces',
+        '_current_forces'
+    )
+    _derived_state_attributes = ('_current_contraction_times', '_fatigued')
+    _scalar_state_attributes = (
+        '_pending_time',
+        '_pending_steps',
+        '_current_forces_stale'
+    )
+    _step_cache_attributes = ('_scaled_fatigabilities',)
+    _extensive_attributes = (
+        '_peak_twitch_forces',
+        '_current_peak_forces',
+        '_nominal_fatigabilities',
+        '_pending_fatigue',
+        '_step_peak_forces',
+        '_current_forces'
+    )
+
     def __init__(
         self,
-        motor_unit_count: int,
+        motor_unit_count: Union[int, Sequence[int]],
         max_twitch_amplitude: int = 100,
         max_contraction_time: int = 90,
         contraction_time_range: int = 3,
@@ -59,6 +88,8 @@ class PotvinFuglevand2017MuscleFibers(Model):
             max_twitch_amplitude
         )
 
+        total_count = len(self._peak_twitch_forces)
+
         # These will change with fatigue.
         self._current_peak_forces = copy(self._peak_twitch_forces)
 
@@ -72,6 +103,10 @@ class PotvinFuglevand2017MuscleFibers(Model):
         # These will change with fatigue
         self._current_contraction_times = copy(self._contraction_times)
 
+        # Tracks which units are below their peak force capacity so that
+        # fatigue related updates only touch units whose state can change.
+        self._fatigued = np.zeros(total_count, dtype=bool)
+
         # The maximum rates at which motor units will fatigue
         self._nominal_fatigabilities = self._calc_nominal_fatigabilities(
             motor_unit_count,
@@ -85,18 +120,50 @@ class PotvinFuglevand2017MuscleFibers(Model):
         self._apply_fatigue = apply_fatigue
         self._max_fatigue_rate = max_fatigue_rate
 
+        # Fatigabilities multiplied by the step size. See _build_step_cache()
+        self._scaled_fatigabilities = self._nominal_fatigabilities
+
+        # Fatigue may be applied every few steps rather than every step. See
+        # _defer_fatigue()
+        self._fatigue_interval = 1
+        self._pending_fatigue: Optional[ndarray] = None
+        self._pending_time = 0.0
+        self._pending_steps = 0
+
+        # Per unit forces are only calculated when read. Each step keeps its
+        # normalized forces and the force capacities they apply to.
+        self._normalized_forces = np.zeros(total_count)
+        self._step_peak_forces = copy(self._peak_twitch_forces)
+        self._current_forces = np.zeros(total_count)
+        self._current_forces_stale = False
+
         # Assign public attributes
-        self.motor_unit_count = motor_unit_count
-        self.current_forces = np.zeros(motor_unit_count)
+        self.motor_unit_count = total_count
 
     @property
     def current_peak_forces(self):
         return self._current_peak_forces
 
+    @property
+    def current_forces(self) -> ndarray:
+        """
+        The force produced by each motor unit in the last step.
+        """
+        if self._current_forces_stale:
+            self._calc_current_forces()
+        return self._current_forces
+
+    @current_forces.setter
+    def current_forces(self, forces: ndarray) -> None:
+        # A new array so forces read in earlier steps are left unchanged
+        self._current_forces = np.array(forces, dtype=float)
+        self._current_forces_stale = False
+
     def _update_fatigue(
         self,
         normalized_forces: ndarray,
-        step_size: float
+        step_size: float,
+        steps: float = 1.0
     ) -> None:
         """
         Updates current twitch forces and contraction times.
@@ -105,24 +172,127 @@ class PotvinFuglevand2017MuscleFibers(Model):
             Array of scaled forces. Used to weight how much fatigue will be
             generated in this step.
         :param step_size: How far time has advanced in this step.
+        :param steps:
+            Number of steps of step_size the update covers. Fatigue here is
+            already weighted by normalized_forces so this is unused, but
+            models with recovery need it.
         """
+        # Only units producing force can fatigue. Scanning for them is a few
+        # percent of a step, which is dominated by full size array passes
+        # (see tests/benchmarks/bench_fiber_scans.py). Index sets kept up to
+        # date across steps would go stale whenever the per unit arrays are
+        # shared as views by a MuscleGroup or split into tiles.
+        active = np.flatnonzero(normalized_forces > 0)
+
         # Instantaneous fatigue rate
-        fatigues = (self._nominal_fatigabilities * normalized_forces) * step_size
-        self._current_peak_forces -= fatigues
+        self._prepare_step(step_size)
+        fatigues = self._scaled_fatigabilities[active] * normalized_forces[active]
+        forces = self._current_peak_forces[active] - fatigues
 
         # Zero out negative values
-        self._current_peak_forces[self._current_peak_forces < 0] = 0.0
-        self._update_contraction_times()
+        forces[forces < 0] = 0.0
+        self._current_peak_forces[active] = forces
+        self._fatigued[active] = forces < self._peak_twitch_forces[active]
+        self._update_contraction_times(active)
+
+    def _build_step_cache(self, step_size: float) -> None:
+        """
+        Caches the fatigue generated in one step by each unit at full
+        normalized force.
+
+        :param step_size: How far time will advance in each step.
+        """
+        self._scaled_fatigabilities = self._nominal_fatigabilities * step_size
+
+    def _defer_fatigue(
+        self,
+        normalized_forces: ndarray,
+        step_size: float
+    ) -> None:
+        """
+        Accumulates normalized forces and applies fatigue once every
+        _fatigue_interval steps using their time weighted mean.
+
+        This is cheaper than updating every step but approximate. Fatigue is
+        linear in normalized force so the approximation only differs through
+        the delayed contraction time changes and, for models with recovery,
+        units which are active for only part of the interval.
 
-    def _update_contraction_times(self) -> None:
+        :param normalized_forces:
+            Array of scaled forces. Used to weight how much fatigue will be
+            generated in this step.
+        :param step_size: How far time has advanced in this step.
+        """
+        if self._pending_fatigue is None:
+            self._pending_fatigue = np.zeros(self.motor_unit_count)
+        # Flushing reuses the step cache built for these steps
+        self._prepare_step(step_size)
+        self._pending_fatigue += normalized_forces * step_size
+        self._pending_time += step_size
+        self._pending_steps += 1
+        if self._pending_steps >= self._fatigue_interval:
+            self._flush_fatigue()
+
+    def _flush_fatigue(self) -> None:
+        """
+        Applies any fatigue accumulated by _defer_fatigue().
+        """
+        if not self._pending_steps:
+            return
+        if self._pending_time > 0:
+            # Fatigue is linear in normalized force and recovery in time so
+            # the whole interval is applied as a scaled step of the cached
+            # size. Rebuilding the cache for the interval would only have to
+            # be undone by the next step.
+            step_size = self._cached_step_size
+            self._update_fatigue(
+                self._pending_fatigue / step_size,
+                step_size,
+                self._pending_time / step_size
+            )
+        self._pending_fatigue[:] = 0.0
+        self._pending_time = 0.0
+        self._pending_steps = 0
+
+    def _settle_scalar_state(self) -> None:
+        """
+        Applies any deferred fatigue and builds per unit forces which have
+        not been read so no scalar state is pending.
+        """
+        if self._pending_fatigue is not None:
+            self._flush_fatigue()
+            # Recreated on the next deferred step
+            self._pending_fatigue = None
+        if self._current_forces_stale:
+            self._calc_current_forces()
+
+    def _sync_state(self) -> None:
+        """
+        Limits force capacities set from outside of step() to their valid
+        range and recalculates the fatigue flags and contraction times which
+        follow from them.
+        """
+        np.clip(
+            self._current_peak_forces,
+            0,
+            self._peak_twitch_forces,
+            out=self._current_peak_forces
+        )
+        self._fatigued[:] = self._current_peak_forces < self._peak_twitch_forces
+        self._update_contraction_times(np.arange(self.motor_unit_count))
+
+    def _update_contraction_times(self, units: ndarray) -> None:
         """
         Update our current contraction times as a function of our current
         force capacity relative to our peak force capacity.
         From Eq. (11)
+
+        :param units: Indices of the motor units whose force capacity changed.
         """
-        force_loss_pcts = 1 - (self._current_peak_forces / self._peak_twitch_forces)
+        current_peak_forces = self._current_peak_forces[units]
+        force_loss_pcts = 1 - (current_peak_forces / self._peak_twitch_forces[units])
         inc_pcts = 1 + self._contraction_time_change_ratio * force_loss_pcts
-        self._current_contraction_times = self._contraction_times * inc_pcts
+        self._current_contraction_times[units] = self._contraction_times[units] * inc_pcts
 
     @staticmethod
     def _calc_contraction_times(
@@ -162,25 +332,27 @@ class PotvinFuglevand2017MuscleFibers(Model):
 
     @staticmethod
     def _calc_peak_twitch_forces(
-        motor_unit_count: int,
+        motor_unit_count: Union[int, Sequence[int]],
         max_twitch_amplitude: int
     ) -> ndarray:
         """
         Pure function to calculate the peak twitch force for each motor unit.
 
-        :param motor_unit_count: The number of motor units in the pool.
+        :param motor_unit_count:
+            The number of motor units in the pool, or in each muscle.
         :param max_twitch_amplitude:
             Largest force a motor unit in this muscle can produce. (Arbitrary
             units.)
         """
-        motor_unit_indices = np.arange(1, motor_unit_count + 1)
+        motor_unit_indices, motor_unit_count = \
+            Model._motor_unit_indices(motor_unit_count)
         t_log = np.log(max_twitch_amplitude)
         t_exponent = (t_log * (motor_unit_indices - 1)) / (motor_unit_count - 1)
         return np.exp(t_exponent)
 
     @staticmethod
     def _calc_nominal_fatigabilities(
-        motor_unit_count: int,
+        motor_unit_count: Union[int, Sequence[int]],
         fatigability_range: int,
         max_fatigue_rate: float,
         peak_twitch_forces: ndarray
@@ -190,7 +362,8 @@ class PotvinFuglevand2017MuscleFibers(Model):
 
         Taken more from the matlab code than the paper.
 
-        :param motor_unit_count: The number of motor units in this muscle.
+        :param motor_unit_count:
+            The number of motor units in this muscle, or in each muscle.
         :param fatigability_range:
             The ratio between the maximum fatigue rate of the strongest motor
             unit (which fatigues the fastest) and the fatigue rate of the
@@ -202,7 +375,8 @@ class PotvinFuglevand2017MuscleFibers(Model):
             An array of all the largest forces that each motor unit can
             produce.
         """
-        motor_unit_indices = np.arange(1, motor_unit_count + 1)
+        motor_unit_indices, motor_unit_count = \
+            Model._motor_unit_indices(motor_unit_count)
         f_log = np.log(fatigability_range)
         motor_unit_fatigue_curve = np.exp((f_log / (motor_unit_count - 1)) * (motor_unit_indices - 1))
         fatigue_rates = motor_unit_fatigue_curve * (max_fatigue_rate / fatigability_range) * peak_twitch_forces
@@ -246,17 +420,33 @@ class PotvinFuglevand2017MuscleFibers(Model):
         normalized_forces[above_thresh_indices] = 1 - np.exp(exponent)
         return normalized_forces
 
-    def _calc_current_forces(self, normalized_forces: ndarray) -> ndarray:
+    def _calc_total_force(self, normalized_forces: ndarray) -> float:
         """
-        Scales the normalized forces for each motor unit by their current
-        remaining twitch force capacity.
+        Returns the sum of the normalized forces for each motor unit scaled
+        by their current remaining twitch force capacity.
 
-        This method also updates the public Muscle.current_forces array.
+        Per motor unit forces are not calculated here. The inputs are kept
+        so that _calc_current_forces() can produce them if they are read
+        before the next step.
 
         :param normalized_forces: An array of forces scaled between 0 and 1
         """
-        self.current_forces = normalized_forces * self._current_peak_forces
-        return self.current_forces
+        self._normalized_forces = normalized_forces
+        np.copyto(self._step_peak_forces, self._current_peak_forces)
+        self._current_forces_stale = True
+        return np.dot(normalized_forces, self._current_peak_forces)
+
+    def _calc_current_forces(self) -> ndarray:
+        """
+        Scales the normalized forces for each motor unit from the last step
+        by their remaining twitch force capacity at that step.
+
+        A new array is produced at most once per step so callers can keep
+        the forces of earlier steps.
+        """
+        self._current_forces = self._normalized_forces * self._step_peak_forces
+        self._current_forces_stale = False
+        return self._current_forces
 
     def _calc_total_fiber_force(
         self,
@@ -272,12 +462,14 @@ class PotvinFuglevand2017MuscleFibers(Model):
         """
         normalized_firing_rates = self._normalize_firing_rates(firing_rates)
         normalized_forces = self._calc_normalized_forces(normalized_firing_rates)
-        current_forces = self._calc_current_forces(normalized_forces)
-        total_force = np.sum(current_forces)
+        total_force = self._calc_total_force(normalized_forces)
 
         # Apply fatigue as last step
         if self._apply_fatigue:
-            self._update_fatigue(normalized_forces, step_size)
+            if self._fatigue_interval > 1:
+                self._defer_fatigue(normalized_forces, step_size)
+            else:
+                self._update_fatigue(normalized_forces, step_size)
 
         return total_force
 
@@ -0,0 +1,269 @@
+"""
+Piecewise excitation protocols and a runner which steps muscles through
+them without per step overhead.
+"""
+from typing import List, Optional, Union
+
+import numpy as np
+from numpy import ndarray
+
+from .muscle import Muscle
+from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+
+
+class ProtocolSegment(object):
+    """
+    One piece of a :class:`Protocol <Protocol>`. The excitation changes
+    linearly from start to end over the segment. Holds have equal start and
+    end excitations.
+
+    :param start: Excitation at the first step of the segment.
+    :param end: Excitation at the last step of the segment.
+    :param duration: Length of the segment, in seconds.
+    """
+    def __init__(self, start: float, end: float, duration: float):
+        assert duration >= 0
+        self.start = float(start)
+        self.end = float(end)
+        self.duration = float(duration)
+
+    @property
+    def is_hold(self) -> bool:
+        return self.start == self.end
+
+    def step_count(self, step_size: float) -> int:
+        """
+        Returns the number of steps this segment lasts, rounded to the
+        nearest whole step.
+
+        :param step_size: How far time advances each step.
+        """
+        return int(round(self.duration / step_size))
+
+    def excitation_at(self, elapsed: float) -> float:
+        """
+        Returns the excitation a given time after the start of this segment.
+
+        :param elapsed: Time since the start of the segment, in seconds.
+        """
+        if self.is_hold or self.duration == 0:
+            return self.start
+        return self.start + (self.end - self.start) * (elapsed / self.duration)
+
+    def excitations(self, step_size: float) -> ndarray:
+        """
+        Returns the excitation for every step of this segment.
+
+        :param step_size: How far time advances each step.
+        """
+        steps = self.step_count(step_size)
+        if self.is_hold:
+            return np.full(steps, self.start)
+        return np.linspace(self.start, self.end, steps)
+
+
+class Protocol(object):
+    """
+    A sequence of constant and linearly changing excitations, as used in
+    most physiology experiments.
+
+    Segments are added with hold(), ramp(), rest() and intermittent(), each
+    of which returns the protocol so calls can be chained. Excitations are
+    on the scale of the muscle the protocol is run on, so 0.0 to 1.0 for a
+    StandardMuscle.
+
+    run() steps a muscle through the protocol and returns the output of
+    every step. Within a hold the motor neuron firing rates before
+    adaptation are calculated once rather than every step, and when neither
+    the motor neurons nor the fibers fatigue they are fully precalculated.
+    Outputs are identical to stepping the muscle with each excitation in
+    turn.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.protocol import Protocol
+
+      # Ramp up, then 6s on / 4s off for 10 cycles
+      protocol = Protocol().ramp(0.0, 0.3, 5.0).intermittent(0.3, 6.0, 4.0, 10)
+      outputs = protocol.run(StandardMuscle(), 1 / 50.0)
+    """
+    def __init__(self):
+        self.segments: List[ProtocolSegment] = []
+
+    @property
+    def duration(self) -> float:
+        return sum(s.duration for s in self.segments)
+
+    def hold(self, excitation: float, duration: float) -> 'Protocol':
+        """
+        Adds a constant excitation.
+
+        :param excitation: Input to the muscle.
+        :param duration: Length of the hold, in seconds.
+        """
+        self.segments.append(ProtocolSegment(excitation, excitation, duration))
+        return self
+
+    def rest(self, duration: float) -> 'Protocol':
+        """
+        Adds a period without excitation.
+
+        :param duration: Length of the rest, in seconds.
+        """
+        return self.hold(0.0, duration)
+
+    def ramp(self, start: float, end: float, duration: float) -> 'Protocol':
+        """
+        Adds an excitation which changes linearly from start to end.
+
+        :param start: Excitation at the first step of the ramp.
+        :param end: Excitation at the last step of the ramp.
+        :param duration: Length of the ramp, in seconds.
+        """
+        self.segments.append(ProtocolSegment(start, end, duration))
+        return self
+
+    def intermittent(
+        self,
+        excitation: float,
+        on_duration: float,
+        off_duration: float,
+        cycles: int
+    ) -> 'Protocol':
+        """
+        Adds cycles of a hold followed by a rest.
+
+        :param excitation: Input to the muscle while on.
+        :param on_duration: Length of each hold, in seconds.
+        :param off_duration: Length of each rest, in seconds.
+        :param cycles: Number of hold and rest pairs.
+        """
+        for _ in range(cycles):
+            self.hold(excitation, on_duration)
+            self.rest(off_duration)
+        return self
+
+    def segment_starts(self) -> ndarray:
+        """
+        Returns the time at which each segment starts, in seconds.
+        """
+        durations = [s.duration for s in self.segments]
+        return np.concatenate(([0.0], np.cumsum(durations)[:-1])) \
+            if durations else np.zeros(0)
+
+    def excitation_at(self, time: float) -> float:
+        """
+        Returns the excitation at a time since the start of the protocol.
+        Excitation is zero once the protocol has ended.
+
+        :param time: Time since the start of the protocol, in seconds.
+        """
+        starts = self.segment_starts()
+        index = int(np.searchsorted(starts, time, side='right')) - 1
+        if index < 0 or time >= self.duration:
+            return 0.0
+        return self.segments[index].excitation_at(time - starts[index])
+
+    def excitations(self, step_size: float) -> ndarray:
+        """
+        Returns the excitation for every step of the protocol.
+
+        :param step_size: How far time advances each step.
+        """
+        if not self.segments:
+            return np.zeros(0)
+        return np.concatenate([s.excitations(step_size) for s in self.segments])
+
+    def run(
+        self,
+        muscle: Muscle,
+        step_size: float,
+        out: Optional[ndarray] = None
+    ) -> ndarray:
+        """
+        Steps a muscle through the protocol and returns its output at every
+        step.
+
+        Muscles other than :class:`Muscle <pymuscle.Muscle>` and its
+        subclasses with Potvin & Fuglevand models, and muscles in real-time
+        mode, are stepped one excitation at a time.
+
+        :param muscle: The muscle to step.
+        :param step_size: How far to advance the simulation in time each step.
+        :param out: Array to write outputs to. Defaults to a new array.
+        """
+        steps = [s.step_count(step_size) for s in self.segments]
+        if out is None:
+            out = np.zeros(sum(steps))
+        assert out.shape == (sum(steps),)
+
+        compiled = isinstance(muscle, Muscle) \
+            and isinstance(muscle._pool, PotvinFuglevand2017MotorNeuronPool) \
+            and isinstance(muscle._fibers, PotvinFuglevand2017MuscleFibers) \
+            and muscle.real_time is None
+        start = 0
+        for segment, count in zip(self.segments, steps):
+            segment_out = out[start:start + count]
+            start += count
+            if not compiled:
+                for i, excitation in enumerate(segment.excitations(step_size)):
+                    segment_out[i] = muscle.step(float(excitation), step_size)
+            elif segment.is_hold:
+                _run_hold(muscle, segment.start, count, step_size, segment_out)
+            else:
+                for i, excitation in enumerate(segment.excitations(step_size)):
+                    _run_hold(muscle, excitation, 1, step_size, segment_out[i:i + 1])
+
+        return out
+
+
+def _run_hold(
+    muscle: Muscle,
+    excitation: Union[float, np.floating],
+    steps: int,
+    step_size: float,
+    out: ndarray
+) -> None:
+    """
+    Steps a muscle with a constant excitation and writes its outputs.
+
+    This follows Muscle.step() for a single valued input with the work that
+    does not change between steps taken out of the loop.
+
+    :param muscle: The muscle to step.
+    :param excitation: Input to the muscle on its own scale.
+    :param steps: Number of steps to take.
+    :param step_size: How far to advance the simulation in time each step.
+    :param out: Array to write the output of each step to.
+    """
+    if steps == 0:
+        return
+
+    # Without fatigue the output depends only on the input
+    if muscle._can_use_force_table():
+        out[:] = muscle.step(float(excitation), step_size)
+        return
+
+    muscle._table_excitation = None
+    pool = muscle._pool
+    fibers = muscle._fibers
+    inputs = np.full(pool.motor_unit_count, float(excitation) * muscle._input_range)
+    output_range = muscle._output_range
+
+    if not pool._apply_fatigue:
+        # Adaptation only changes as recruitment durations grow
+        adapted = pool._calc_adapted_firing_rates(inputs, step_size)
+        if not fibers._apply_fatigue:
+            out[:] = fibers._calc_total_fiber_force(adapted, step_size) / output_range
+            return
+        for i in range(steps):
+            out[i] = fibers._calc_total_fiber_force(adapted, step_size) / output_range
+        return
+
+    firing_rates = pool._calc_firing_rates(inputs)
+    for i in range(steps):
+        adapted = firing_rates - pool._calc_adaptations(firing_rates)
+        pool._update_recruitment_durations(firing_rates, step_size)
+        out[i] = fibers._calc_total_fiber_force(adapted, step_size) / output_range
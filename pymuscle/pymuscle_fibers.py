@@ -1,5 +1,6 @@
 import numpy as np
 from numpy import ndarray
+from typing import Sequence, Union
 
 from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
 
@@ -52,13 +53,19 @@ class PyMuscleFibers(PotvinFuglevand2017MuscleFibers):
       step_size = 0.01
       force = fibers.step(motor_neuron_firing_rates, step_size)
     """
+    _extensive_attributes = \
+        PotvinFuglevand2017MuscleFibers._extensive_attributes + ('_recovery_rates',)
+    _step_cache_attributes = \
+        PotvinFuglevand2017MuscleFibers._step_cache_attributes + ('_scaled_recovery_rates',)
+
     def __init__(
         self,
+        motor_unit_count: Union[int, Sequence[int]],
         *args,
         force_conversion_factor: float=0.028,
         **kwargs
     ):
-        super().__init__(*args, **kwargs)
+        super().__init__(motor_unit_count, *args, **kwargs)
 
         # Ratio of newtons (N) to internal arbitrary force units
         self.force_conversion_factor = force_conversion_factor
@@ -71,55 +78,77 @@ class PyMuscleFibers(PotvinFuglevand2017MuscleFibers):
         # Re-uses the same method as calculating fatigabilities.
         recovery_range = max_recovery_rate / self._nominal_fatigabilities[0]
         self._recovery_rates = self._calc_nominal_fatigabilities(
-            self.motor_unit_count,
+            motor_unit_count,
             recovery_range,
             max_recovery_rate,
             self._peak_twitch_forces
         )
+        self._scaled_recovery_rates = self._recovery_rates
 
     def _update_fatigue(
         self,
         normalized_forces: ndarray,
-        step_size: float
+        step_size: float,
+        steps: float = 1.0
     ) -> None:
         """
         Updates current twitch forces and contraction times. This overrides
         the parent method to add in recovery calculations.
 
+        Only units which are active, or which are fatigued and recovering, are
+        updated. Units which are idle at full capacity are left untouched.
+        Finding them scans every unit, as the rest of each step already does,
+        but costs only a few percent of a step. See
+        tests/benchmarks/bench_fiber_scans.py.
+
         :param normalized_forces:
             Array of scaled forces. Used to weight how much fatigue will be
             generated in this step.
         :param step_size: How far time has advanced in this step.
+        :param steps: Number of steps of step_size the update covers.
         """
-        fatigues = (self._nominal_fatigabilities * normalized_forces) * step_size
-        self._current_peak_forces -= fatigues
-
-        # Apply recovery for units producing no force
-        self._apply_recovery(normalized_forces, step_size)
-
-        # Zero out negative values
-        self._current_peak_forces[self._current_peak_forces < 0] = 0.0
-
-        # Clip max values
-        over = self._current_peak_forces > self._peak_twitch_forces
-        self._current_peak_forces[over] = self._peak_twitch_forces[over]
+        self._prepare_step(step_size)
+        active = np.flatnonzero(normalized_forces > 0)
+        fatigues = self._scaled_fatigabilities[active] * normalized_forces[active]
+        self._current_peak_forces[active] -= fatigues
+
+        # Apply recovery for fatigued units producing no force
+        fatigued = np.flatnonzero(self._fatigued)
+        recovering = fatigued[normalized_forces[fatigued] <= 0]
+        self._apply_recovery(recovering, step_size, steps)
+
+        # Only units touched in this step can have left the valid range
+        changed = np.concatenate((active, recovering))
+        forces = self._current_peak_forces[changed]
+        peaks = self._peak_twitch_forces[changed]
+
+        # Zero out negative values and clip max values
+        forces[forces < 0] = 0.0
+        over = forces > peaks
+        forces[over] = peaks[over]
+        self._current_peak_forces[changed] = forces
+        self._fatigued[changed] = forces < peaks
 
         # Apply fatigue to contraction times
-        self._update_contraction_times()
+        self._update_contraction_times(changed)
 
     def _apply_recovery(
         self,
-        normalized_forces: ndarray,
-        step_size: float
+        recovering: ndarray,
+        step_size: float,
+        steps: float = 1.0
     ) -> None:
         """
         Apply recovery to motor units not producing force in this step.
 
+        :param recovering:
+            Indices of the fatigued motor units producing no force in this
+            step.
+        :param step_size: How far time has advanced in this step.
+        :param steps: Number of steps of step_size to recover for.
+
         TODO - Finalize the strategy used below
         """
-        # Find the indices of valid, recovering units.
-        recovering = normalized_forces <= 0
-
         # Strategy 1 - Linear recovery at fatigue rates
         # recovery = self._nominal_fatigabilities[recovering] * step_size
 
@@ -133,9 +162,21 @@ class PyMuscleFibers(PotvinFuglevand2017MuscleFibers):
         # recovery = self._recovery_rates[recovering] * step_size
 
         # Strategy 4 - Combine 2 and 3
+        # The step cache holds recovery_rates * step_size / peak
         peak = self._peak_twitch_forces[recovering]
         current = self._current_peak_forces[recovering]
-        recovery_ratio = (peak - current) / peak
-        recovery = (self._recovery_rates[recovering] * recovery_ratio) * step_size
+        recovery = self._scaled_recovery_rates[recovering] * (peak - current)
+        if steps != 1.0:
+            recovery *= steps
 
         self._current_peak_forces[recovering] += recovery
+
+    def _build_step_cache(self, step_size: float) -> None:
+        """
+        Caches the step size scaled fatigabilities and recovery rates.
+
+        :param step_size: How far time will advance in each step.
+        """
+        super()._build_step_cache(step_size)
+        self._scaled_recovery_rates = self._recovery_rates * step_size \
+            / self._peak_twitch_forces
@@ -0,0 +1,117 @@
+"""
+Latency budget tracking for muscles stepped inside real-time control loops.
+"""
+from typing import Dict, List, Optional, Sequence
+
+
+class RealTimeMode(object):
+    """
+    Decides when a muscle should trade accuracy for speed.
+
+    Step latencies are smoothed with an exponential moving average which is
+    reset at every switch. Once a few steps have been seen at the current
+    level and the average exceeds the budget the muscle drops to the next
+    cheaper fidelity level. When the average has stayed below
+    restore_fraction of the budget for restore_after steps the muscle moves
+    back up one level. Every time a restored level turns out to be too slow
+    the wait before the next restore doubles, which stops the muscle flapping
+    between levels.
+
+    Every switch is appended to events with the step count, the levels, the
+    average latency which triggered it and the calibrated error of the new
+    level.
+
+    :param budget: Largest acceptable step latency, in seconds.
+    :param levels: Names of the available fidelity levels, most accurate first.
+    :param errors:
+        Calibrated error of each level relative to full fidelity, or None
+        where it is unknown.
+    :param smoothing: Weight of the latest latency in the moving average.
+    :param restore_fraction:
+        Fraction of the budget the average must stay below before fidelity
+        is restored.
+    :param restore_after: Steps with headroom required before restoring.
+    """
+    # Latencies needed at a level before acting on them
+    _min_samples = 5
+
+    def __init__(
+        self,
+        budget: float,
+        levels: Sequence[str],
+        errors: Sequence[Optional[float]],
+        smoothing: float = 0.2,
+        restore_fraction: float = 0.5,
+        restore_after: int = 50
+    ):
+        assert budget > 0
+        assert len(levels) == len(errors) > 0
+        assert 0 < smoothing <= 1
+        self.budget = budget
+        self.levels: List[str] = list(levels)
+        self.errors: List[Optional[float]] = list(errors)
+        self.level = 0
+        self.latency: Optional[float] = None
+        self.steps = 0
+        self.events: List[Dict] = []
+
+        # Assign non-public attributes
+        self._smoothing = smoothing
+        self._restore_fraction = restore_fraction
+        self._restore_after = restore_after
+        self._headroom_steps = 0
+        self._restored_at: Optional[int] = None
+        self._samples = 0
+
+    def record(self, latency: float) -> Optional[int]:
+        """
+        Records the latency of one step. Returns the level the muscle should
+        switch to, or None if it should stay at its current level.
+
+        :param latency: Duration of the step, in seconds.
+        """
+        self.steps += 1
+        self._samples += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self._smoothing * (latency - self.latency)
+        if self._samples < self._min_samples:
+            return None
+
+        if self.latency > self.budget:
+            self._headroom_steps = 0
+            if self.level == len(self.levels) - 1:
+                return None
+            # A restore which was quickly undone means the restored level
+            # really is too slow so wait longer before the next attempt.
+            if self._restored_at is not None \
+                    and self.steps - self._restored_at < self._restore_after:
+                self._restore_after *= 2
+            self._restored_at = None
+            return self._switch(self.level + 1)
+
+        if self.latency < self._restore_fraction * self.budget:
+            self._headroom_steps += 1
+        else:
+            self._headroom_steps = 0
+        if self.level > 0 and self._headroom_steps >= self._restore_after:
+            self._headroom_steps = 0
+            self._restored_at = self.steps
+            return self._switch(self.level - 1)
+
+        return None
+
+    def _switch(self, level: int) -> int:
+        self.events.append({
+            'step': self.steps,
+            'from': self.levels[self.level],
+            'to': self.levels[level],
+            'latency': self.latency,
+            'error': self.errors[level]
+        })
+        self.level = level
+        # Latencies at the old level say little about the new one
+        self.latency = None
+        self._samples = 0
+        return level
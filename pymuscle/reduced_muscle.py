@@ -0,0 +1,396 @@
+"""
+Reduced-order muscles which simulate clusters of neighboring motor units.
+"""
+import numpy as np
+from numpy import ndarray
+from copy import deepcopy
+from typing import Dict, Optional, Tuple, Union
+
+from .model import Model
+from .muscle import Muscle
+
+
+def _calc_cluster_starts(peak_twitch_forces: ndarray, cluster_count: int) -> ndarray:
+    """
+    Returns the index of the first motor unit of each cluster.
+
+    Cluster boundaries split the cumulative square root of peak twitch force
+    evenly. This spends more clusters on the strong units, which dominate the
+    total force, than an even split by index while still resolving the
+    recruitment of the many weak units.
+
+    :param peak_twitch_forces: Peak twitch force of each motor unit.
+    :param cluster_count: Number of clusters wanted.
+    """
+    motor_unit_count = len(peak_twitch_forces)
+    if cluster_count >= motor_unit_count:
+        return np.arange(motor_unit_count)
+    cumulative = np.cumsum(np.sqrt(peak_twitch_forces))
+    cumulative /= cumulative[-1]
+    targets = np.arange(cluster_count) / cluster_count
+    starts = np.searchsorted(cumulative, targets, side='right')
+    starts[0] = 0
+    return np.unique(starts[starts < motor_unit_count])
+
+
+def _calibration_excitations(step_size: float, duration: float) -> ndarray:
+    """
+    Returns the normalized excitations used to measure reduction errors. A
+    ramp up to and down from full excitation exercises recruitment, a
+    sustained contraction exercises fatigue and a final rest exercises
+    recovery.
+
+    :param step_size: Time between excitations.
+    :param duration: Length of the protocol.
+    """
+    times = np.arange(int(duration / step_size)) * step_size / duration
+    ramp = np.where(times < 1 / 6, 6 * times, 2 - 6 * times)
+    return np.where(
+        times < 1 / 3,
+        ramp,
+        np.where(times < 3 / 4, 0.6, 0.0)
+    )
+
+
+def _peripheral_fatigue(fibers: Model) -> float:
+    """
+    Returns the fraction of the peak force capacity of the fibers lost to
+    fatigue.
+    """
+    return 1 - np.sum(fibers._current_peak_forces) / np.sum(fibers._peak_twitch_forces)
+
+
+class ReducedOrderMuscle(Muscle):
+    """
+    Approximates a muscle by merging runs of neighboring motor units into a
+    smaller number of representative units.
+
+    Recruitment thresholds, twitch forces, contraction times and
+    fatigabilities all vary smoothly with motor unit index so neighboring
+    units behave similarly. Each cluster is simulated as one unit with the
+    mean threshold, firing rate limits and contraction time of its members
+    and with the summed twitch forces, fatigabilities and recovery rates.
+    Total force and fatigue are therefore preserved when all members of a
+    cluster fire together and the error comes from clusters which are
+    partially recruited. Per motor unit arrays, such as current_forces, hold
+    one value per cluster.
+
+    If cluster_count is not given the smallest count which keeps both errors
+    within the tolerance is searched for. Errors are measured by simulating
+    the original and reduced muscles through a ramp, a sustained
+    contraction and a rest. force_error is the largest force difference as a
+    fraction of the largest original force and fatigue_error the largest
+    difference in the fraction of force capacity lost to fatigue.
+
+    The current state of the given muscle, including any fatigue, is carried
+    over. The given muscle is not changed.
+
+    :param muscle: The muscle to approximate. Must use Potvin & Fuglevand
+        style fibers.
+    :param cluster_count: Number of representative motor units.
+    :param tolerance: Largest acceptable force and fatigue error.
+    :param step_size: Step size used when measuring errors.
+    :param calibration_duration:
+        Simulated seconds used to measure errors. If 0 errors are not
+        measured and cluster_count must be given.
+
+    Usage::
+
+      from pymuscle import StandardMuscle, ReducedOrderMuscle
+
+      muscle = ReducedOrderMuscle(StandardMuscle(500.0), tolerance=0.005)
+      print(muscle.cluster_count, muscle.force_error)
+      output = muscle.step(0.5, 1 / 50.0)
+    """
+    # Smallest cluster count tried when searching
+    _min_cluster_count = 8
+
+    def __init__(
+        self,
+        muscle: Muscle,
+        cluster_count: Optional[int] = None,
+        tolerance: float = 0.01,
+        step_size: float = 1 / 50.0,
+        calibration_duration: float = 60.0
+    ):
+        assert cluster_count is None or cluster_count > 0
+        assert hasattr(muscle._fibers, '_peak_twitch_forces')
+        self._source_pool = muscle._pool
+        self._source_fibers = muscle._fibers
+
+        assert cluster_count is not None or calibration_duration > 0, \
+            'Errors must be measured to choose the cluster count'
+        self._calibration = None
+        if calibration_duration > 0:
+            self._calibration = self._calc_calibration(
+                muscle,
+                step_size,
+                calibration_duration
+            )
+        if cluster_count is None:
+            cluster_count = self._search_cluster_count(muscle.motor_unit_count, tolerance)
+
+        starts = _calc_cluster_starts(muscle._fibers._peak_twitch_forces, cluster_count)
+        super().__init__(
+            motor_neuron_pool_model=muscle._pool._reduce(starts),
+            muscle_fibers_model=muscle._fibers._reduce(starts),
+            use_force_table=muscle._use_force_table
+        )
+        self._input_range = muscle._input_range
+        self._output_range = muscle._output_range
+
+        # Assign public attributes
+        self.full_motor_unit_count = muscle.motor_unit_count
+        self.cluster_starts = starts
+        self.cluster_sizes = np.diff(np.append(starts, muscle.motor_unit_count))
+        self.cluster_count = len(starts)
+        self.force_error: Optional[float] = None
+        self.fatigue_error: Optional[float] = None
+        if self._calibration is not None:
+            self.force_error, self.fatigue_error = self._calc_errors(starts)
+
+        # Only needed while searching
+        self._source_pool = None
+        self._source_fibers = None
+        self._calibration = None
+
+    def _calc_calibration(
+        self,
+        muscle: Muscle,
+        step_size: float,
+        duration: float
+    ) -> Dict[str, Union[float, ndarray]]:
+        """
+        Simulates a copy of the original muscle through the calibration
+        protocol and returns its force and fatigue trajectories.
+        """
+        excitations = _calibration_excitations(step_size, duration) * muscle.max_excitation
+        full = deepcopy(muscle)
+        full.real_time = None
+        # A force table would cost more to build than it saves here
+        full._use_force_table = False
+        forces, fatigues = self._simulate(full, excitations, step_size)
+        return {
+            'excitations': excitations,
+            'step_size': step_size,
+            'forces': forces,
+            'fatigues': fatigues
+        }
+
+    @staticmethod
+    def _simulate(
+        muscle: Muscle,
+        excitations: ndarray,
+        step_size: float
+    ) -> Tuple[ndarray, ndarray]:
+        """
+        Steps the muscle with raw pool inputs and returns its total forces
+        and peripheral fatigue after each step.
+        """
+        forces = np.empty(len(excitations))
+        fatigues = np.empty(len(excitations))
+        for i, excitation in enumerate(excitations):
+            forces[i] = Muscle._step(muscle, float(excitation), step_size)
+            fatigues[i] = _peripheral_fatigue(muscle._fibers)
+        return forces, fatigues
+
+    def _calc_errors(self, starts: ndarray) -> Tuple[float, float]:
+        """
+        Returns the force and fatigue errors of the reduction with the given
+        cluster starts.
+        """
+        calibration = self._calibration
+        reduced = Muscle(
+            self._source_pool._reduce(starts),
+            self._source_fibers._reduce(starts),
+            use_force_table=False
+        )
+        forces, fatigues = self._simulate(
+            reduced,
+            calibration['excitations'],
+            calibration['step_size']
+        )
+        scale = max(np.max(np.abs(calibration['forces'])), np.finfo(float).tiny)
+        force_error = np.max(np.abs(forces - calibration['forces'])) / scale
+        fatigue_error = np.max(np.abs(fatigues - calibration['fatigues']))
+        return float(force_error), float(fatigue_error)
+
+    def _search_cluster_count(self, motor_unit_count: int, tolerance: float) -> int:
+        """
+        Returns the smallest cluster count whose errors are within the
+        tolerance. Counts are doubled until one is found and then refined by
+        bisection, assuming errors shrink as the count grows.
+        """
+        peak_twitch_forces = self._source_fibers._peak_twitch_forces
+
+        def acceptable(count: int) -> bool:
+            starts = _calc_cluster_starts(peak_twitch_forces, count)
+            return max(self._calc_errors(starts)) <= tolerance
+
+        high = min(self._min_cluster_count, motor_unit_count)
+        while high < motor_unit_count and not acceptable(high):
+            high = min(2 * high, motor_unit_count)
+        if high == motor_unit_count and not acceptable(high):
+            return motor_unit_count
+
+        low = high // 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if acceptable(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def get_peripheral_fatigue(self) -> float:
+        """
+        Returns fatigue level in the range 0.0 to 1.0 where:
+
+        0.0 - Completely rested
+        1.0 - Completely fatigued
+        """
+        return _peripheral_fatigue(self._fibers)
+
+    def step(
+        self,
+        motor_pool_input: Union[int, float, np.ndarray],
+        step_size: float
+    ) -> float:
+        """
+        Advances the muscle model one step. Inputs and outputs use the same
+        scale as the original muscle.
+
+        :param motor_pool_input:
+            Either a single value or an array with one value per cluster.
+        :param step_size:
+            How far to advance the simulation in time for this step.
+        """
+        if self._input_range != 1.0:
+            motor_pool_input = motor_pool_input * self._input_range
+        return super().step(motor_pool_input, step_size) / self._output_range
+
+
+class MultiFidelityMuscle(object):
+    """
+    Holds a muscle and a reduced-order copy of it and steps whichever is
+    active. The fidelity can be changed between any two steps and fatigue
+    and other state carry over.
+
+    Moving to the reduced muscle merges the per motor unit state of the full
+    muscle, such as force capacities and recruitment durations, onto its
+    clusters. Moving back spreads the changes each cluster went through over
+    its members, using the full muscle's state from when it was last active
+    to decide how. set_fidelity() returns the transfer error, the largest
+    mismatch between the reduced state and the merged lifted state relative
+    to the largest value of each state attribute. The errors of the reduced
+    dynamics themselves are the force_error and fatigue_error of the
+    :class:`ReducedOrderMuscle <ReducedOrderMuscle>`.
+
+    :param muscle: The full fidelity muscle.
+    :param reduced:
+        A ReducedOrderMuscle made from the muscle. If not given one is made
+        with the remaining keyword arguments.
+    :param fidelity: 'full' or 'reduced'. The level to start at.
+
+    Usage::
+
+      from pymuscle import StandardMuscle, MultiFidelityMuscle
+
+      muscle = MultiFidelityMuscle(StandardMuscle(500.0), fidelity='reduced')
+      for _ in range(500):
+          muscle.step(0.5, 1 / 50.0)
+      muscle.set_fidelity('full')
+      output = muscle.step(0.5, 1 / 50.0)
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        reduced: Optional[ReducedOrderMuscle] = None,
+        fidelity: str = 'full',
+        **kwargs
+    ):
+        if reduced is None:
+            reduced = ReducedOrderMuscle(muscle, **kwargs)
+        assert reduced.full_motor_unit_count == muscle.motor_unit_count
+        self.full = muscle
+        self.reduced = reduced
+        self.fidelity = 'full'
+        self.transfer_error = 0.0
+        self.set_fidelity(fidelity)
+
+    @property
+    def active(self) -> Muscle:
+        return self.full if self.fidelity == 'full' else self.reduced
+
+    @property
+    def motor_unit_count(self) -> int:
+        return self.active.motor_unit_count
+
+    @property
+    def current_forces(self) -> ndarray:
+        return self.active.current_forces
+
+    @staticmethod
+    def _flush(muscle: Muscle) -> None:
+        """
+        Applies pending fatigue and drops deferred outputs so the state
+        arrays are current.
+        """
+        if hasattr(muscle._fibers, '_flush_fatigue'):
+            muscle._fibers._flush_fatigue()
+        muscle._table_excitation = None
+
+    def set_fidelity(self, fidelity: str) -> float:
+        """
+        Moves the muscle state to the given fidelity level and returns the
+        transfer error.
+
+        :param fidelity: 'full' or 'reduced'.
+        """
+        assert fidelity in ('full', 'reduced')
+        if fidelity == self.fidelity:
+            return 0.0
+
+        full = self.full
+        reduced = self.reduced
+        starts = reduced.cluster_starts
+        self._flush(full)
+        self._flush(reduced)
+        if fidelity == 'reduced':
+            full._pool._project_state(reduced._pool, starts)
+            full._fibers._project_state(reduced._fibers, starts)
+            error = 0.0
+        else:
+            error = max(
+                full._pool._lift_state(reduced._pool, starts),
+                full._fibers._lift_state(reduced._fibers, starts)
+            )
+
+        self.fidelity = fidelity
+        self.transfer_error = error
+        return error
+
+    def get_peripheral_fatigue(self) -> float:
+        """
+        Returns fatigue level in the range 0.0 to 1.0 where:
+
+        0.0 - Completely rested
+        1.0 - Completely fatigued
+        """
+        return _peripheral_fatigue(self.active._fibers)
+
+    def step(
+        self,
+        motor_pool_input: Union[int, float, np.ndarray],
+        step_size: float
+    ) -> float:
+        """
+        Advances the active muscle one step.
+
+        :param motor_pool_input:
+            Input to the active muscle. Arrays must have one value per motor
+            unit or cluster of the active muscle.
+        :param step_size:
+            How far to advance the simulation in time for this step.
+        """
+        return self.active.step(motor_pool_input, step_size)
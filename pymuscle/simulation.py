@@ -0,0 +1,224 @@
+"""
+Multi-step simulation of a muscle through a fixed protocol of inputs with
+periodic checkpoints.
+"""
+import os
+import tempfile
+from typing import Dict, Optional, Union
+
+import numpy as np
+from numpy import ndarray
+
+from .muscle import Muscle
+from .protocol import Protocol
+
+# Checkpoints written by other layouts are rejected
+_CHECKPOINT_VERSION = 1
+
+
+class Simulation(object):
+    """
+    Steps a muscle through one input per step and records each output.
+
+    When checkpoint_path is given the full mutable state of the muscle, the
+    simulated time, the position in the protocol and the number of recorded
+    outputs are written to it every checkpoint_interval steps. Each
+    checkpoint replaces the previous one atomically so a crash never leaves
+    a partial file behind. :meth:`resume` continues from a checkpoint with
+    outputs bit for bit identical to an uninterrupted run.
+
+    Outputs recorded before a checkpoint are only kept across processes if
+    out is backed by a file, for example a memory map from
+    numpy.lib.format.open_memmap(). Memory maps are flushed before every
+    checkpoint.
+
+    Muscles in real-time mode cannot be checkpointed as their fidelity
+    depends on wall clock time.
+
+    :param muscle: The muscle to step.
+    :param protocol:
+        Inputs to the muscle, one per step. Each row may be a single value
+        or one value per motor unit. A
+        :class:`Protocol <pymuscle.protocol.Protocol>` is expanded into its
+        excitations.
+    :param step_size: How far to advance the simulation in time each step.
+    :param out:
+        Array to record outputs in, one per step. Defaults to a new array.
+    :param checkpoint_path: File to write checkpoints to.
+    :param checkpoint_interval: Steps between checkpoints.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.simulation import Simulation
+
+      muscle = StandardMuscle(1000.0)
+      protocol = np.full(200000, 0.4)
+      sim = Simulation(muscle, protocol, 1 / 50.0, checkpoint_path='run.npz')
+      outputs = sim.run()
+
+      # After a crash, with a freshly constructed muscle
+      sim = Simulation.resume(StandardMuscle(1000.0), protocol, 1 / 50.0, 'run.npz')
+      outputs = sim.run()
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        protocol: Union[ndarray, Protocol],
+        step_size: float,
+        out: Optional[ndarray] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: int = 10000
+    ):
+        assert isinstance(muscle, Muscle)
+        assert checkpoint_interval > 0
+        if isinstance(protocol, Protocol):
+            protocol = protocol.excitations(step_size)
+        protocol = np.asarray(protocol, dtype=float)
+        assert protocol.ndim in (1, 2)
+        if out is None:
+            out = np.full(len(protocol), np.nan)
+        assert out.shape == (len(protocol),)
+
+        self.muscle = muscle
+        self.protocol = protocol
+        self.step_size = step_size
+        self.out = out
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        # Position in the protocol and simulated time
+        self.position = 0
+        self.time = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.position >= len(self.protocol)
+
+    def run(self, steps: Optional[int] = None) -> ndarray:
+        """
+        Steps the muscle through the rest of the protocol, or at most steps
+        more inputs, and returns the array of recorded outputs.
+
+        A final checkpoint is written when the run stops.
+
+        :param steps: Largest number of steps to take.
+        """
+        assert self.muscle.real_time is None, \
+            'Muscles in real-time mode cannot be checkpointed'
+        stop = len(self.protocol)
+        if steps is not None:
+            stop = min(stop, self.position + steps)
+
+        while self.position < stop:
+            # Copy rows as some muscles scale their inputs in place
+            row = self.protocol[self.position]
+            inputs = float(row) if row.ndim == 0 else row.copy()
+            self.out[self.position] = self.muscle.step(inputs, self.step_size)
+            self.position += 1
+            self.time += self.step_size
+            if self.checkpoint_path is not None \
+                    and self.position % self.checkpoint_interval == 0:
+                self.save_checkpoint()
+
+        if self.checkpoint_path is not None \
+                and self.position % self.checkpoint_interval != 0:
+            self.save_checkpoint()
+
+        return self.out
+
+    def save_checkpoint(self, path: Optional[str] = None) -> None:
+        """
+        Atomically writes the state needed to resume this simulation.
+
+        :param path: File to write to. Defaults to checkpoint_path.
+        """
+        path = path or self.checkpoint_path
+        assert path is not None
+        if isinstance(self.out, np.memmap):
+            self.out.flush()
+
+        arrays: Dict[str, ndarray] = {
+            'version': np.array(_CHECKPOINT_VERSION),
+            'motor_unit_count': np.array(self.muscle.motor_unit_count),
+            'protocol_length': np.array(len(self.protocol)),
+            'step_size': np.array(self.step_size),
+            'position': np.array(self.position),
+            'time': np.array(self.time),
+            # Outputs recorded so far
+            'offset': np.array(self.position)
+        }
+        for part, state in self.muscle._get_state().items():
+            for name, value in state.items():
+                if value is not None:
+                    arrays[part + '/' + name] = np.asarray(value)
+
+        _write_atomically(path, arrays)
+
+    @classmethod
+    def resume(
+        cls,
+        muscle: Muscle,
+        protocol: Union[ndarray, Protocol],
+        step_size: float,
+        checkpoint_path: str,
+        out: Optional[ndarray] = None,
+        checkpoint_interval: int = 10000
+    ) -> 'Simulation':
+        """
+        Returns a simulation which continues from a checkpoint.
+
+        The muscle must be constructed with the same arguments as the
+        checkpointed one and the protocol and step size must be the same.
+        Outputs before the checkpoint are read from out if it holds them and
+        are otherwise NaN.
+
+        :param muscle: A muscle to restore the checkpointed state into.
+        :param protocol: See Simulation
+        :param step_size: See Simulation
+        :param checkpoint_path: File to resume from and keep checkpointing to.
+        :param out: See Simulation
+        :param checkpoint_interval: See Simulation
+        """
+        sim = cls(muscle, protocol, step_size, out, checkpoint_path, checkpoint_interval)
+        with np.load(checkpoint_path) as checkpoint:
+            assert int(checkpoint['version']) == _CHECKPOINT_VERSION
+            assert int(checkpoint['motor_unit_count']) == muscle.motor_unit_count
+            assert int(checkpoint['protocol_length']) == len(sim.protocol)
+            assert float(checkpoint['step_size']) == step_size
+
+            state: Dict[str, Dict] = {'muscle': {}, 'pool': {}, 'fibers': {}}
+            for key in checkpoint.files:
+                if '/' not in key:
+                    continue
+                part, name = key.split('/', 1)
+                value = checkpoint[key]
+                state[part][name] = value.item() if value.ndim == 0 else value
+            sim.position = int(checkpoint['position'])
+            sim.time = float(checkpoint['time'])
+            assert int(checkpoint['offset']) <= len(sim.out)
+
+        muscle._set_state(state)
+        return sim
+
+
+def _write_atomically(path: str, arrays: Dict[str, ndarray]) -> None:
+    """
+    Writes arrays to an uncompressed .npz file which replaces path only
+    once it is complete.
+
+    :param path: File to write to.
+    :param arrays: Arrays keyed by name.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,275 @@
+"""
+Event driven simulation of individual motor unit discharges with twitch
+summation as in Fuglevand et al. (1993).
+"""
+import bisect
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+from .muscle import Muscle
+from .potvin_fuglevand_2017_motor_neuron_pool import PotvinFuglevand2017MotorNeuronPool
+from .potvin_fuglevand_2017_muscle_fibers import PotvinFuglevand2017MuscleFibers
+from .protocol import Protocol
+
+
+class SpikeEngine(object):
+    """
+    Simulates the discharges of every motor unit of a muscle and sums their
+    twitches into a force time series.
+
+    The muscle's rate coded models are used for everything but the timing
+    of discharges. Each unit's next discharge is scheduled in a priority
+    queue one interspike interval after its last, using the firing rate for
+    the excitation at the time of the discharge. Adaptation is included but
+    frozen at the muscle's state when simulate() is called.
+    Units below their recruitment threshold are idle and are woken only at
+    the time the protocol's excitation crosses their threshold. The cost
+    therefore grows with the number of discharges rather than with the
+    number of units times the number of time steps.
+
+    Each discharge adds a twitch A * t / T * exp(1 - t / T), where T is the
+    unit's current contraction time. The amplitude A is the unit's current
+    peak force scaled by the Fuglevand et al. (1993) gain for its
+    instantaneous normalized firing rate T / ISI, and by the area of one
+    twitch relative to the fibers model's force per discharge at low rates.
+    A unit discharging regularly then produces on average the rate coded
+    force of the fibers model, with ripple about that mean at low rates.
+    Twitches are truncated after twitch_cutoff contraction times.
+
+    The muscle's state is read when simulate() is called and is not
+    changed. Neither fatigue nor further adaptation is applied during the
+    simulation. Forces are divided by the muscle's output range so that,
+    averaged over a few interspike intervals, they are on the scale of the
+    muscle's own outputs.
+
+    :param muscle:
+        A muscle with Potvin & Fuglevand motor neuron pool and fibers models.
+    :param isi_cv:
+        Coefficient of variation of interspike intervals. Fuglevand et al.
+        (1993) used 0.2. Defaults to perfectly regular discharges.
+    :param twitch_cutoff: Length of each twitch in contraction times.
+    :param seed: Seed for the interspike interval variability.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.protocol import Protocol
+      from pymuscle.spikes import SpikeEngine
+
+      engine = SpikeEngine(StandardMuscle(), isi_cv=0.2)
+      protocol = Protocol().ramp(0.0, 0.5, 2.0).hold(0.5, 3.0)
+      forces = engine.simulate(protocol, np.arange(0.0, 5.0, 0.001))
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        isi_cv: float = 0.0,
+        twitch_cutoff: float = 10.0,
+        seed: Optional[int] = None
+    ):
+        assert isinstance(muscle._pool, PotvinFuglevand2017MotorNeuronPool)
+        assert isinstance(muscle._fibers, PotvinFuglevand2017MuscleFibers)
+        assert isi_cv >= 0
+        assert twitch_cutoff > 0
+        self.muscle = muscle
+        self.isi_cv = isi_cv
+        self.twitch_cutoff = twitch_cutoff
+        self._rng = np.random.RandomState(seed)
+
+        # Filled in by simulate()
+        self.spike_times = np.zeros(0)
+        self.spike_units = np.zeros(0, dtype=int)
+
+    @property
+    def spike_count(self) -> int:
+        return len(self.spike_times)
+
+    def _firing_rate(self, unit: int, excitation: float) -> float:
+        """
+        Returns the adapted firing rate of one motor unit. This is the
+        single unit, scalar form of the pool's _inner_calc_firing_rates()
+        and _calc_adaptations().
+
+        :param unit: Index of the motor unit.
+        :param excitation: Input to the motor neuron.
+        """
+        pool = self.muscle._pool
+        rate = excitation - pool._recruitment_thresholds[unit] + pool._min_firing_rate
+        if rate < pool._min_firing_rate:
+            return 0.0
+        rate = min(rate * pool._firing_gain, pool._peak_firing_rates[unit])
+        curve = pool._adaptation_magnitude \
+            * (rate - pool._min_firing_rate + pool._derecruitment_delta) \
+            * pool._adaptation_ratios[unit]
+        adaptation = max(curve * (1 - pool._adaptation_decays[unit]), 0.0)
+        return float(rate - adaptation)
+
+    def _interval(self, rate: float) -> float:
+        """
+        Returns the time until the next discharge of a unit firing at rate.
+
+        :param rate: Firing rate in discharges per second.
+        """
+        interval = 1.0 / rate
+        if self.isi_cv > 0:
+            # Keep intervals positive however large the noise
+            interval *= max(1.0 + self.isi_cv * self._rng.randn(), 0.05)
+        return interval
+
+    def _recruitment_times(
+        self,
+        protocol: Protocol,
+        start: float,
+        index: int
+    ) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the units which reach their recruitment threshold during a
+        segment and the time at which each does.
+
+        :param protocol: The protocol being simulated.
+        :param start: Time at which the segment starts.
+        :param index: Position of the segment in the protocol.
+        """
+        segment = protocol.segments[index]
+        # Thresholds on the muscle's scale
+        thresholds = self.muscle._pool._recruitment_thresholds \
+            / self.muscle._input_range
+        if segment.end <= segment.start:
+            units = np.flatnonzero(thresholds <= segment.start)
+            return units, np.full(len(units), start)
+
+        units = np.flatnonzero(thresholds <= segment.end)
+        fractions = (thresholds[units] - segment.start) / (segment.end - segment.start)
+        times = start + np.maximum(fractions, 0.0) * segment.duration
+        return units, times
+
+    def _add_twitch(
+        self,
+        forces: ndarray,
+        sample_times: ndarray,
+        time: float,
+        amplitude: float,
+        contraction_time: float
+    ) -> None:
+        """
+        Adds one twitch to the forces at the sample times it covers.
+
+        :param forces: Force at each sample time.
+        :param sample_times: Sorted times at which force is sampled.
+        :param time: Time of the discharge.
+        :param amplitude: Peak force of the twitch.
+        :param contraction_time: Time to peak force, in seconds.
+        """
+        lo = np.searchsorted(sample_times, time, side='right')
+        hi = np.searchsorted(
+            sample_times,
+            time + self.twitch_cutoff * contraction_time,
+            side='right'
+        )
+        if lo == hi:
+            return
+        ratios = (sample_times[lo:hi] - time) / contraction_time
+        forces[lo:hi] += amplitude * ratios * np.exp(1 - ratios)
+
+    def simulate(self, protocol: Protocol, sample_times: ndarray) -> ndarray:
+        """
+        Simulates the discharges caused by a protocol and returns the force
+        at each sample time.
+
+        Discharge times and units are kept in spike_times and spike_units.
+
+        :param protocol: Excitation over time on the muscle's scale.
+        :param sample_times: Sorted times at which to sample force, in seconds.
+        """
+        sample_times = np.asarray(sample_times, dtype=float)
+        assert np.all(np.diff(sample_times) >= 0)
+        forces = np.zeros(len(sample_times))
+        if len(sample_times) == 0:
+            return forces
+        end = min(sample_times[-1], protocol.duration)
+
+        fibers = self.muscle._fibers
+        peak_forces = fibers.current_peak_forces
+        # Contraction times are in milliseconds
+        contraction_times = fibers._current_contraction_times / 1000
+        linear_gain = (1 - np.exp(-2 * 0.4 ** 3)) / 0.4
+        # A twitch of amplitude P has area P * T * e, while the fibers model
+        # gives P * linear_gain * T per discharge below fusion
+        twitch_scale = linear_gain / np.e
+
+        queue: List[Tuple[float, int]] = []
+        scheduled = np.zeros(self.muscle.motor_unit_count, dtype=bool)
+        # Units whose next discharge is their first since being woken
+        waking = np.zeros(self.muscle.motor_unit_count, dtype=bool)
+        thresholds = self.muscle._pool._recruitment_thresholds
+        segment_starts = list(protocol.segment_starts()) + [protocol.duration]
+
+        def excitation_at(time: float) -> float:
+            # Protocol.excitation_at() without recalculating segment starts
+            index = bisect.bisect_right(segment_starts, time) - 1
+            if index >= len(protocol.segments):
+                return 0.0
+            segment = protocol.segments[index]
+            return segment.excitation_at(time - segment_starts[index])
+        next_segment = 0
+        spike_times: List[float] = []
+        spike_units: List[int] = []
+
+        while True:
+            # Wake idle units recruited by the next segment before any
+            # discharge after its start.
+            while next_segment < len(protocol.segments) \
+                    and (not queue or segment_starts[next_segment] <= queue[0][0]):
+                start = segment_starts[next_segment]
+                if start > end:
+                    next_segment = len(protocol.segments)
+                    break
+                units, times = self._recruitment_times(protocol, start, next_segment)
+                stop = segment_starts[next_segment + 1]
+                for unit, time in zip(units, times):
+                    if not scheduled[unit] and time < stop:
+                        scheduled[unit] = True
+                        waking[unit] = True
+                        heapq.heappush(queue, (time, int(unit)))
+                next_segment += 1
+
+            if not queue or queue[0][0] > end:
+                break
+
+            time, unit = heapq.heappop(queue)
+            excitation = excitation_at(time) * self.muscle._input_range
+            if waking[unit]:
+                # Recruitment times are only exact up to rounding
+                excitation = max(excitation, thresholds[unit])
+                waking[unit] = False
+            rate = self._firing_rate(unit, excitation)
+            if rate <= 0:
+                # Derecruited until the excitation rises again
+                scheduled[unit] = False
+                continue
+
+            interval = self._interval(rate)
+            spike_times.append(time)
+            spike_units.append(unit)
+
+            # Fuglevand et al. (1993) gain for fused contractions
+            normalized_rate = contraction_times[unit] / interval
+            gain = 1.0
+            if normalized_rate > 0.4:
+                gain = (1 - np.exp(-2 * normalized_rate ** 3)) \
+                    / normalized_rate / linear_gain
+            self._add_twitch(
+                forces,
+                sample_times,
+                time,
+                peak_forces[unit] * gain * twitch_scale,
+                contraction_times[unit]
+            )
+            heapq.heappush(queue, (time + interval, unit))
+
+        self.spike_times = np.array(spike_times)
+        self.spike_units = np.array(spike_units, dtype=int)
+        return forces / self.muscle._output_range
@@ -0,0 +1,185 @@
+"""
+asyncio driver for stepping a muscle inside a real-time control loop.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+
+from numpy import ndarray
+
+from .muscle import Muscle
+
+# Marks the end of a stream in the output queue
+_END = object()
+
+
+class StreamStats(object):
+    """
+    Timing statistics collected while streaming.
+
+    Jitter is the absolute difference between the time separating two
+    consecutive outputs and the step size. A deadline is missed when an
+    output is produced after the end of its step.
+    """
+    def __init__(self):
+        self.steps = 0
+        self.deadline_misses = 0
+        self.dropped = 0
+        self.max_jitter = 0.0
+        self._total_jitter = 0.0
+
+    @property
+    def mean_jitter(self) -> float:
+        if self.steps < 2:
+            return 0.0
+        return self._total_jitter / (self.steps - 1)
+
+    def _record(self, jitter: Optional[float], missed: bool):
+        self.steps += 1
+        self.deadline_misses += int(missed)
+        if jitter is not None:
+            self._total_jitter += jitter
+            self.max_jitter = max(self.max_jitter, jitter)
+
+
+class AsyncMuscleDriver(object):
+    """
+    Steps a muscle at a fixed simulated rate from an asynchronous source of
+    excitations without blocking the event loop.
+
+    Each step waits for the next excitation, runs muscle.step() in an
+    executor and queues the resulting output for the consumer. When
+    realtime is set the driver then sleeps until the start of the next step.
+    A step which finishes after its deadline is counted as a miss and the
+    schedule restarts from the current time rather than trying to catch up.
+
+    At most max_pending outputs wait for the consumer. When the queue is full
+    the driver either waits for the consumer, pausing the simulation, or
+    with drop_when_full discards the oldest waiting output so the consumer
+    always receives recent values.
+
+    Timing statistics for the latest stream are kept in stats.
+
+    :param muscle: The muscle to step.
+    :param step_size: Simulated time per step, in seconds.
+    :param executor:
+        Executor used to run steps. Defaults to the event loop's default
+        executor. Pass offload=False to step in the event loop instead,
+        which is cheaper for small muscles.
+    :param offload: Whether to run steps in the executor.
+    :param max_pending: Outputs which may wait for the consumer.
+    :param drop_when_full:
+        Discard the oldest waiting output rather than waiting for the
+        consumer.
+    :param realtime:
+        Pace steps to wall clock time. Without this steps run as fast as the
+        source and consumer allow.
+
+    Usage::
+
+      from pymuscle import StandardMuscle
+      from pymuscle.streaming import AsyncMuscleDriver
+
+      driver = AsyncMuscleDriver(StandardMuscle(), 1 / 200.0)
+      async for output in driver.stream(excitation_source()):
+          send_to_rig(output)
+    """
+    def __init__(
+        self,
+        muscle: Muscle,
+        step_size: float,
+        executor: Optional[Executor] = None,
+        offload: bool = True,
+        max_pending: int = 1,
+        drop_when_full: bool = False,
+        realtime: bool = True
+    ):
+        assert step_size > 0
+        assert max_pending > 0
+        self.muscle = muscle
+        self.step_size = step_size
+        self.stats = StreamStats()
+
+        # Assign non-public attributes
+        self._executor = executor
+        self._offload = offload
+        self._max_pending = max_pending
+        self._drop_when_full = drop_when_full
+        self._realtime = realtime
+
+    async def stream(
+        self,
+        excitations: AsyncIterable[Union[float, ndarray]]
+    ) -> AsyncIterator[float]:
+        """
+        Yields one muscle output for each excitation from the given source.
+
+        :param excitations: Asynchronous source of inputs to muscle.step().
+        """
+        self.stats = StreamStats()
+        queue = asyncio.Queue(maxsize=self._max_pending)
+        producer = asyncio.ensure_future(self._produce(excitations, queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    async def _step(self, excitation: Union[float, ndarray]) -> float:
+        if not self._offload:
+            return self.muscle.step(excitation, self.step_size)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.muscle.step,
+            excitation,
+            self.step_size
+        )
+
+    async def _put(self, queue: asyncio.Queue, item: object):
+        if self._drop_when_full and queue.full():
+            queue.get_nowait()
+            self.stats.dropped += 1
+        await queue.put(item)
+
+    async def _produce(
+        self,
+        excitations: AsyncIterable[Union[float, ndarray]],
+        queue: asyncio.Queue
+    ):
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        deadline = start + self.step_size
+        last_output = None
+        try:
+            async for excitation in excitations:
+                output = await self._step(excitation)
+                await self._put(queue, output)
+
+                now = loop.time()
+                jitter = None
+                if last_output is not None:
+                    jitter = abs(now - last_output - self.step_size)
+                last_output = now
+                missed = now > deadline
+                self.stats._record(jitter, missed)
+
+                if missed:
+                    deadline = now
+                elif self._realtime:
+                    await asyncio.sleep(deadline - now)
+                deadline += self.step_size
+        except Exception as error:
+            await queue.put(error)
+            return
+
+        await queue.put(_END)
@@ -0,0 +1,252 @@
+"""
+Series elastic (compliant) tendon for Hill-type muscles.
+
+With a compliant tendon the length of the muscle fibers is no longer given
+by the physics simulation. Instead the musculotendon length is split between
+fibers and tendon such that the fiber force equals the tendon force. This
+module solves that equilibrium for many muscles at once.
+
+The tendon force-strain curve is from Thelen (2003), "Adjustment of muscle
+mechanics model parameters to simulate dynamic contractions in older adults"
+"""
+import numpy as np
+from numpy import ndarray
+from typing import Optional, Sequence, Tuple, Union
+
+from .hill_type import _force_length_multiplier, _force_velocity_multiplier
+
+FloatOrArray = Union[float, ndarray]
+
+
+def tendon_force_strain_curve(
+    strains: FloatOrArray,
+    strain_at_max_force: float = 0.04
+) -> Tuple[FloatOrArray, FloatOrArray]:
+    """
+    Returns the tendon force, as a multiple of maximum isometric force, and
+    its derivative with respect to strain. Slack tendons produce no force.
+    An exponential toe region gives way to a linear region.
+
+    :param strains: Tendon strain (length - slack length) / slack length.
+    :param strain_at_max_force:
+        Strain at which the tendon force equals maximum isometric force.
+    """
+    toe_force = 0.33
+    toe_curvature = 3.0
+    toe_strain = 0.609 * strain_at_max_force
+    linear_stiffness = 1.712 / strain_at_max_force
+
+    strains = np.asarray(strains, dtype=float)
+    toe_scale = toe_force / (np.exp(toe_curvature) - 1)
+    # Clip to the toe region so exponentials in the linear region can't
+    # overflow.
+    toe_strains = np.clip(strains, 0, toe_strain)
+    toe_exp = np.exp(toe_curvature * toe_strains / toe_strain)
+
+    forces = np.where(
+        strains > toe_strain,
+        linear_stiffness * (strains - toe_strain) + toe_force,
+        toe_scale * (toe_exp - 1)
+    )
+    slopes = np.where(
+        strains > toe_strain,
+        linear_stiffness,
+        toe_scale * toe_curvature / toe_strain * toe_exp
+    )
+    slack = strains <= 0
+    forces = np.where(slack, 0.0, forces)
+    slopes = np.where(slack, 0.0, slopes)
+    return forces, slopes
+
+
+class SeriesElasticTendon(object):
+    """
+    Solves fiber lengths for a batch of Hill-type muscles in series with
+    compliant tendons.
+
+    Each step finds the fiber length at which the active fiber force,
+    activation * force-length * force-velocity, equals the tendon force. The
+    fiber velocity is taken from the change in fiber length since the last
+    step. All muscles are solved together with a vectorized Newton iteration
+    warm started from the previous fiber lengths.
+
+    After each step iterations holds the number of Newton iterations used
+    by each muscle and converged whether each met the tolerance.
+    failure_count is the running total of muscle steps which did not
+    converge. Muscles which fail to converge keep their last iterate.
+
+    Forces are returned as multiples of maximum isometric force.
+
+    :param rest_lengths: Resting length of each muscle's fibers.
+    :param tendon_slack_lengths: Length at which each tendon begins to stretch.
+    :param initial_fiber_lengths:
+        Fiber lengths before the first step. Defaults to rest_lengths.
+    :param strain_at_max_force: See tendon_force_strain_curve()
+    :param curve_width_factor: See contractile_element_force_length_curve()
+    :param peak_force_length: See contractile_element_force_length_curve()
+    :param max_velocity: See contractile_element_force_velocity_curve()
+    :param max_exccentric_multiple:
+        See contractile_element_force_velocity_curve()
+    :param tolerance: Largest acceptable force imbalance.
+    :param max_iterations: Iterations allowed per step before giving up.
+
+    Usage::
+
+      from pymuscle.tendon import SeriesElasticTendon
+
+      tendons = SeriesElasticTendon([10.0, 8.0], [20.0, 25.0])
+      forces = tendons.step([31.0, 33.5], [0.5, 0.2], 1 / 50.0)
+    """
+    def __init__(
+        self,
+        rest_lengths: Union[Sequence[float], ndarray],
+        tendon_slack_lengths: Union[Sequence[float], ndarray],
+        initial_fiber_lengths: Optional[Union[Sequence[float], ndarray]] = None,
+        strain_at_max_force: float = 0.04,
+        curve_width_factor: FloatOrArray = 17.33,
+        peak_force_length: FloatOrArray = 1.1,
+        max_velocity: FloatOrArray = 3.0,
+        max_exccentric_multiple: FloatOrArray = 1.8,
+        tolerance: float = 1e-8,
+        max_iterations: int = 20
+    ):
+        self.rest_lengths = np.array(rest_lengths, dtype=float)
+        shape = self.rest_lengths.shape
+        self.tendon_slack_lengths = np.array(
+            np.broadcast_to(tendon_slack_lengths, shape), dtype=float
+        )
+        if initial_fiber_lengths is None:
+            initial_fiber_lengths = self.rest_lengths
+        self.fiber_lengths = np.array(
+            np.broadcast_to(initial_fiber_lengths, shape), dtype=float
+        )
+
+        # Assign non-public attributes
+        self._strain_at_max_force = strain_at_max_force
+        self._curve_width_factor = curve_width_factor
+        self._peak_force_length = peak_force_length
+        self._max_velocity = max_velocity
+        self._max_exccentric_multiple = max_exccentric_multiple
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+
+        # Assign public attributes
+        self.iterations = np.zeros(shape, dtype=int)
+        self.converged = np.ones(shape, dtype=bool)
+        self.failure_count = 0
+
+    def _calc_residuals(
+        self,
+        fiber_lengths: ndarray,
+        prev_fiber_lengths: ndarray,
+        muscle_tendon_lengths: ndarray,
+        activations: ndarray,
+        step_size: float
+    ) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Returns the force imbalance (fiber force - tendon force), its
+        derivative with respect to fiber length, and the tendon force.
+
+        :param fiber_lengths: Current estimate of the fiber lengths.
+        :param prev_fiber_lengths: Fiber lengths at the previous step.
+        :param muscle_tendon_lengths: Total length of each muscle and tendon.
+        :param activations: Output of each muscle from 0.0 to 1.0.
+        :param step_size: Time elapsed since the previous step.
+        """
+        rest = self.rest_lengths
+        slack = self.tendon_slack_lengths
+
+        # Force-length and its derivative
+        offsets = fiber_lengths / rest - self._peak_force_length
+        force_length = _force_length_multiplier(
+            fiber_lengths / rest,
+            self._curve_width_factor,
+            self._peak_force_length
+        )
+        d_force_length = force_length * -3 * self._curve_width_factor \
+            * offsets * np.abs(offsets) / rest
+
+        # Force-velocity and its derivative. Shortening is positive.
+        velocity_scale = rest * step_size * self._max_velocity
+        norm_velocities = (prev_fiber_lengths - fiber_lengths) / velocity_scale
+        force_velocity = _force_velocity_multiplier(
+            norm_velocities,
+            self._max_exccentric_multiple
+        )
+        # The curve is a scaled logistic so its slope follows from its value
+        d_force_velocity = force_velocity \
+            * (1 - force_velocity / self._max_exccentric_multiple) \
+            / (0.18 * velocity_scale)
+
+        # Tendon force and its derivative
+        strains = (muscle_tendon_lengths - fiber_lengths - slack) / slack
+        tendon_forces, d_tendon = tendon_force_strain_curve(
+            strains,
+            self._strain_at_max_force
+        )
+
+        residuals = activations * force_length * force_velocity - tendon_forces
+        slopes = activations * (d_force_length * force_velocity
+                                + force_length * d_force_velocity) \
+            + d_tendon / slack
+        return residuals, slopes, tendon_forces
+
+    def step(
+        self,
+        muscle_tendon_lengths: Union[Sequence[float], ndarray],
+        activations: Union[float, Sequence[float], ndarray],
+        step_size: float
+    ) -> ndarray:
+        """
+        Solves for the new fiber lengths and returns the force of each
+        muscle-tendon unit as a multiple of maximum isometric force.
+
+        :param muscle_tendon_lengths: Total length of each muscle and tendon.
+        :param activations: Output of each muscle from 0.0 to 1.0.
+        :param step_size: Time elapsed since the previous step.
+        """
+        muscle_tendon_lengths = np.asarray(muscle_tendon_lengths, dtype=float)
+        activations = np.broadcast_to(np.asarray(activations, dtype=float), self.rest_lengths.shape)
+        prev_fiber_lengths = self.fiber_lengths
+        fiber_lengths = prev_fiber_lengths.copy()
+        # Fibers can't be longer than the whole muscle-tendon unit
+        max_lengths = muscle_tendon_lengths
+        min_lengths = 0.01 * self.rest_lengths
+        # Limit each Newton step to keep the iteration stable far from
+        # the solution.
+        max_steps = 0.1 * self.rest_lengths
+
+        iterations = np.zeros(fiber_lengths.shape, dtype=int)
+        active = np.ones(fiber_lengths.shape, dtype=bool)
+        tendon_forces = np.zeros(fiber_lengths.shape)
+        for i in range(self._max_iterations + 1):
+            residuals, slopes, forces = self._calc_residuals(
+                fiber_lengths,
+                prev_fiber_lengths,
+                muscle_tendon_lengths,
+                activations,
+                step_size
+            )
+            tendon_forces = np.where(active, forces, tendon_forces)
+            active &= np.abs(residuals) > self._tolerance
+            if i == self._max_iterations or not active.any():
+                break
+
+            # The slope can vanish or turn negative, for example with a slack
+            # tendon or on the descending limb of the force-length curve. Fall
+            # back to a bounded step in the direction which reduces the
+            # imbalance.
+            usable = active & (slopes > 0)
+            safe_slopes = np.where(usable, slopes, 1.0)
+            deltas = np.where(usable, residuals / safe_slopes, np.sign(residuals) * max_steps)
+            deltas = np.clip(deltas, -max_steps, max_steps)
+            fiber_lengths = np.where(active, fiber_lengths - deltas, fiber_lengths)
+            fiber_lengths = np.clip(fiber_lengths, min_lengths, max_lengths)
+            iterations += active
+
+        self.fiber_lengths = fiber_lengths
+        self.iterations = iterations
+        self.converged = ~active
+        self.failure_count += int(np.count_nonzero(active))
+
+        return tendon_forces
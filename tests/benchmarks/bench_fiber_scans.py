@@ -0,0 +1,55 @@
+"""
+Reports how much of a muscle step goes to finding the active and fatigued
+motor units whose fatigue state is updated.
+
+The scans walk every motor unit, as do the pool and the force calculations
+of every step, so they are reported as a share of the whole step.
+
+    python bench_fiber_scans.py
+"""
+import timeit
+import numpy as np
+from pymuscle import PotvinFuglevandMuscle, StandardMuscle
+
+
+def best_of(f, number=20, repeat=3):
+    return min(timeit.repeat(f, number=number, repeat=repeat)) / number
+
+
+def report(name, m, excitation):
+    # Fatigue some units so both scans find work
+    for _ in range(20):
+        m.step(excitation, 1 / 50.0)
+    fibers = m._fibers
+
+    def scans():
+        np.flatnonzero(fibers._normalized_forces > 0)
+        np.flatnonzero(fibers._fatigued)
+
+    step = best_of(lambda: m.step(excitation, 1 / 50.0))
+    scan = best_of(scans)
+    active = np.count_nonzero(fibers._normalized_forces > 0)
+    print('{:>22} {:>8d} {:>8d} {:>10.3f} {:>10.3f} {:>6.1f}%'.format(
+        name,
+        m.motor_unit_count,
+        active,
+        step * 1e3,
+        scan * 1e3,
+        100 * scan / step
+    ))
+
+
+def main():
+    print('{:>22} {:>8} {:>8} {:>10} {:>10} {:>7}'.format(
+        'muscle', 'units', 'active', 'step ms', 'scans ms', 'share'
+    ))
+    for n in [1000, 100000, 1000000]:
+        for excitation in [3.0, 20.0]:
+            report('PotvinFuglevandMuscle', PotvinFuglevandMuscle(n), excitation)
+    for max_force in [32.0, 500.0, 2000.0]:
+        for excitation in [0.05, 0.3]:
+            report('StandardMuscle', StandardMuscle(max_force), excitation)
+
+
+if __name__ == '__main__':
+    main()
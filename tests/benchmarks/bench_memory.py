@@ -0,0 +1,53 @@
+"""
+Reports the memory footprint of StandardMuscles across a range of max forces.
+
+Peak allocation per step is measured with tracemalloc. Pass a budget in
+megabytes to flag configurations which would exceed it.
+
+    python bench_memory.py --budget 50
+"""
+import argparse
+from pymuscle import StandardMuscle as Muscle
+
+
+def report(max_force, steps):
+    m = Muscle(max_force)
+    r = m.memory_report()
+    r['scratch'] = m.measure_step_allocation(0.5, 1 / 50.0, steps)
+    r['total'] = r['parameters'] + r['state'] + r['scratch']
+    r['per_motor_unit'] = r['total'] / r['motor_unit_count']
+    return r
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=None,
+                        help='Per muscle budget in megabytes')
+    parser.add_argument('--steps', type=int, default=10,
+                        help='Steps over which to measure peak allocation')
+    args = parser.parse_args()
+
+    header = '{:>10} {:>8} {:>12} {:>12} {:>12} {:>12} {:>10}'
+    row = '{:>10.1f} {:>8d} {:>12d} {:>12d} {:>12d} {:>12d} {:>10.1f}'
+    print(header.format(
+        'max_force', 'units', 'parameters', 'state', 'scratch', 'total',
+        'bytes/unit'
+    ))
+    for max_force in [8.0, 32.0, 90.0, 200.0, 500.0, 1000.0, 2000.0]:
+        r = report(max_force, args.steps)
+        line = row.format(
+            max_force,
+            r['motor_unit_count'],
+            r['parameters'],
+            r['state'],
+            r['scratch'],
+            r['total'],
+            r['per_motor_unit']
+        )
+        if args.budget is not None and r['total'] > args.budget * 1e6:
+            line += '  OVER BUDGET'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput of the muscled hopper in env steps per second.
+
+The muscle portion of an env step is always measured: four separate
+muscles stepped one by one as the env used to, against a single
+MuscleGroup stepped once per env step or once per physics frame, either
+with one step() call per frame or with one step_many() call per env step.
+If mujoco_py and gym are installed the full env is measured as well.
+"""
+import os
+import sys
+import numpy as np
+from pymuscle import MuscleGroup
+from pymuscle import PotvinFuglevandMuscle as Muscle
+from util import timing
+
+MOTOR_UNIT_COUNTS = [300, 300, 200, 100]
+FRAME_SKIP = 4
+FRAME_STEP_SIZE = 0.002
+
+
+EXCITATIONS = np.array([3.0, 2.0, 4.0, 1.0])
+
+# Muscles as the env builds them by default: peripheral fatigue only
+APPLY_FATIGUE = False
+
+
+@timing
+def separate_muscles(steps):
+    muscles = [Muscle(n, APPLY_FATIGUE) for n in MOTOR_UNIT_COUNTS]
+    for _ in range(steps):
+        [m.step(e, FRAME_STEP_SIZE * FRAME_SKIP)
+         for m, e in zip(muscles, EXCITATIONS)]
+
+
+@timing
+def grouped_muscles(steps, substeps):
+    group = MuscleGroup([Muscle(n, APPLY_FATIGUE) for n in MOTOR_UNIT_COUNTS])
+    excitations = EXCITATIONS
+    for _ in range(steps):
+        for _ in range(substeps):
+            group.step(excitations, FRAME_STEP_SIZE * FRAME_SKIP / substeps)
+
+
+@timing
+def grouped_muscles_step_many(steps):
+    group = MuscleGroup([Muscle(n, APPLY_FATIGUE) for n in MOTOR_UNIT_COUNTS])
+    excitations = EXCITATIONS
+    for _ in range(steps):
+        group.step_many(excitations, FRAME_STEP_SIZE, FRAME_SKIP)
+
+
+@timing
+def hopper_env(steps, substep_muscles):
+    sys.path.insert(0, os.path.join(
+        os.path.dirname(__file__), '..', '..', 'examples'
+    ))
+    from envs.muscled_hopper import MuscledHopperEnv
+    env = MuscledHopperEnv(APPLY_FATIGUE, substep_muscles)
+    env.reset()
+    for _ in range(steps):
+        _, _, done, _ = env.step(env.action_space.sample())
+        if done:
+            env.reset()
+
+
+def main():
+    steps = 5000
+    runs = [
+        ('separate muscles', separate_muscles(steps)[0]),
+        ('muscle group', grouped_muscles(steps, 1)[0]),
+        ('muscle group, substepped', grouped_muscles(steps, FRAME_SKIP)[0]),
+        ('step_many, substepped', grouped_muscles_step_many(steps)[0]),
+    ]
+    try:
+        runs.append(('hopper env', hopper_env(steps, False)[0]))
+        runs.append(('hopper env, substepped', hopper_env(steps, True)[0]))
+    except ImportError as e:
+        print('Skipping env benchmark: {}'.format(e))
+
+    for name, duration in runs:
+        print('{:>26}: {:10.1f} env steps / second'.format(name, steps / duration))
+
+
+if __name__ == '__main__':
+    main()
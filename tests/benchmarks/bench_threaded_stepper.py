@@ -0,0 +1,66 @@
+"""
+Steps per second of a body of large muscles stepped one after another, as
+muscle.step() is usually called, and by a ThreadedMuscleStepper with 1, 2
+and 4 threads.
+
+Speedup depends on the number of CPUs available. It can not exceed it.
+
+    python bench_threaded_stepper.py --muscles 40 --max-force 2000
+"""
+import argparse
+import os
+import time
+import numpy as np
+from pymuscle import StandardMuscle as Muscle
+from pymuscle.parallel import ThreadedMuscleStepper
+
+
+def serial(muscles, excitations, steps):
+    start = time.perf_counter()
+    for _ in range(steps):
+        [m.step(e, 1 / 50.0) for m, e in zip(muscles, excitations)]
+    return time.perf_counter() - start
+
+
+def threaded(muscles, excitations, steps, thread_count):
+    with ThreadedMuscleStepper(muscles, thread_count) as stepper:
+        start = time.perf_counter()
+        for _ in range(steps):
+            stepper.step(excitations, 1 / 50.0)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--muscles', type=int, default=40)
+    parser.add_argument('--max-force', type=float, default=2000.0)
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    excitations = np.linspace(0.2, 0.8, args.muscles)
+
+    def build():
+        return [Muscle(args.max_force) for _ in range(args.muscles)]
+
+    print('{} muscles of {} motor units, {} CPUs'.format(
+        args.muscles,
+        Muscle(args.max_force).motor_unit_count,
+        os.cpu_count()
+    ))
+
+    baseline = serial(build(), excitations, args.steps)
+    runs = [('serial step()', baseline)]
+    for thread_count in [1, 2, 4]:
+        duration = threaded(build(), excitations, args.steps, thread_count)
+        runs.append(('{} threads'.format(thread_count), duration))
+
+    for name, duration in runs:
+        print('{:>14}: {:8.1f} steps / second, {:5.2f}x serial'.format(
+            name,
+            args.steps / duration,
+            baseline / duration
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Steps per second of one very large muscle stepped directly by muscle.step()
+and by a TiledMuscleStepper with 1, 2 and 4 threads.
+
+Speedup depends on the number of CPUs available. It can not exceed it.
+
+    python bench_tiled_stepper.py --motor-units 1000000
+"""
+import argparse
+import os
+import time
+from pymuscle import PotvinFuglevandMuscle as Muscle
+from pymuscle.parallel import TiledMuscleStepper
+
+
+def direct(muscle, excitation, steps):
+    start = time.perf_counter()
+    for _ in range(steps):
+        muscle.step(excitation, 1 / 50.0)
+    return time.perf_counter() - start
+
+
+def tiled(muscle, excitation, steps, tile_size, thread_count):
+    with TiledMuscleStepper(muscle, tile_size, thread_count) as stepper:
+        start = time.perf_counter()
+        for _ in range(steps):
+            stepper.step(excitation, 1 / 50.0)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--motor-units', type=int, default=1000000)
+    parser.add_argument('--excitation', type=float, default=40.0)
+    parser.add_argument('--tile-size', type=int, default=16384)
+    parser.add_argument('--steps', type=int, default=20)
+    args = parser.parse_args()
+
+    print('{} motor units in tiles of {}, {} CPUs'.format(
+        args.motor_units,
+        args.tile_size,
+        os.cpu_count()
+    ))
+
+    baseline = direct(Muscle(args.motor_units), args.excitation, args.steps)
+    runs = [('muscle.step()', baseline)]
+    for thread_count in [1, 2, 4]:
+        duration = tiled(
+            Muscle(args.motor_units),
+            args.excitation,
+            args.steps,
+            args.tile_size,
+            thread_count
+        )
+        runs.append(('{} threads'.format(thread_count), duration))
+
+    for name, duration in runs:
+        print('{:>14}: {:8.1f} steps / second, {:5.2f}x muscle.step()'.format(
+            name,
+            args.steps / duration,
+            baseline / duration
+        ))
+
+
+if __name__ == '__main__':
+    main()
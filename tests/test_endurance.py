@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle
+from pymuscle.endurance import _parameter_hash, endurance_curve, time_to_failure
+
+
+def brute_force_failure(muscle, target, excitation, step_size):
+    # Time of the first step whose output falls short of the target
+    time = 0.0
+    while muscle.step(excitation, step_size) >= target:
+        time += step_size
+    return time
+
+
+def test_time_to_failure():
+    step_size = 1 / 50.0
+    muscle = StandardMuscle()
+    expected = brute_force_failure(muscle.clone(), 0.3, 0.5, step_size)
+
+    result = muscle.time_to_failure(0.3, 0.5, step_size)
+    assert result.failed
+    assert abs(result.time - expected) <= result.tolerance
+    assert result.time == pytest.approx(expected, rel=1e-3)
+    assert result.steps < expected / step_size / 5
+    # The muscle at failure can no longer hold the target
+    assert result.muscle.step(0.5, step_size) < 0.3
+
+    # Without coarse steps the failure lies within the last plain step
+    fine = muscle.time_to_failure(0.3, 0.5, step_size, coarse_step_size=step_size)
+    assert expected - step_size <= fine.time <= expected
+    assert fine.tolerance <= 1e-3
+
+    # The muscle itself is untouched
+    assert np.all(muscle._pool._recruitment_durations == 0)
+
+
+def test_time_to_failure_tracking():
+    step_size = 1 / 50.0
+    muscle = StandardMuscle()
+    fixed = time_to_failure(muscle, 0.3, 0.5)
+    result = time_to_failure(muscle, 0.3)
+    # Raising the excitation as the muscle fatigues holds the target longer
+    assert result.time > fixed.time
+    assert result.excitation == pytest.approx(1.0, abs=0.01)
+    assert result.muscle.step(1.0, step_size) < 0.3
+    # The tolerance covers the error of coarse steps while tracking
+    expected = time_to_failure(muscle, 0.3, coarse_step_size=step_size).time
+    assert abs(result.time - expected) <= result.tolerance
+    assert result.tolerance > 1e-3
+
+    assert time_to_failure(muscle, 2.0).time == 0.0
+    assert not time_to_failure(muscle, 0.3, 0.5, max_time=10.0).failed
+
+
+def test_endurance_curve(tmp_path):
+    muscle = StandardMuscle()
+    targets = [0.2, 0.5, 0.7, 2.0]
+    curve = endurance_curve(muscle, targets, max_time=300.0)
+    expected = [time_to_failure(muscle, t, max_time=300.0).time for t in targets]
+    assert not curve.cached
+    assert curve.times == pytest.approx(expected, rel=1e-6)
+    assert curve.tolerances == pytest.approx(
+        [time_to_failure(muscle, t, max_time=300.0).tolerance for t in targets],
+        abs=1e-3
+    )
+    assert curve.times[-1] == 0.0
+
+    # Repeated queries are answered from the cache
+    first = endurance_curve(muscle, targets, max_time=300.0, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    second = endurance_curve(muscle, targets, max_time=300.0, cache_dir=str(tmp_path))
+    assert second.cached
+    assert np.array_equal(second.times, first.times)
+    assert np.array_equal(second.tolerances, first.tolerances)
+
+    # Different parameters or settings are computed afresh
+    other = endurance_curve(muscle, targets, max_time=200.0, cache_dir=str(tmp_path))
+    assert not other.cached
+    other = endurance_curve(StandardMuscle(40.0), targets, max_time=300.0, cache_dir=str(tmp_path))
+    assert not other.cached
+    assert len(list(tmp_path.iterdir())) == 3
+
+    # Reading the forces of the last step does not change the key
+    stepped = StandardMuscle()
+    stepped.step(0.0, 1 / 50.0)
+    key = _parameter_hash(stepped, (targets,))
+    stepped.current_forces
+    assert _parameter_hash(stepped, (targets,)) == key
+    assert _parameter_hash(stepped.clone(), (targets,)) == key
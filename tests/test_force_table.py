@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from pymuscle import PotvinFuglevandMuscle as Muscle
+from pymuscle.force_table import ExcitationForceTable as Table
+
+
+def test_total_force():
+    motor_unit_count = 120
+    m = Muscle(motor_unit_count, False, False, use_force_table=False)
+    t = Table(m._pool, m._fibers)
+
+    # Below recruitment and beyond saturation
+    assert t.total_force(-1.0) == 0.0
+    assert t.total_force(0.0) == 0.0
+    assert t.total_force(200.0) == pytest.approx(2215.98114)
+
+    # Against the full simulation across a range including recruitment
+    # thresholds
+    for excitation in np.linspace(0.5, 70.0, 97):
+        expected = m.step(excitation, 1.0)
+        assert t.total_force(excitation) == pytest.approx(expected, rel=1e-6)
+
+
+def test_unit_forces():
+    motor_unit_count = 120
+    m = Muscle(motor_unit_count, False, False, use_force_table=False)
+    t = Table(m._pool, m._fibers)
+    m.step(40.0, 1.0)
+    assert np.allclose(t.unit_forces(40.0), m.current_forces)
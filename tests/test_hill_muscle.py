@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, HillMuscle, HillMuscleGroup
+from pymuscle.hill_type import (
+    contractile_element_force_length_curve as fl_curve,
+    contractile_element_force_velocity_curve as fv_curve
+)
+
+
+def test_hill_muscle():
+    rest_length = 10.0
+    m = HillMuscle(StandardMuscle(32.0), rest_length)
+    reference = StandardMuscle(32.0)
+
+    lengths = [10.0, 10.5, 11.0, 10.8]
+    prev_length = rest_length
+    for length in lengths:
+        output = m.step(length, 0.5, 0.02)
+        expected = reference.step(0.5, 0.02) \
+            * fl_curve(rest_length, length) \
+            * fv_curve(rest_length, length, prev_length, 0.02)
+        assert output == pytest.approx(expected)
+        prev_length = length
+
+    assert m.prev_length == lengths[-1]
+
+
+def test_hill_muscle_group():
+    max_forces = [32.0, 90.0]
+    rest_lengths = np.array([10.0, 20.0])
+    singles = [
+        HillMuscle(StandardMuscle(f), r)
+        for f, r in zip(max_forces, rest_lengths)
+    ]
+    g = HillMuscleGroup(
+        [StandardMuscle(f) for f in max_forces],
+        rest_lengths
+    )
+
+    rng = np.random.RandomState(0)
+    for _ in range(50):
+        lengths = rest_lengths * (0.8 + 0.4 * rng.rand(2))
+        excitations = rng.rand(2)
+        outputs = g.step(lengths, excitations, 0.02)
+        expected = [
+            m.step(l, e, 0.02) for m, l, e in zip(singles, lengths, excitations)
+        ]
+        assert outputs == pytest.approx(expected)
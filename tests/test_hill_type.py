@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from pymuscle.hill_type import (
+    contractile_element_force_length_curve as fl_curve,
+    contractile_element_force_velocity_curve as fv_curve,
+    contractile_element_trajectory_multipliers as trajectory_multipliers
+)
+
+
+def test_force_length_curve():
+    # Peak force at the optimal length
+    assert fl_curve(1.0, 1.1) == pytest.approx(1.0)
+    assert fl_curve(2.0, 2.2) == pytest.approx(1.0)
+    assert fl_curve(1.0, 1.0) == pytest.approx(np.exp(-17.33 * 0.1 ** 3))
+
+    # The optimal length parameter is respected
+    assert fl_curve(1.0, 1.3, peak_force_length=1.3) == pytest.approx(1.0)
+
+    # Arrays broadcast against each other and parameters
+    rest_lengths = np.array([1.0, 2.0, 4.0])
+    lengths = np.array([[1.1, 2.2, 4.4], [1.0, 2.0, 4.0]])
+    output = fl_curve(rest_lengths, lengths)
+    assert output.shape == (2, 3)
+    assert np.allclose(output[0], 1.0)
+    assert np.allclose(output[1], fl_curve(1.0, 1.0))
+    widths = np.array([1.0, 17.33, 40.0])
+    output = fl_curve(1.0, np.full(3, 0.8), curve_width_factor=widths)
+    assert np.all(np.diff(output) < 0)
+
+    # Results can be written into an existing array
+    out = np.empty((2, 3))
+    result = fl_curve(rest_lengths, lengths, out=out)
+    assert result is out
+    expected = [
+        [fl_curve(r, l) for r, l in zip(rest_lengths, row)]
+        for row in lengths
+    ]
+    assert np.allclose(out, expected)
+
+
+def test_force_velocity_curve():
+    # Isometric
+    isometric = fv_curve(1.0, 1.0, 1.0, 0.01)
+    assert 0.9 < isometric < 1.1
+
+    # Shortening produces less force and lengthening more
+    assert fv_curve(1.0, 0.99, 1.0, 0.01) < isometric
+    assert fv_curve(1.0, 1.01, 1.0, 0.01) > isometric
+    assert fv_curve(1.0, 2.0, 1.0, 0.01) == pytest.approx(1.8)
+
+    # Arrays and out
+    current_lengths = np.array([0.99, 1.0, 1.01])
+    out = np.empty(3)
+    result = fv_curve(1.0, current_lengths, np.ones(3), 0.01, out=out)
+    assert result is out
+    expected = [fv_curve(1.0, length, 1.0, 0.01) for length in current_lengths]
+    assert np.allclose(out, expected)
+
+
+def test_trajectory_multipliers():
+    time_step = 0.01
+    rest_lengths = np.array([1.0, 1.5])
+    times = np.arange(100) * time_step
+    lengths = np.stack([1.0 + 0.1 * np.sin(times), 1.5 + 0.2 * np.cos(times)], 1)
+
+    fl, fv = trajectory_multipliers(rest_lengths, lengths, time_step)
+    assert fl.shape == lengths.shape
+    assert fv.shape == lengths.shape
+
+    # First step has no velocity
+    assert np.allclose(fv[0], fv_curve(1.0, 1.0, 1.0, time_step))
+
+    # Matches step by step evaluation
+    for t in range(1, len(times)):
+        assert np.allclose(fl[t], fl_curve(rest_lengths, lengths[t]))
+        assert np.allclose(
+            fv[t],
+            fv_curve(rest_lengths, lengths[t], lengths[t - 1], time_step)
+        )
+
+    # Explicit initial length
+    _, fv = trajectory_multipliers(
+        rest_lengths, lengths, time_step, initial_length=lengths[0] + 0.01
+    )
+    assert np.allclose(
+        fv[0],
+        fv_curve(rest_lengths, lengths[0], lengths[0] + 0.01, time_step)
+    )
+
@@ -20,3 +20,8 @@ def test_step():
 
     with pytest.raises(NotImplementedError):
         m.step(20, 1)
+
+
+def test_memory_report():
+    m = Model(100)
+    assert m.memory_report() == {'parameters': 0, 'state': 0}
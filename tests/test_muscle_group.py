@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+from pymuscle import (
+    MuscleGroup,
+    StandardMuscle,
+    PotvinFuglevandMuscle
+)
+
+
+def test_init():
+    muscles = [StandardMuscle(32.0), StandardMuscle(90.0)]
+    g = MuscleGroup(muscles)
+    assert g.muscle_count == 2
+    assert g.motor_unit_count == 120 + 340
+
+    # Models must share parameters other than motor unit count
+    with pytest.raises(AssertionError):
+        MuscleGroup([StandardMuscle(32.0), StandardMuscle(32.0, 0.02)])
+
+    with pytest.raises(AssertionError):
+        MuscleGroup([
+            StandardMuscle(32.0),
+            StandardMuscle(32.0, apply_peripheral_fatigue=False)
+        ])
+
+
+def test_group_stepped_with_fresh():
+    # Muscles in different states group as long as parameters match
+    stepped = StandardMuscle(32.0)
+    stepped.step(0.5, 0.1)
+    forces = stepped.current_forces.copy()
+    stepped.step(0.7, 0.1)
+    fresh = StandardMuscle(32.0)
+    references = [StandardMuscle(32.0), StandardMuscle(32.0)]
+    references[0].step(0.5, 0.1)
+    references[0].step(0.7, 0.1)
+    assert MuscleGroup.can_group([stepped, fresh])
+
+    g = MuscleGroup([stepped, fresh])
+    # Forces of the last step of each muscle carry over
+    assert g.current_forces(0) == pytest.approx(references[0].current_forces)
+    assert not np.array_equal(g.current_forces(0), forces)
+    assert np.all(g.current_forces(1) == 0)
+    outputs = g.step([0.4, 0.4], 0.1)
+    assert outputs == pytest.approx([m.step(0.4, 0.1) for m in references])
+
+    # Pending deferred fatigue is applied before grouping
+    deferred = StandardMuscle(32.0)
+    deferred._fibers._fatigue_interval = 3
+    deferred.step(0.9, 0.1)
+    other = StandardMuscle(32.0)
+    other._fibers._fatigue_interval = 3
+    g = MuscleGroup([deferred, other])
+    assert g._fibers._pending_time == 0.0
+    assert deferred.get_peripheral_fatigue() > 0
+
+
+def test_can_group():
+    assert MuscleGroup.can_group([StandardMuscle(32.0), StandardMuscle(90.0)])
+    assert not MuscleGroup.can_group([
+        StandardMuscle(32.0),
+        StandardMuscle(32.0, apply_peripheral_fatigue=False)
+    ])
+    assert not MuscleGroup.can_group([
+        StandardMuscle(32.0),
+        PotvinFuglevandMuscle(120)
+    ])
+
+
+def test_step():
+    max_forces = [32.0, 90.0, 10.0]
+    references = [StandardMuscle(f) for f in max_forces]
+    g = MuscleGroup([StandardMuscle(f) for f in max_forces])
+
+    rng = np.random.RandomState(0)
+    for _ in range(200):
+        excitations = rng.rand(3) * (rng.rand(3) > 0.3)
+        outputs = g.step(excitations, 0.1)
+        expected = [m.step(e, 0.1) for m, e in zip(references, excitations)]
+        assert outputs == pytest.approx(expected)
+
+    # Per unit forces are only built when read
+    assert g._fibers._current_forces_stale
+    for i, m in enumerate(references):
+        assert g.current_forces(i) == pytest.approx(m.current_forces)
+        # Grouped muscles share state with the group
+        assert g.muscles[i].get_peripheral_fatigue() == \
+            pytest.approx(m.get_peripheral_fatigue())
+
+    # A single input for all muscles
+    g = MuscleGroup([PotvinFuglevandMuscle(120), PotvinFuglevandMuscle(60)])
+    outputs = g.step(40.0, 1.0)
+    assert outputs[0] == pytest.approx(1311.86896)
+
+
+def test_step_many():
+    for central, peripheral in [(False, False), (False, True), (True, True)]:
+        def make():
+            return MuscleGroup([
+                PotvinFuglevandMuscle(120, central, peripheral),
+                PotvinFuglevandMuscle(60, central, peripheral)
+            ])
+        g = make()
+        reference = make()
+        for excitations in [[30.0, 60.0], [0.0, 45.0]]:
+            outputs = g.step_many(excitations, 0.01, 4)
+            assert outputs.shape == (4, 2)
+            for expected in outputs:
+                assert np.array_equal(expected, reference.step(excitations, 0.01))
+        assert np.array_equal(
+            g._fibers.current_forces,
+            reference._fibers.current_forces
+        )
+        assert g.step_many(40.0, 0.01, 0).shape == (0, 2)
+
+
+def test_clone_many():
+    muscle = StandardMuscle(90.0)
+    for _ in range(10):
+        muscle.step(0.7, 0.1)
+
+    clone = muscle.clone()
+    assert clone._pool._peak_firing_rates is muscle._pool._peak_firing_rates
+    assert clone._fibers._current_peak_forces is not muscle._fibers._current_peak_forces
+    expected = muscle.step(0.4, 0.1)
+    assert clone.step(0.4, 0.1) == expected
+    clone.step(1.0, 0.1)
+    assert muscle.step(0.4, 0.1) != clone.step(0.4, 0.1)
+
+    # Candidates share one (k, n) buffer and step together as a group
+    clones = muscle.clone_many(4)
+    buffer = clones[0]._fibers._current_peak_forces.base
+    assert buffer.shape == (4, muscle.motor_unit_count)
+    g = MuscleGroup(clones)
+    assert g._fibers._current_peak_forces.base is buffer
+    candidates = [0.1, 0.4, 0.7, 1.0]
+    outputs = g.step(candidates, 0.1)
+    for i, excitation in enumerate(candidates):
+        reference = muscle.clone()
+        assert outputs[i] == pytest.approx(reference.step(excitation, 0.1))
+        assert np.array_equal(
+            buffer[i],
+            reference._fibers._current_peak_forces
+        )
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle
+from pymuscle.offline import TwitchConvolver, spike_chunks
+from pymuscle.protocol import Protocol
+from pymuscle.spikes import SpikeEngine
+
+
+def direct(spikes, peak_forces, contraction_times, sample_rate):
+    forces = np.zeros(spikes.shape)
+    for u in range(spikes.shape[1]):
+        time = contraction_times[u] / 1000
+        length = int(np.ceil(10.0 * time * sample_rate)) + 1
+        ratios = np.arange(length) / (time * sample_rate)
+        kernel = peak_forces[u] * ratios * np.exp(1 - ratios)
+        forces[:, u] = np.convolve(spikes[:, u], kernel)[:len(spikes)]
+    return forces
+
+
+def test_convolution():
+    rng = np.random.RandomState(0)
+    unit_count = 12
+    spikes = (rng.rand(3000, unit_count) < 0.02).astype(float)
+    peak_forces = np.linspace(1.0, 100.0, unit_count)
+    contraction_times = np.repeat([90.0, 60.0, 30.0], 4)
+    expected = direct(spikes, peak_forces, contraction_times, 1000.0)
+
+    c = TwitchConvolver(peak_forces, contraction_times, 1000.0, per_unit=True, tolerance=0)
+    assert c.group_count == 3
+    assert c.process(spikes) == pytest.approx(expected, abs=1e-9)
+
+    # Chunks shorter and longer than the twitches give the same result
+    c.reset()
+    chunks = [spikes[i:i + 137] for i in range(0, 3000, 137)]
+    streamed = np.concatenate(list(c.stream(chunks)))
+    assert streamed == pytest.approx(expected, abs=1e-9)
+
+    c = TwitchConvolver(peak_forces, contraction_times, 1000.0, tolerance=0)
+    total = np.concatenate(list(c.stream(chunks)))
+    assert total == pytest.approx(expected.sum(axis=1), abs=1e-9)
+
+    # Chunks of one length transform each kernel once
+    c = TwitchConvolver(peak_forces, contraction_times, 1000.0, tolerance=0)
+    chunks = np.split(spikes, 20)
+    total = np.concatenate(list(c.stream(chunks)))
+    assert total == pytest.approx(expected.sum(axis=1), abs=1e-9)
+    assert len(c._kernel_spectra) == c.group_count
+    c.reset()
+    assert np.array_equal(np.concatenate(list(c.stream(chunks))), total)
+    assert len(c._kernel_spectra) == c.group_count
+
+
+def test_grouping():
+    muscle = StandardMuscle(60.0)
+    c = TwitchConvolver.from_fibers(muscle._fibers, 1000.0)
+    assert c.group_count < muscle.motor_unit_count / 2
+
+    # Approximate kernels stay close to the exact ones
+    engine = SpikeEngine(muscle)
+    engine.simulate(Protocol().hold(0.5, 2.0), np.array([2.0]))
+    chunks = list(spike_chunks(
+        engine.spike_times,
+        engine.spike_units,
+        muscle.motor_unit_count,
+        1000.0,
+        2.0,
+        chunk_size=300
+    ))
+    assert sum(chunk.sum() for chunk in chunks) == engine.spike_count
+    spikes = np.concatenate(chunks)
+    expected = direct(
+        spikes,
+        muscle._fibers._peak_twitch_forces,
+        muscle._fibers._contraction_times,
+        1000.0
+    ).sum(axis=1)
+    total = np.concatenate(list(c.stream(chunks)))
+    assert total == pytest.approx(expected, rel=0.02)
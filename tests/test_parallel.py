@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, PotvinFuglevandMuscle
+from pymuscle.parallel import ThreadedMuscleStepper, TiledMuscleStepper, _balance
+
+
+def test_balance():
+    bins = _balance([100, 10, 60, 50, 30], 2)
+    assert sorted(i for b in bins for i in b) == [0, 1, 2, 3, 4]
+    assert sorted(bins) == [[0, 4], [1, 2, 3]]
+
+    # Bins are never left empty
+    assert sorted(_balance([5, 5], 4)) == [[0], [1]]
+
+
+def test_step():
+    sizes = [32.0, 90.0, 200.0, 60.0, 120.0]
+    muscles = [StandardMuscle(s) for s in sizes]
+    reference = [StandardMuscle(s) for s in sizes]
+    excitations = [0.1, 0.3, 0.5, 0.7, 0.9]
+
+    with ThreadedMuscleStepper(muscles, thread_count=3) as stepper:
+        assert stepper.thread_count == 3
+        for _ in range(20):
+            outputs = stepper.step(excitations, 0.1)
+            expected = [m.step(e, 0.1) for m, e in zip(reference, excitations)]
+            assert np.array_equal(outputs, expected)
+
+        outputs = stepper.step(0.5, 0.1)
+        assert outputs.shape == (5,)
+
+        with pytest.raises(AssertionError):
+            stepper.step([0.5, 0.5], 0.1)
+
+    # Mixed muscle types and per motor unit inputs
+    muscles = [StandardMuscle(32.0), PotvinFuglevandMuscle(120)]
+    with ThreadedMuscleStepper(muscles) as stepper:
+        outputs = stepper.step([0.5, np.full(120, 40.0)], 1.0)
+    assert outputs[0] == StandardMuscle(32.0).step(0.5, 1.0)
+    assert outputs[1] == PotvinFuglevandMuscle(120).step(40.0, 1.0)
+
+    # A muscle can not be stepped by two threads
+    m = StandardMuscle(32.0)
+    with pytest.raises(AssertionError):
+        ThreadedMuscleStepper([m, m])
+
+
+def test_tiled_step():
+    muscle = StandardMuscle(300.0)
+    reference = StandardMuscle(300.0)
+    motor_unit_count = muscle.motor_unit_count
+
+    with TiledMuscleStepper(muscle, tile_size=128, thread_count=2) as stepper:
+        assert stepper.tile_count == int(np.ceil(motor_unit_count / 128))
+        assert stepper.thread_count == 2
+        for excitation in [0.2, 0.8, 0.8, 0.0, 0.5] * 10:
+            output = stepper.step(excitation, 0.1)
+            assert output == pytest.approx(reference.step(excitation, 0.1))
+
+        # Tiles advance the muscle's own state
+        assert np.array_equal(
+            muscle._fibers.current_peak_forces,
+            reference._fibers.current_peak_forces
+        )
+        assert np.array_equal(
+            muscle._pool._recruitment_durations,
+            reference._pool._recruitment_durations
+        )
+        assert np.allclose(stepper.current_forces, reference.current_forces)
+
+        inputs = np.linspace(0.0, 1.0, motor_unit_count)
+        output = stepper.step(inputs, 0.1)
+        assert output == pytest.approx(reference.step(inputs.copy(), 0.1))
+
+        # Per unit forces of a tiled step can be read from the muscle
+        assert np.allclose(muscle.current_forces, reference.current_forces)
+
+
+def test_tiled_step_deferred_fatigue():
+    muscle = StandardMuscle(300.0)
+    reference = StandardMuscle(300.0)
+    muscle._fibers._fatigue_interval = 3
+    reference._fibers._fatigue_interval = 3
+
+    with TiledMuscleStepper(muscle, tile_size=128, thread_count=2) as stepper:
+        for _ in range(2):
+            stepper.step(0.8, 0.1)
+            reference.step(0.8, 0.1)
+        assert muscle._fibers._pending_steps == reference._fibers._pending_steps == 2
+        assert muscle._fibers._pending_time == reference._fibers._pending_time
+
+        # Stepping the muscle directly completes the interval
+        assert muscle.step(0.8, 0.1) == pytest.approx(reference.step(0.8, 0.1))
+        assert muscle._fibers._pending_steps == 0
+        assert np.allclose(
+            muscle._fibers.current_peak_forces,
+            reference._fibers.current_peak_forces
+        )
+
+        # And the tiles carry on from the muscle's counters
+        for _ in range(4):
+            output = stepper.step(0.8, 0.1)
+            assert output == pytest.approx(reference.step(0.8, 0.1))
+        assert muscle._fibers._pending_steps == reference._fibers._pending_steps == 1
+        assert np.allclose(
+            muscle._fibers.current_peak_forces,
+            reference._fibers.current_peak_forces
+        )
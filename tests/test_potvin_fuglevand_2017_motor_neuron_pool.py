@@ -96,3 +96,36 @@ def test_fatigue_disabled():
 
     # Should NOT have changed
     assert next_output_sum == pytest.approx(first_output_sum)
+
+
+def test_incremental_adaptation():
+    motor_unit_count = 120
+    p = Pool(motor_unit_count)
+    excitations = np.full(motor_unit_count, 30.0)
+    for _ in range(50):
+        p.step(excitations, 0.1)
+    # Step size changes rebuild the cached decay factor
+    for _ in range(50):
+        p.step(excitations, 0.5)
+    assert p._cached_step_size == 0.5
+
+    expected = np.exp(-p._recruitment_durations / p._adaptation_time_constant)
+    assert p._adaptation_decays == pytest.approx(expected)
+    assert p._adaptation_decays[-1] == 1.0
+
+
+def test_incremental_adaptation_drift():
+    # Each step's multiplication rounds, but the decays shrink geometrically
+    # so the absolute error of the adaptations stays bounded however long
+    # the hold
+    motor_unit_count = 120
+    p = Pool(motor_unit_count)
+    excitations = np.full(motor_unit_count, 40.0)
+    worst = 0.0
+    for i in range(40000):
+        p.step(excitations, 0.005)
+        if i % 500 == 0:
+            expected = np.exp(-p._recruitment_durations / p._adaptation_time_constant)
+            worst = max(worst, np.max(np.abs(p._adaptation_decays - expected)))
+    assert p._recruitment_durations[0] == pytest.approx(200.0)
+    assert worst < 1e-12
@@ -54,3 +54,30 @@ def test_step():
     output = f.step(np.full(motor_unit_count, max_input + 40), 1.0)
     output_sum = np.sum(output)
     assert output_sum == pytest.approx(max_output)
+
+
+def test_lazy_current_forces():
+    motor_unit_count = 120
+    f = Fibers(motor_unit_count)
+    firing_rates = np.linspace(0.0, 40.0, motor_unit_count)
+    output = f.step(firing_rates, 1.0)
+    assert f._current_forces_stale
+
+    # Forces use the capacities from before this step's fatigue
+    forces = f.current_forces
+    assert not f._current_forces_stale
+    assert np.sum(forces) == pytest.approx(output)
+    assert np.any(f.current_peak_forces < f._step_peak_forces)
+
+    # Reads within a step share one array
+    assert f.current_forces is forces
+
+    # Forces kept from earlier steps are not overwritten
+    history = [forces]
+    for _ in range(3):
+        f.step(firing_rates, 1.0)
+        history.append(f.current_forces)
+    for earlier, later in zip(history, history[1:]):
+        assert later is not earlier
+        assert np.any(later != earlier)
+    assert np.sum(history[0]) == pytest.approx(output)
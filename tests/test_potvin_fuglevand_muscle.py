@@ -1,3 +1,4 @@
+import tracemalloc
 import numpy as np
 import pytest
 from pymuscle import PotvinFuglevandMuscle as Muscle
@@ -50,3 +51,99 @@ def test_step():
     m = Muscle(motor_unit_count)
     output = m.step(np.full(motor_unit_count, max_input + 40), 1.0)
     assert output == pytest.approx(max_output)
+
+
+def test_memory_report():
+    motor_unit_count = 120
+    m = Muscle(motor_unit_count)
+
+    # Without an excitation scratch is not measured
+    report = m.memory_report()
+    assert report['motor_unit_count'] == motor_unit_count
+    assert report['scratch'] == 0
+    assert report['parameters'] > 0
+    assert report['state'] > 0
+    assert report['total'] == report['parameters'] + report['state']
+
+    # Measuring scratch must not advance the muscle
+    report = m.memory_report(40.0, 1.0)
+    assert report['scratch'] > 0
+    assert report['per_motor_unit'] == report['total'] / motor_unit_count
+    assert m.step(40.0, 1.0) == pytest.approx(1311.86896)
+
+
+def test_measure_step_allocation_without_reset_peak(monkeypatch):
+    # tracemalloc.reset_peak() is missing before Python 3.9
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+    m = Muscle(120)
+    # A step allocates at least one per unit array
+    array_size = 8 * m.motor_unit_count
+    assert m.measure_step_allocation(40.0, 1.0) >= array_size
+
+    # The caller's session is restarted with its traceback limit
+    tracemalloc.start(3)
+    try:
+        assert m.measure_step_allocation(40.0, 1.0) >= array_size
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traceback_limit() == 3
+    finally:
+        tracemalloc.stop()
+
+
+def test_measure_step_allocation_while_tracing():
+    m = Muscle(120)
+    array_size = 8 * m.motor_unit_count
+    tracemalloc.start()
+    try:
+        # An earlier, larger peak of the caller does not hide the step's
+        buffer = bytearray(10 ** 7)
+        del buffer
+        scratch = m.measure_step_allocation(40.0, 1.0)
+        assert array_size <= scratch < 10 ** 7
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_force_table():
+    motor_unit_count = 120
+    m = Muscle(motor_unit_count, False, False, use_force_table=True)
+    reference = Muscle(motor_unit_count, False, False, use_force_table=False)
+
+    for excitation in [0.0, 12.5, 40.0, 67.0]:
+        output = m.step(excitation, 1.0)
+        expected = reference.step(excitation, 1.0)
+        assert output == pytest.approx(expected, rel=1e-6)
+        assert np.allclose(m.current_forces, reference.current_forces)
+
+    # Forces kept from earlier table steps are not overwritten
+    history = []
+    for excitation in [12.5, 40.0]:
+        m.step(excitation, 1.0)
+        history.append(m.current_forces)
+    assert np.any(history[0] != history[1])
+
+    # Array inputs are always simulated in full
+    m.step(np.full(motor_unit_count, 40.0), 1.0)
+    assert m._table_excitation is None
+
+    # By default the table is built once it has paid for itself
+    m = Muscle(motor_unit_count, False, False)
+    break_even = m._force_table_break_even()
+    for _ in range(break_even):
+        assert m.step(40.0, 1.0) == reference.step(40.0, 1.0)
+    assert m._force_table is None
+    output = m.step(40.0, 1.0)
+    assert m._force_table is not None
+    assert output == pytest.approx(reference.step(40.0, 1.0), rel=1e-6)
+
+    # Never when turned off
+    m = Muscle(motor_unit_count, False, False, use_force_table=False)
+    for _ in range(break_even + 1):
+        m.step(40.0, 1.0)
+    assert m._force_table is None
+
+    # The table is not used while fatigue is applied
+    m = Muscle(motor_unit_count, use_force_table=True)
+    m.step(40.0, 1.0)
+    assert m._force_table is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, PotvinFuglevandMuscle
+from pymuscle.protocol import Protocol
+from pymuscle.simulation import Simulation
+
+
+def naive(muscle, excitations, step_size):
+    return np.array([muscle.step(float(e), step_size) for e in excitations])
+
+
+def test_excitations():
+    p = Protocol().ramp(0.0, 0.5, 1.0).hold(0.5, 0.5).intermittent(0.3, 0.2, 0.3, 2)
+    assert len(p.segments) == 6
+    assert p.duration == pytest.approx(2.5)
+
+    excitations = p.excitations(0.1)
+    assert len(excitations) == 25
+    assert excitations[0] == 0.0
+    assert excitations[9] == 0.5
+    assert np.all(excitations[10:15] == 0.5)
+    assert np.all(excitations[15:17] == 0.3)
+    assert np.all(excitations[17:20] == 0.0)
+
+
+def test_run():
+    p = Protocol().ramp(0.0, 0.8, 2.0).hold(0.8, 3.0).intermittent(0.4, 1.0, 1.0, 3)
+    excitations = p.excitations(0.1)
+
+    for make in [
+        lambda: StandardMuscle(60.0),
+        lambda: StandardMuscle(60.0, apply_central_fatigue=True),
+        lambda: StandardMuscle(60.0, apply_peripheral_fatigue=False),
+        lambda: StandardMuscle(
+            60.0,
+            apply_peripheral_fatigue=False,
+            use_force_table=True
+        ),
+    ]:
+        muscle = make()
+        reference = make()
+        outputs = p.run(muscle, 0.1)
+        assert np.array_equal(outputs, naive(reference, excitations, 0.1))
+        assert np.array_equal(muscle.current_forces, reference.current_forces)
+
+    # Excitations follow the muscle's own scale
+    muscle = PotvinFuglevandMuscle(120)
+    p = Protocol().hold(40.0, 2.0)
+    expected = naive(PotvinFuglevandMuscle(120), p.excitations(0.5), 0.5)
+    assert np.array_equal(p.run(muscle, 0.5), expected)
+
+    # Protocols can be checkpointed as simulations
+    sim = Simulation(PotvinFuglevandMuscle(120), p, 0.5)
+    assert np.array_equal(sim.run(), expected)
@@ -90,3 +90,70 @@ def test_fatigue():
 
     ctf_after = f.current_peak_forces
     assert np.equal(ctf_before, ctf_after).all()
+
+
+def test_sparse_fatigue_tracking():
+    motor_unit_count = 120
+    f = Fibers(motor_unit_count)
+
+    # Idle units at full capacity are never marked as fatigued
+    for i in range(10):
+        f.step(np.zeros(motor_unit_count), 1.0)
+    assert not f._fatigued.any()
+
+    # Only the active units fatigue and slow down
+    firing_rates = np.zeros(motor_unit_count)
+    firing_rates[:30] = 20.0
+    ct_before = copy(f._current_contraction_times)
+    f.step(firing_rates, 1.0)
+    assert f._fatigued[:30].all()
+    assert not f._fatigued[30:].any()
+    assert np.greater(f._current_contraction_times[:30], ct_before[:30]).all()
+    assert np.equal(f._current_contraction_times[30:], ct_before[30:]).all()
+
+    # Once idle, fatigued units recover towards their peak forces
+    ctf_before = copy(f.current_peak_forces)
+    f.step(np.zeros(motor_unit_count), 1.0)
+    assert np.greater(f.current_peak_forces[:30], ctf_before[:30]).all()
+    assert np.equal(f.current_peak_forces[30:], ctf_before[30:]).all()
+
+
+def test_deferred_fatigue():
+    motor_unit_count = 120
+    firing_rates = np.full(motor_unit_count, 20.0)
+    reference = Fibers(motor_unit_count)
+    f = Fibers(motor_unit_count)
+    f._fatigue_interval = 4
+
+    # Fatigue is held until the interval is complete
+    for i in range(3):
+        f.step(firing_rates, 0.1)
+        reference.step(firing_rates, 0.1)
+    assert np.equal(f.current_peak_forces, f._peak_twitch_forces).all()
+
+    f.step(firing_rates, 0.1)
+    reference.step(firing_rates, 0.1)
+    assert f.current_peak_forces == pytest.approx(reference.current_peak_forces, rel=1e-4)
+
+    # Pending fatigue can be applied early
+    f.step(firing_rates, 0.1)
+    f._flush_fatigue()
+    reference.step(firing_rates, 0.1)
+    assert f.current_peak_forces == pytest.approx(reference.current_peak_forces, rel=1e-4)
+
+    # Flushing reuses the step cache rather than rebuilding it for the
+    # accumulated interval
+    builds = []
+    build = f._build_step_cache
+    f._build_step_cache = lambda step_size: builds.append(step_size) or build(step_size)
+    for i in range(8):
+        f.step(firing_rates, 0.1)
+    assert builds == []
+
+    # Recovery over a deferred interval matches recovery step by step
+    idle = np.zeros(motor_unit_count)
+    reference._set_state(f._get_state())
+    for i in range(4):
+        f.step(idle, 0.1)
+        reference.step(idle, 0.1)
+    assert f.current_peak_forces == pytest.approx(reference.current_peak_forces, rel=1e-4)
@@ -0,0 +1,79 @@
+import pytest
+from pymuscle import StandardMuscle, PotvinFuglevandMuscle
+from pymuscle.real_time import RealTimeMode
+
+
+def test_degrade_and_restore():
+    mode = RealTimeMode(
+        1.0,
+        ['full', 'fast', 'fastest'],
+        [0.0, 0.01, 0.1],
+        restore_after=10
+    )
+
+    # Too slow
+    levels = [mode.record(2.0) for _ in range(5)]
+    assert levels == [None] * 4 + [1]
+    levels = [mode.record(2.0) for _ in range(10)]
+    assert levels[4] == 2
+    assert mode.level == 2
+
+    # Can't get any cheaper
+    assert mode.record(2.0) is None
+
+    # Headroom restores one level at a time
+    def steps_until_switch(latency):
+        for i in range(1, 200):
+            if mode.record(latency) is not None:
+                return i
+
+    first_wait = steps_until_switch(0.1)
+    assert first_wait > 10
+    assert mode.level == 1
+    second_wait = steps_until_switch(0.1)
+    assert second_wait <= first_wait
+    assert mode.level == 0
+    assert [e['to'] for e in mode.events] == ['fast', 'fastest', 'fast', 'full']
+    assert mode.events[1]['error'] == 0.1
+
+    # A restore that is quickly undone doubles the wait
+    assert steps_until_switch(2.0) == 5
+    assert mode.level == 1
+    assert steps_until_switch(0.1) == second_wait + 10
+
+
+def test_muscle_real_time():
+    muscle = StandardMuscle(60.0)
+    mode = muscle.enable_real_time(1e-3, calibration_steps=100)
+    assert mode.levels == ['full', 'deferred fatigue', 'cached firing rates']
+    assert mode.errors[0] == 0.0
+    assert 0.0 < mode.errors[1] < mode.errors[2] < 0.05
+
+    reference = StandardMuscle(60.0)
+    for _ in range(5):
+        muscle._update_fidelity(1.0)
+    assert mode.level == 1
+    assert muscle._fibers._fatigue_interval == 5
+
+    for _ in range(5):
+        muscle._update_fidelity(1.0)
+    assert mode.level == 2
+
+    for _ in range(100):
+        output = muscle.step(0.5, 1 / 50.0)
+        expected = reference.step(0.5, 1 / 50.0)
+        assert output == pytest.approx(expected, rel=0.05)
+
+    # Turning real-time mode off applies pending fatigue
+    muscle.disable_real_time()
+    assert muscle.real_time is None
+    assert muscle._fibers._fatigue_interval == 1
+    assert muscle._fibers._pending_steps == 0
+    assert muscle.step(0.5, 1 / 50.0) == pytest.approx(reference.step(0.5, 1 / 50.0), rel=0.01)
+
+
+def test_central_fatigue_levels():
+    muscle = PotvinFuglevandMuscle(120)
+    mode = muscle.enable_real_time(1e-3, calibration_steps=0)
+    assert mode.levels == ['full', 'deferred fatigue']
+    assert mode.errors == [0.0, None]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from pymuscle import (
+    PyMuscleFibers as Fibers,
+    MultiFidelityMuscle,
+    PotvinFuglevandMuscle,
+    ReducedOrderMuscle,
+    StandardMuscle
+)
+
+
+def test_reduce_model():
+    f = Fibers(120)
+    f.step(np.full(120, 20.0), 1.0)
+    starts = [0, 40, 100]
+    r = f._reduce(starts)
+    assert r.motor_unit_count == 3
+    # Forces add up and other attributes are averaged
+    assert r._peak_twitch_forces[1] == pytest.approx(np.sum(f._peak_twitch_forces[40:100]))
+    assert r._current_peak_forces.sum() == pytest.approx(f._current_peak_forces.sum())
+    assert r._contraction_times[2] == pytest.approx(np.mean(f._contraction_times[100:]))
+    assert r._fatigued.all()
+    # The original is unchanged
+    assert f.motor_unit_count == 120
+    assert len(f._peak_twitch_forces) == 120
+
+
+def test_init():
+    muscle = StandardMuscle(100.0)
+    r = ReducedOrderMuscle(muscle, tolerance=0.01, calibration_duration=20.0)
+    assert r.full_motor_unit_count == muscle.motor_unit_count
+    assert r.cluster_count < muscle.motor_unit_count / 10
+    assert r.cluster_sizes.sum() == muscle.motor_unit_count
+    assert r.force_error <= 0.01
+    assert r.fatigue_error <= 0.01
+
+    # Tighter tolerances need more clusters
+    tight = ReducedOrderMuscle(muscle, tolerance=0.002, calibration_duration=20.0)
+    assert tight.cluster_count > r.cluster_count
+    assert tight.force_error <= 0.002
+
+    fixed = ReducedOrderMuscle(muscle, cluster_count=16, calibration_duration=0)
+    assert fixed.cluster_count == 16
+    assert fixed.force_error is None
+
+
+def test_step():
+    muscle = StandardMuscle(100.0)
+    r = ReducedOrderMuscle(muscle, tolerance=0.01, calibration_duration=20.0)
+    for _ in range(500):
+        expected = muscle.step(0.7, 1 / 50.0)
+        output = r.step(0.7, 1 / 50.0)
+        assert output == pytest.approx(expected, abs=0.01)
+
+    fatigue = muscle.get_peripheral_fatigue()
+    assert fatigue > 0
+    assert r.get_peripheral_fatigue() == pytest.approx(fatigue, abs=0.01)
+
+
+def test_exact():
+    # One cluster per motor unit reproduces the original
+    muscle = PotvinFuglevandMuscle(120)
+    r = ReducedOrderMuscle(muscle, cluster_count=120, calibration_duration=0)
+    for _ in range(50):
+        assert r.step(40.0, 1 / 50.0) == pytest.approx(muscle.step(40.0, 1 / 50.0))
+
+
+def test_project_and_lift():
+    f = Fibers(120)
+    f.step(np.full(120, 20.0), 1.0)
+    starts = [0, 40, 100]
+    r = Fibers(120)._reduce(starts)
+    f._project_state(r, starts)
+    assert r._current_peak_forces == pytest.approx(f._merge('_current_peak_forces', starts))
+
+    # Lifting unchanged state is exact
+    before = f._current_peak_forces.copy()
+    assert f._lift_state(r, starts) == pytest.approx(0.0, abs=1e-12)
+    assert f._current_peak_forces == pytest.approx(before)
+
+    # Changes to a cluster are spread over its members
+    r._current_peak_forces[1] *= 0.9
+    f._lift_state(r, starts)
+    assert f._current_peak_forces[40:100] == pytest.approx(before[40:100] * 0.9)
+    assert f._current_peak_forces[:40] == pytest.approx(before[:40])
+
+
+def test_multi_fidelity():
+    reference = StandardMuscle(100.0)
+    muscle = MultiFidelityMuscle(
+        StandardMuscle(100.0),
+        tolerance=0.005,
+        calibration_duration=20.0
+    )
+    assert muscle.fidelity == 'full'
+    for i in range(600):
+        if i == 100:
+            assert muscle.set_fidelity('reduced') == 0.0
+            assert muscle.motor_unit_count == muscle.reduced.cluster_count
+        if i == 500:
+            fatigue = muscle.get_peripheral_fatigue()
+            assert muscle.set_fidelity('full') < 0.01
+            # Fatigue is continuous across the switch
+            assert muscle.get_peripheral_fatigue() == pytest.approx(fatigue, abs=1e-3)
+        excitation = 0.8 if i < 400 else 0.1
+        output = muscle.step(excitation, 1 / 50.0)
+        expected = reference.step(excitation, 1 / 50.0)
+        assert output == pytest.approx(expected, abs=0.005)
+
+    assert muscle.get_peripheral_fatigue() == pytest.approx(
+        reference.get_peripheral_fatigue(),
+        abs=0.005
+    )
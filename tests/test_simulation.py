@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, PotvinFuglevandMuscle
+from pymuscle.simulation import Simulation
+
+
+def test_resume(tmp_path):
+    steps = 400
+    rng = np.random.RandomState(0)
+    protocol = np.repeat(rng.rand(steps // 20), 20)
+    path = str(tmp_path / 'run.npz')
+
+    reference = Simulation(StandardMuscle(120.0), protocol, 0.1).run()
+
+    # Stop part way through as if the process had died
+    out = np.lib.format.open_memmap(
+        str(tmp_path / 'out.npy'), mode='w+', shape=(steps,)
+    )
+    sim = Simulation(StandardMuscle(120.0), protocol, 0.1, out, path, 50)
+    sim.run(130)
+    assert sim.position == 130
+    del sim, out
+    assert not [n for n in os.listdir(str(tmp_path)) if n.endswith('.tmp')]
+
+    out = np.lib.format.open_memmap(str(tmp_path / 'out.npy'), mode='r+')
+    sim = Simulation.resume(StandardMuscle(120.0), protocol, 0.1, path, out, 50)
+    assert sim.position == 130
+    assert sim.time == pytest.approx(13.0)
+    outputs = sim.run()
+    assert sim.done
+    assert np.array_equal(outputs, reference)
+
+    # Protocols must match the checkpoint
+    with pytest.raises(AssertionError):
+        Simulation.resume(StandardMuscle(120.0), protocol[:10], 0.1, path)
+
+
+def test_per_unit_protocol(tmp_path):
+    motor_unit_count = 120
+    protocol = np.full((60, motor_unit_count), 40.0)
+    path = str(tmp_path / 'run.npz')
+
+    reference = Simulation(PotvinFuglevandMuscle(motor_unit_count), protocol, 1.0)
+    expected = reference.run()
+
+    sim = Simulation(PotvinFuglevandMuscle(motor_unit_count), protocol, 1.0, checkpoint_path=path)
+    sim.run(25)
+    sim = Simulation.resume(PotvinFuglevandMuscle(motor_unit_count), protocol, 1.0, path)
+    outputs = sim.run()
+    assert np.all(np.isnan(outputs[:25]))
+    assert np.array_equal(outputs[25:], expected[25:])
+    assert np.array_equal(
+        sim.muscle.current_forces,
+        reference.muscle.current_forces
+    )
+    # Inputs are not modified by stepping
+    assert np.all(protocol == 40.0)
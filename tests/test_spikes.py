@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, PotvinFuglevandMuscle
+from pymuscle.protocol import Protocol
+from pymuscle.spikes import SpikeEngine
+
+
+def test_hold():
+    muscle = PotvinFuglevandMuscle(120, apply_central_fatigue=False)
+    engine = SpikeEngine(muscle)
+    samples = np.linspace(0.0, 2.0, 2001)
+    forces = engine.simulate(Protocol().hold(30.0, 2.0), samples)
+
+    # Regular discharges from the start of the hold at the rate coded rates
+    rates = muscle._pool._calc_firing_rates(np.full(120, 30.0))
+    active = np.flatnonzero(rates > 0)
+    expected_count = sum(int(np.ceil(2.0 * rates[u] - 1e-9)) for u in active)
+    assert engine.spike_count == pytest.approx(expected_count, abs=len(active))
+    assert set(engine.spike_units) == set(active)
+    unit = active[0]
+    times = engine.spike_times[engine.spike_units == unit]
+    assert np.diff(times) == pytest.approx(1 / rates[unit])
+
+    # Forces are the sum of the twitches of every discharge, scaled so a
+    # regular discharge gives the rate coded force on average
+    linear_gain = (1 - np.exp(-2 * 0.4 ** 3)) / 0.4
+    expected = np.zeros(len(samples))
+    contraction_times = muscle._fibers._current_contraction_times / 1000
+    for time, u in zip(engine.spike_times, engine.spike_units):
+        t = contraction_times[u]
+        ratios = (samples - time) / t
+        covered = (ratios > 0) & (ratios <= 10.0)
+        rate_ratio = t * rates[u]
+        gain = 1.0
+        if rate_ratio > 0.4:
+            gain = (1 - np.exp(-2 * rate_ratio ** 3)) / rate_ratio / linear_gain
+        peak = muscle._fibers.current_peak_forces[u] * linear_gain / np.e
+        expected[covered] += peak * gain * ratios[covered] * np.exp(1 - ratios[covered])
+    assert forces == pytest.approx(expected)
+    assert forces[0] == 0.0
+
+    # On the scale of the rate coded output once the twitches have summed
+    output = muscle.step(30.0, 0.02)
+    assert np.mean(forces[1000:]) == pytest.approx(output, rel=0.01)
+
+
+def test_recruitment():
+    muscle = StandardMuscle(60.0)
+    state = muscle._fibers.current_peak_forces.copy()
+    engine = SpikeEngine(muscle, isi_cv=0.2, seed=0)
+    protocol = Protocol().ramp(0.0, 0.6, 2.0).rest(1.0).hold(0.3, 1.0)
+    samples = np.arange(0.0, 4.0, 0.001)
+    forces = engine.simulate(protocol, samples)
+
+    # Units join the ramp in order of their thresholds
+    first_spikes = [
+        engine.spike_times[engine.spike_units == u].min()
+        for u in np.unique(engine.spike_units)
+    ]
+    assert np.all(np.diff(first_spikes) >= 0)
+
+    # Nothing fires while resting and the force decays
+    resting = (engine.spike_times > 2.05) & (engine.spike_times < 3.0)
+    assert not np.any(resting)
+    assert forces[2900] < 0.05 * forces[1999]
+    assert forces[3500] > 0
+
+    # The muscle itself is not changed
+    assert np.array_equal(muscle._fibers.current_peak_forces, state)
@@ -1,3 +1,4 @@
+import time
 import numpy as np
 import pytest
 from pymuscle import StandardMuscle as Muscle
@@ -112,3 +113,42 @@ def test_fatigue():
     expected_fatigue = 0.18028181
     fatigue_after = m.get_peripheral_fatigue()
     assert pytest.approx(fatigue_after, expected_fatigue)
+
+
+def test_from_max_forces():
+    max_forces = [32.0, 90.0, 12.0, 250.0]
+    factors = [0.0123, 0.0123, 0.0123, 0.05]
+    muscles = Muscle.from_max_forces(max_forces, factors)
+    assert len(muscles) == 4
+
+    for muscle, max_force, factor in zip(muscles, max_forces, factors):
+        reference = Muscle(max_force, factor)
+        assert muscle.motor_unit_count == reference.motor_unit_count
+        assert muscle.max_arb_output == reference.max_arb_output
+        assert np.array_equal(
+            muscle._fibers._recovery_rates,
+            reference._fibers._recovery_rates
+        )
+        assert np.array_equal(
+            muscle._pool._peak_firing_rates,
+            reference._pool._peak_firing_rates
+        )
+        for excitation in [0.3, 0.9, 0.0, 0.6]:
+            output = muscle.step(excitation, 0.1)
+            assert output == reference.step(excitation, 0.1)
+
+    # Muscles share storage
+    base = muscles[0]._fibers._peak_twitch_forces.base
+    assert all(m._fibers._peak_twitch_forces.base is base for m in muscles)
+
+
+def test_large_muscle_first_step():
+    # Building a force table is quadratic in the motor unit count so large
+    # muscles without fatigue must not build one unless asked to
+    m = Muscle(2000.0, apply_peripheral_fatigue=False)
+    assert m.motor_unit_count > m._force_table_max_units
+    m._table_candidate_steps = 10 ** 9
+    start = time.perf_counter()
+    m.step(0.5, 1 / 50.0)
+    assert time.perf_counter() - start < 1.0
+    assert m._force_table is None
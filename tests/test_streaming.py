@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from pymuscle import StandardMuscle
+from pymuscle.streaming import AsyncMuscleDriver
+
+
+async def source(values, delay=0.0):
+    for value in values:
+        if delay:
+            await asyncio.sleep(delay)
+        yield value
+
+
+async def collect(driver, excitations, consumer_delay=0.0):
+    outputs = []
+    async for output in driver.stream(excitations):
+        outputs.append(output)
+        if consumer_delay:
+            await asyncio.sleep(consumer_delay)
+    return outputs
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_stream():
+    values = [0.1 * (i % 10) for i in range(50)]
+    reference = StandardMuscle()
+    expected = [reference.step(v, 1 / 50.0) for v in values]
+
+    driver = AsyncMuscleDriver(StandardMuscle(), 1 / 50.0, realtime=False)
+    outputs = run(collect(driver, source(values)))
+    assert outputs == pytest.approx(expected)
+    assert driver.stats.steps == len(values)
+    assert driver.stats.dropped == 0
+
+
+def test_realtime():
+    step_size = 0.005
+    driver = AsyncMuscleDriver(StandardMuscle(), step_size, offload=False)
+    outputs = run(collect(driver, source([0.5] * 20)))
+    assert len(outputs) == 20
+    assert driver.stats.steps == 20
+    # Slow sources miss deadlines
+    driver = AsyncMuscleDriver(StandardMuscle(), step_size, offload=False)
+    run(collect(driver, source([0.5] * 5, delay=2 * step_size)))
+    assert driver.stats.deadline_misses == 5
+    assert driver.stats.mean_jitter > 0.5 * step_size
+
+
+def test_backpressure():
+    values = [0.5] * 20
+    driver = AsyncMuscleDriver(
+        StandardMuscle(),
+        0.001,
+        offload=False,
+        drop_when_full=True,
+        realtime=False
+    )
+    outputs = run(collect(driver, source(values), consumer_delay=0.002))
+    assert driver.stats.steps == len(values)
+    assert driver.stats.dropped > 0
+    assert len(outputs) + driver.stats.dropped == len(values)
+
+
+def test_source_error():
+    async def failing():
+        yield 0.5
+        raise ValueError('Sensor disconnected')
+
+    driver = AsyncMuscleDriver(StandardMuscle(), 0.01, realtime=False)
+    with pytest.raises(ValueError):
+        run(collect(driver, failing()))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from pymuscle import StandardMuscle, HillMuscleGroup
+from pymuscle.hill_type import (
+    contractile_element_force_length_curve as fl_curve,
+    contractile_element_force_velocity_curve as fv_curve
+)
+from pymuscle.tendon import SeriesElasticTendon, tendon_force_strain_curve
+
+
+def test_tendon_force_strain_curve():
+    forces, slopes = tendon_force_strain_curve(np.array([-0.01, 0.0, 0.04]))
+    assert forces[0] == 0.0
+    assert forces[1] == 0.0
+    assert forces[2] == pytest.approx(1.0, abs=1e-3)
+
+    # Slope matches the curve
+    strains = np.linspace(0.001, 0.08, 50)
+    forces, slopes = tendon_force_strain_curve(strains)
+    delta = 1e-7
+    shifted, _ = tendon_force_strain_curve(strains + delta)
+    assert np.allclose((shifted - forces) / delta, slopes, rtol=1e-4)
+
+
+def test_step():
+    rng = np.random.RandomState(0)
+    count = 20
+    rest_lengths = rng.uniform(5, 15, count)
+    slack_lengths = rng.uniform(10, 30, count)
+    t = SeriesElasticTendon(rest_lengths, slack_lengths)
+
+    lengths = rest_lengths * 1.05 + slack_lengths * 1.02
+    time_step = 0.01
+    for i in range(100):
+        prev_fiber_lengths = t.fiber_lengths
+        lengths += rng.randn(count) * 0.02
+        activations = rng.rand(count)
+        forces = t.step(lengths, activations, time_step)
+
+        assert t.converged.all()
+        assert (t.iterations <= 10).all()
+
+        # Fiber and tendon forces balance
+        fiber_forces = activations \
+            * fl_curve(rest_lengths, t.fiber_lengths) \
+            * fv_curve(rest_lengths, t.fiber_lengths, prev_fiber_lengths, time_step)
+        assert np.allclose(fiber_forces, forces, atol=1e-7)
+        strains = (lengths - t.fiber_lengths - slack_lengths) / slack_lengths
+        assert np.allclose(tendon_force_strain_curve(strains)[0], forces)
+
+    assert t.failure_count == 0
+
+    # Inactive muscles leave the tendon slack
+    forces = t.step(lengths, np.zeros(count), time_step)
+    assert np.allclose(forces, 0.0, atol=1e-7)
+
+    # Failures are counted
+    t = SeriesElasticTendon(rest_lengths, slack_lengths, max_iterations=0)
+    t.step(lengths, np.ones(count), time_step)
+    assert not t.converged.any()
+    assert t.failure_count == count
+
+
+def test_hill_muscle_group_tendon():
+    rest_lengths = np.array([10.0, 20.0])
+    slack_lengths = np.array([20.0, 10.0])
+    g = HillMuscleGroup(
+        [StandardMuscle(32.0), StandardMuscle(90.0)],
+        rest_lengths,
+        tendon_slack_lengths=slack_lengths
+    )
+    lengths = rest_lengths + slack_lengths * 1.02
+    for _ in range(10):
+        forces = g.step(lengths, [0.5, 0.8], 0.02)
+    assert g.tendon.converged.all()
+    assert (forces > 0).all()
+    # The tendon has stretched so fibers are shorter than the whole unit
+    assert (g.tendon.fiber_lengths < lengths - slack_lengths).all()